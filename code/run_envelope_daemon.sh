@@ -0,0 +1,4 @@
+# Long-running alternative to one cron entry per symbol: start it once (e.g. @reboot in crontab or a systemd service).
+# Symbols and accounts are configured at the top of strategies/envelope/daemon.py.
+source LiveTradingBots/code/.venv/bin/activate
+python3 LiveTradingBots/code/strategies/envelope/daemon.py
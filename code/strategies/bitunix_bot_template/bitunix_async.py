@@ -0,0 +1,319 @@
+import os
+import sys
+import json
+import asyncio
+import aiohttp
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, List, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from strategies.bitunix_bot_template.run import (
+    DEFAULT_TRADING_PAIRS_TTL,
+    ORDER_NOT_FOUND_CODE,
+    APIConfig,
+    BitunixAPIError,
+    BitunixAuth,
+    BitunixClient,
+    BitunixError,
+    BitunixFutures,
+    BitunixNetworkError,
+    Position,
+    SymbolInfo,
+)
+from utilities.retry import DEFAULT_RETRY_POLICY, ClientOrderIds, RetryPolicy, call_with_retries_async
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+async def gather_calls(*calls: Awaitable[Any], max_concurrency: Optional[int] = None, return_exceptions: bool = False) -> List[Any]:
+    """
+    Awaits independent calls concurrently and returns their results in order, e.g.
+
+        position, balance, klines = await gather_calls(
+            client.get_pending_positions(symbol),
+            client.get_account_balance("USDT"),
+            client.get_kline(symbol, "4h"),
+        )
+
+    With max_concurrency, at most that many calls are in flight at once. With return_exceptions, a failing
+    call returns its exception instead of cancelling the others.
+    """
+    if not max_concurrency:
+        return list(await asyncio.gather(*calls, return_exceptions=return_exceptions))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def limited(call: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await call
+
+    return list(await asyncio.gather(*[limited(call) for call in calls], return_exceptions=return_exceptions))
+
+
+class AsyncBitunixClient:
+    def __init__(self, auth: BitunixAuth, config: APIConfig):
+        self._auth = auth
+        self._config = config
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._rate_limiter = BitunixClient._create_rate_limiter(config)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # created on first use, inside the running event loop, then kept alive like BitunixClient's session
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._config.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self._config.timeout),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+        if self._rate_limiter is not None:
+            self._rate_limiter.close()
+
+    async def _request(self, method: str, endpoint: str, sorted_params: str = "", **kwargs: Any) -> Any:
+        # same retry policy as BitunixClient: connection failures for any method, gateway errors for GET only,
+        # each attempt waiting for the rate limiter and then signed afresh
+        url = f"{self._config.base_url}{endpoint}"
+        for attempt in range(self._config.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self._config.backoff_factor * 2 ** (attempt - 1))
+            last_attempt = attempt == self._config.max_retries
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire_async(BitunixClient._endpoint_class(method, endpoint))
+            headers = self._auth.get_headers(query_params=sorted_params, body=kwargs.get("data", ""))
+            try:
+                async with self._get_session().request(method, url, headers=headers, **kwargs) as response:
+                    if method == "GET" and response.status in BitunixClient.RETRY_STATUSES and not last_attempt:
+                        continue
+                    try:
+                        payload = await response.json(content_type=None)
+                    except ValueError:
+                        payload = None
+                    return BitunixClient._handle_payload(response.status, payload)
+            except aiohttp.ClientConnectorError as e:
+                if not last_attempt:
+                    continue
+                raise BitunixNetworkError(f"Request failed: {e}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise BitunixNetworkError(f"Request failed: {e!r}")
+
+    async def get(self, endpoint: str, query_params: Optional[Dict[str, Any]] = None) -> Any:
+        return await self._request("GET", endpoint, BitunixClient._sorted_params(query_params), params=query_params)
+
+    async def post(self, endpoint: str, data: Dict[str, Any]) -> Any:
+        return await self._request("POST", endpoint, data=json.dumps(data, separators=(',', ':')))
+
+
+class AsyncBitunixFutures(BitunixFutures):
+    """
+    Asyncio counterpart of BitunixFutures on aiohttp, with the same signing and payloads, so independent
+    calls can overlap instead of running one after the other:
+
+        async with AsyncBitunixFutures(api_key, secret_key) as client:
+            position, balance, klines = await gather_calls(
+                client.get_pending_positions(symbol),
+                client.get_account_balance("USDT"),
+                client.get_kline(symbol, "4h"),
+            )
+
+    Every request method is a coroutine. The trading pairs used for the order precision are loaded on
+    the first order, or up front with load_trading_pairs(); symbol_info() only reads the loaded index.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        config: Optional[APIConfig] = None,
+        trading_pairs_cache: bool = True,
+        trading_pairs_ttl: float = DEFAULT_TRADING_PAIRS_TTL,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    ):
+        self._config = config or APIConfig()
+        self._auth = BitunixAuth(api_key, secret_key)
+        self._client = AsyncBitunixClient(self._auth, self._config)
+        self._init_symbol_index(trading_pairs_cache, trading_pairs_ttl)
+        self._retry_policy = retry_policy
+        self._order_ids = ClientOrderIds()
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    async def __aenter__(self) -> 'AsyncBitunixFutures':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    # ==================
+    # Helper Methods
+    # ==================
+
+    async def load_trading_pairs(self, refresh: bool = False) -> None:
+        pairs = None if refresh or self._pairs_cache is None else self._pairs_cache.load()
+        downloaded = pairs is None
+        if downloaded:
+            pairs = await self._client.get(self.API_PATH + "/market/trading_pairs", {})
+        self._index_trading_pairs(pairs, downloaded)
+
+    async def _ensure_symbols(self, symbols: List[str]) -> None:
+        if self._symbol_index is None:
+            await self.load_trading_pairs()
+        if self._needs_refresh(symbols):
+            await self.load_trading_pairs(refresh=True)
+
+    def symbol_info(self, symbol: str) -> SymbolInfo:
+        return self._lookup_symbol(symbol)
+
+    # ==================
+    # Account Methods
+    # ==================
+
+    async def get_account_balance(self, margin_coin: str) -> str:
+        endpoint = self.API_PATH + "/account"
+        response_data = await self._client.get(endpoint, {"marginCoin": margin_coin})
+        return response_data["available"]
+
+    async def set_position_mode(self, hedge_mode: bool) -> Dict[str, Any]:
+        endpoint = self.API_PATH + "/account/change_position_mode"
+        return await self._client.post(endpoint, {"positionMode": "HEDGE" if hedge_mode else "ONE_WAY"})
+
+    async def set_margin_mode(self, symbol: str, margin_mode: str = "ISOLATION", margin_coin: str = "USDT") -> Dict[str, Any]:
+        margin_mode = margin_mode.upper()
+        if margin_mode not in ['CROSS', 'ISOLATION']:
+            raise ValueError("margin_mode must be either 'CROSSED' or 'ISOLATED'")
+
+        endpoint = self.API_PATH + "/account/change_margin_mode"
+        return await self._client.post(endpoint, {"symbol": symbol, "marginMode": margin_mode, "marginCoin": margin_coin})
+
+    async def set_leverage(self, symbol: str, leverage: int, margin_coin: str = "USDT") -> Dict[str, Any]:
+        endpoint = self.API_PATH + "/account/change_leverage"
+        return await self._client.post(endpoint, {"symbol": symbol, "leverage": leverage, "marginCoin": margin_coin})
+
+    # ==================
+    # Market Methods
+    # ==================
+
+    async def get_kline(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: Optional[int] = 100,
+        kline_type: str = "LAST_PRICE"
+    ) -> 'pd.DataFrame':
+        endpoint = self.API_PATH + "/market/kline"
+        query_params = {
+            "symbol": symbol,
+            "interval": interval,
+            "limit": limit,
+            "type": kline_type
+        }
+        if start_time is not None:
+            query_params["startTime"] = start_time
+        if end_time is not None:
+            query_params["endTime"] = end_time
+
+        raw_data = await self._client.get(endpoint, query_params)
+        return self._convert_raw_klines_to_dataframe(raw_data)
+
+    async def get_trading_pairs(self, symbols: Optional[List[str]] = None) -> 'pd.DataFrame':
+        endpoint = self.API_PATH + "/market/trading_pairs"
+        query_params = {"symbols": ",".join(symbols)} if symbols else {}
+        raw_data = await self._client.get(endpoint, query_params)
+        return self._convert_trading_pairs_to_dataframe(raw_data)
+
+    # ==================
+    # Trade Methods
+    # ==================
+
+    async def place_order(self, symbol: str, qty: float, side: str, trade_side: str, order_type: str, **kwargs: Any) -> Dict[str, str]:
+        # same arguments as BitunixFutures.place_order
+        await self._ensure_symbols([symbol])
+        kwargs["client_id"] = kwargs.get("client_id") or self._order_ids.next()
+        order_data = self._order_data(symbol=symbol, qty=qty, side=side, trade_side=trade_side, order_type=order_type, **kwargs)
+        return await self._post_order(order_data)
+
+    async def _post_order(self, order_data: Dict[str, Any], resend: bool = False) -> Dict[str, str]:
+        # as BitunixFutures._post_order: retried with the same client ID, looked up before a retry
+        return await call_with_retries_async(
+            lambda: self._client.post(self.API_PATH + "/trade/place_order", order_data),
+            self._order_description(order_data),
+            self._retry_policy,
+            lambda: self._find_order(order_data["clientId"]),
+            resend,
+        )
+
+    async def get_order_detail(self, order_id: Optional[str] = None, client_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        if not order_id and not client_id:
+            raise ValueError("Either order_id or client_id is required")
+        endpoint = self.API_PATH + "/trade/get_order_detail"
+        query_params = {"orderId": order_id} if order_id else {"clientId": client_id}
+        try:
+            return await self._client.get(endpoint, query_params)
+        except BitunixAPIError as e:
+            if e.code != ORDER_NOT_FOUND_CODE:
+                raise
+            return None
+
+    async def _find_order(self, client_id: str) -> Optional[Dict[str, str]]:
+        return self._order_reference(await self.get_order_detail(client_id=client_id), client_id)
+
+    async def place_orders_bulk(self, orders: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
+        # same orders and results as BitunixFutures.place_orders_bulk, the batch requests are sent concurrently
+        await self._ensure_symbols([order["symbol"] for order in orders if "symbol" in order])
+        endpoint = self.API_PATH + "/trade/batch_order"
+        results, order_list, chunks = self._prepare_batches(orders)
+
+        async def place_chunk(symbol: str, chunk: List[int]) -> None:
+            try:
+                response_data = await self._client.post(endpoint, {"symbol": symbol, "orderList": [order_list[i] for i in chunk]})
+            except BitunixError as e:
+                if not e.retryable:
+                    self._record_batch(results, order_list, symbol, chunk, error=e)
+                    return
+                # the batch may have gone through in part, each order is sent again on its own
+                for i in chunk:
+                    try:
+                        results[i]["order"] = await self._post_order({"symbol": symbol, **order_list[i]}, resend=True)
+                    except BitunixError as single_error:
+                        results[i]["error"] = f"Failed to place order {order_list[i]['clientId']}: {single_error}"
+                return
+            self._record_batch(results, order_list, symbol, chunk, response_data=response_data)
+
+        await gather_calls(*[place_chunk(symbol, chunk) for symbol, chunk in chunks], max_concurrency=max(1, max_workers))
+        return results
+
+    # ==================
+    # Position Methods
+    # ==================
+
+    async def get_pending_positions(
+        self,
+        symbol: Optional[str] = None,
+        position_id: Optional[str] = None
+    ) -> Optional[Position]:
+        if not symbol:
+            raise ValueError("Symbol is required")
+
+        endpoint = self.API_PATH + "/position/get_pending_positions"
+        query_params = {"symbol": symbol}
+        if position_id:
+            query_params["positionId"] = position_id
+
+        raw_data = await self._client.get(endpoint, query_params)
+
+        if len(raw_data) > 1:
+            raise ValueError("Multiple positions found. Currently only one-way mode is supported")
+
+        return Position(**raw_data[0]) if raw_data else None
+
+    async def flash_close_position(self, position_id: str) -> Dict[str, str]:
+        if not position_id:
+            raise ValueError("Position ID is required")
+
+        endpoint = self.API_PATH + "/trade/flash_close_position"
+        return await self._client.post(endpoint, {"positionId": position_id})
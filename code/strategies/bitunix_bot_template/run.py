@@ -1,30 +1,65 @@
+import os
+import sys
 import json
 import hashlib
 import time
 import secrets
+import tempfile
 import requests
-import pandas as pd
 import numpy as np
-import ta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List, Union, Dict, Any, TypeVar, Generic
+from typing import TYPE_CHECKING, Optional, List, Tuple, Union, Dict, Any, TypeVar, Generic
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utilities.fast_start import preload
+from utilities.indicators import rsi as compute_rsi
+from utilities.precision import ROUND, TRUNCATE, Step, SymbolPrecision
+from utilities.rate_limiter import BucketConfig, RateLimiter
+from utilities.retry import DEFAULT_RETRY_POLICY, ClientOrderIds, RetryPolicy, call_with_retries
+
+if TYPE_CHECKING:
+    import pandas as pd
 
     
 class BitunixError(Exception):
-    pass
+    retryable = False  # see utilities.retry.is_retryable
 
 class BitunixNetworkError(BitunixError):
-    pass
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        # no response, rate limited or a server error: the same request may go through when sent again
+        self.retryable = status_code is None or status_code == 429 or status_code >= 500
 
 class BitunixAPIError(BitunixError):
-    pass
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code  # the Bitunix error code of the response
 
 @dataclass
 class APIConfig:
     base_url: str = "https://fapi.bitunix.com"
     timeout: int = 10
+    pool_size: int = 10  # kept-alive connections, at least the max_workers of place_orders_bulk
+    max_retries: int = 2  # connection errors, and gateway errors of GET requests
+    backoff_factor: float = 0.3
+    rate_limit: bool = True  # pace the calls with the BITUNIX_RATE_LIMITS buckets, shared by the bot processes
+
+ORDER_NOT_FOUND_CODE = 20007  # "Order not found", the only error of get_order_detail that says the order does not exist
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '.cache')
+DEFAULT_TRADING_PAIRS_TTL = 24 * 60 * 60  # seconds
+# requests per second of each endpoint class, for all the bot processes of the machine together
+BITUNIX_RATE_LIMITS = {
+    "public": BucketConfig(rate=10),
+    "private": BucketConfig(rate=10),
+    "trade": BucketConfig(rate=10),
+}
 
 T = TypeVar('T')
 
@@ -57,6 +92,71 @@ class Position:
     mtime: datetime
 
 
+@dataclass(frozen=True, slots=True)
+class SymbolInfo:
+    symbol: str
+    min_qty: float
+    base_precision: int
+    quote_precision: int
+    max_limit_qty: Optional[float]
+    max_market_qty: Optional[float]
+    min_leverage: Optional[int]
+    max_leverage: Optional[int]
+    precision: SymbolPrecision  # steps of basePrecision / quotePrecision decimals
+
+    @classmethod
+    def from_pair(cls, pair: Dict[str, Any]) -> 'SymbolInfo':
+        # pair: one row of the /market/trading_pairs response
+        def optional(key: str, cast: Any) -> Any:
+            return cast(pair[key]) if pair.get(key) not in (None, "") else None
+
+        return cls(
+            symbol=pair["symbol"],
+            min_qty=float(pair["minTradeVolume"]),
+            base_precision=int(pair["basePrecision"]),
+            quote_precision=int(pair["quotePrecision"]),
+            max_limit_qty=optional("maxLimitOrderVolume", float),
+            max_market_qty=optional("maxMarketOrderVolume", float),
+            min_leverage=optional("minLeverage", int),
+            max_leverage=optional("maxLeverage", int),
+            precision=SymbolPrecision(
+                amount=Step.from_decimals(int(pair["basePrecision"])),
+                price=Step.from_decimals(int(pair["quotePrecision"])),
+            ),
+        )
+
+
+class TradingPairsCache:
+    # the raw trading_pairs table on disk, so a new process does not download it again within the TTL
+    def __init__(self, cache_dir: Optional[str] = None, ttl: float = DEFAULT_TRADING_PAIRS_TTL):
+        self.ttl = ttl
+        self.path = os.path.join(cache_dir or DEFAULT_CACHE_DIR, "bitunix_trading_pairs.json")
+
+    def load(self) -> Optional[List[Dict[str, Any]]]:
+        try:
+            with open(self.path, "r") as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(content, dict) or time.time() - content.get("saved_at", 0) >= self.ttl:
+            return None
+        return content.get("pairs")
+
+    def save(self, pairs: List[Dict[str, Any]]) -> None:
+        # written to a temporary file then renamed, so a concurrent reader never sees a partial file
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".bitunix_trading_pairs.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"saved_at": time.time(), "pairs": pairs}, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
 class BitunixAuth:
     def __init__(self, api_key: str, secret_key: str):
         self.api_key = api_key
@@ -79,36 +179,90 @@ class BitunixAuth:
         }
 
 class BitunixClient:
+    RETRY_STATUSES = (429, 502, 503, 504)
+
     def __init__(self, auth: BitunixAuth, config: APIConfig):
         self._auth = auth
         self._config = config
+        self._session = self._create_session(config)
+        self._rate_limiter = self._create_rate_limiter(config)
+
+    @classmethod
+    def _create_session(cls, config: APIConfig) -> requests.Session:
+        # One keep-alive session for every call, so only the first request pays the TCP and TLS handshakes.
+        # A POST is only retried when the connection failed, never once it may have reached the exchange.
+        retry = Retry(
+            total=config.max_retries,
+            connect=config.max_retries,
+            read=0,
+            status=config.max_retries,
+            allowed_methods=frozenset({"GET"}),
+            status_forcelist=cls.RETRY_STATUSES,
+            backoff_factor=config.backoff_factor,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
 
     @staticmethod
-    def _handle_response(response: requests.Response) -> Any:
-        if response.status_code != 200:
-            try:
-                error_detail = response.json()
-            except (json.JSONDecodeError, AttributeError):
-                error_detail = {"status": response.status_code}
-            raise BitunixNetworkError(f"HTTP {response.status_code} error: {error_detail}")
-        
-        typed_response = BitunixResponse(**response.json())
+    def _create_rate_limiter(config: APIConfig) -> Optional[RateLimiter]:
+        return RateLimiter("bitunix", BITUNIX_RATE_LIMITS) if config.rate_limit else None
+
+    @staticmethod
+    def _endpoint_class(method: str, endpoint: str) -> str:
+        if "/market/" in endpoint:
+            return "public"
+        return "trade" if method == "POST" else "private"
+
+    def _wait_for_rate_limit(self, method: str, endpoint: str) -> None:
+        # before signing, so the timestamp of the headers is not aged by the wait
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire(self._endpoint_class(method, endpoint))
+
+    def close(self) -> None:
+        self._session.close()
+        if self._rate_limiter is not None:
+            self._rate_limiter.close()
+
+    @staticmethod
+    def _handle_payload(status_code: int, payload: Any) -> Any:
+        # payload: the decoded JSON body, None when it is not JSON
+        if status_code != 200:
+            error_detail = payload if payload is not None else {"status": status_code}
+            raise BitunixNetworkError(f"HTTP {status_code} error: {error_detail}", status_code)
+        if not isinstance(payload, dict):
+            raise BitunixNetworkError(f"Invalid response body: {payload}", status_code)
+
+        typed_response = BitunixResponse(**payload)
         if typed_response.code != 0:
-            raise BitunixAPIError(f"Bitunix API error code {typed_response.code}: {typed_response.msg}")
+            raise BitunixAPIError(f"Bitunix API error code {typed_response.code}: {typed_response.msg}", typed_response.code)
         return typed_response.data
 
+    @classmethod
+    def _handle_response(cls, response: requests.Response) -> Any:
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        return cls._handle_payload(response.status_code, payload)
+
+    @staticmethod
+    def _sorted_params(query_params: Optional[Dict[str, Any]]) -> str:
+        if not query_params:
+            return ""
+        sorted_items = sorted(query_params.items(), key=lambda x: x[0])
+        return "".join(f"{key}{value}" for key, value in sorted_items)
+
     def get(self, endpoint: str, query_params: Optional[Dict[str, Any]] = None) -> Any:
+        self._wait_for_rate_limit("GET", endpoint)
         url = f"{self._config.base_url}{endpoint}"
-        
-        sorted_params = ""
-        if query_params:
-            sorted_items = sorted(query_params.items(), key=lambda x: x[0])
-            sorted_params = "".join(f"{key}{value}" for key, value in sorted_items)
-        
-        headers = self._auth.get_headers(query_params=sorted_params)
+        headers = self._auth.get_headers(query_params=self._sorted_params(query_params))
         
         try:
-            response = requests.get(
+            response = self._session.get(
                 url=url,
                 headers=headers,
                 params=query_params,
@@ -119,12 +273,13 @@ class BitunixClient:
             raise BitunixNetworkError(f"Request failed: {e}")
 
     def post(self, endpoint: str, data: Dict[str, Any]) -> Any:
+        self._wait_for_rate_limit("POST", endpoint)
         url = f"{self._config.base_url}{endpoint}"
         data_str = json.dumps(data, separators=(',', ':'))
         headers = self._auth.get_headers(body=data_str)
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 url=url,
                 headers=headers,
                 data=data_str,
@@ -136,55 +291,85 @@ class BitunixClient:
 
 class BitunixFutures:
     API_PATH = "/api/v1/futures"
+    BATCH_ORDER_LIMIT = 20
 
-    def __init__(self, api_key: str, secret_key: str, config: Optional[APIConfig] = None):
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        config: Optional[APIConfig] = None,
+        trading_pairs_cache: bool = True,
+        trading_pairs_ttl: float = DEFAULT_TRADING_PAIRS_TTL,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    ):
         self._config = config or APIConfig()
         self._auth = BitunixAuth(api_key, secret_key)
         self._client = BitunixClient(self._auth, self._config)
-        self._trading_pairs_info: Optional[pd.DataFrame] = None
-        self._current_symbol_info: Optional[Dict[str, Any]] = None
+        self._init_symbol_index(trading_pairs_cache, trading_pairs_ttl)
+        self._retry_policy = retry_policy
+        self._order_ids = ClientOrderIds()
+
+    def _init_symbol_index(self, trading_pairs_cache: bool, trading_pairs_ttl: float) -> None:
+        self._pairs_cache = TradingPairsCache(ttl=trading_pairs_ttl) if trading_pairs_cache else None
+        self._symbol_index: Optional[Dict[str, SymbolInfo]] = None
+        self._symbol_index_downloaded = False  # the table was fetched from the exchange by this process
+
+    def close(self) -> None:
+        self._client.close()
 
     # ==================
     # Helper Methods
     # ==================
 
-    def _ensure_trading_pairs_info(self, symbol: str) -> None:
-        if self._trading_pairs_info is None:
-            self._trading_pairs_info = self.get_trading_pairs()
-
-        if symbol not in self._trading_pairs_info.index:
+    def _index_trading_pairs(self, pairs: List[Dict[str, Any]], downloaded: bool) -> None:
+        if downloaded and self._pairs_cache is not None:
+            self._pairs_cache.save(pairs)
+        self._symbol_index = {pair["symbol"]: SymbolInfo.from_pair(pair) for pair in pairs}
+        self._symbol_index_downloaded = self._symbol_index_downloaded or downloaded
+
+    def _needs_refresh(self, symbols: List[str]) -> bool:
+        # an unknown symbol may have been listed after the cached table was saved, refetched once per process
+        return not self._symbol_index_downloaded and any(symbol not in self._symbol_index for symbol in symbols)
+
+    def load_trading_pairs(self, refresh: bool = False) -> None:
+        pairs = None if refresh or self._pairs_cache is None else self._pairs_cache.load()
+        downloaded = pairs is None
+        if downloaded:
+            pairs = self._client.get(self.API_PATH + "/market/trading_pairs", {})
+        self._index_trading_pairs(pairs, downloaded)
+
+    def _lookup_symbol(self, symbol: str) -> SymbolInfo:
+        if self._symbol_index is None:
+            raise ValueError("Trading pairs are not loaded")
+        if symbol not in self._symbol_index:
             raise ValueError(f"Symbol {symbol} not found in trading pairs")
+        return self._symbol_index[symbol]
 
-        self._current_symbol_info = self._trading_pairs_info.loc[symbol].to_dict()
+    def symbol_info(self, symbol: str) -> SymbolInfo:
+        if self._symbol_index is None:
+            self.load_trading_pairs()
+        if self._needs_refresh([symbol]):
+            self.load_trading_pairs(refresh=True)
+        return self._lookup_symbol(symbol)
 
-    def _qty_to_precision(self, symbol: str, amount: float, rounding_mode: str = "TRUNCATE") -> str:
+    def _qty_to_precision(self, symbol: str, amount: float, rounding_mode: str = TRUNCATE) -> str:
         try:
-            self._ensure_trading_pairs_info(symbol)
-            min_amount = float(self._current_symbol_info['minTradeVolume'])
-            
-            if amount < min_amount:
-                raise ValueError(f"Amount {amount} is less than minimum {min_amount}")
-            
-            return self._apply_precision(amount, self._current_symbol_info['basePrecision'], rounding_mode)
+            info = self.symbol_info(symbol)
+            if amount < info.min_qty:
+                raise ValueError(f"Amount {amount} is less than minimum {info.min_qty}")
+
+            return info.precision.amount.format(amount, rounding_mode)
             
         except Exception as e:
             raise ValueError(f"Failed to calculate amount precision: {str(e)}")
 
-    def _price_to_precision(self, symbol: str, price: float, rounding_mode: str = "ROUND") -> str:
+    def _price_to_precision(self, symbol: str, price: float, rounding_mode: str = ROUND) -> str:
         try:
-            self._ensure_trading_pairs_info(symbol)
-            return self._apply_precision(price, self._current_symbol_info['quotePrecision'], rounding_mode)
+            return self.symbol_info(symbol).precision.price.format(price, rounding_mode)
             
         except Exception as e:
             raise ValueError(f"Failed to calculate price precision: {str(e)}")
 
-    @staticmethod
-    def _apply_precision(value: float, precision: int, rounding_mode: str) -> str:
-        multiplier = 10 ** precision
-        scaled = value * multiplier
-        scaled = int(scaled) if rounding_mode == "TRUNCATE" else round(scaled)
-        return f"{scaled / multiplier:g}"
-
     # ==================
     # Account Methods
     # ==================
@@ -236,7 +421,7 @@ class BitunixFutures:
         end_time: Optional[int] = None,
         limit: Optional[int] = 100,
         kline_type: str = "LAST_PRICE"
-    ) -> pd.DataFrame:
+    ) -> 'pd.DataFrame':
         endpoint = self.API_PATH + "/market/kline"
         query_params = {
             "symbol": symbol,
@@ -253,7 +438,9 @@ class BitunixFutures:
         return self._convert_raw_klines_to_dataframe(raw_data)
 
     @staticmethod
-    def _convert_raw_klines_to_dataframe(raw_data: List[Dict[str, Any]]) -> pd.DataFrame:
+    def _convert_raw_klines_to_dataframe(raw_data: List[Dict[str, Any]]) -> 'pd.DataFrame':
+        import pandas as pd  # deferred, see preload in the bot below
+
         df = pd.DataFrame(raw_data)
         df['datetime'] = pd.to_datetime(df['time'].astype(np.float64), unit='ms')
         df = df.set_index('datetime').sort_index(ascending=True)
@@ -263,7 +450,7 @@ class BitunixFutures:
 
         return df.drop('time', axis=1)
 
-    def get_trading_pairs(self, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+    def get_trading_pairs(self, symbols: Optional[List[str]] = None) -> 'pd.DataFrame':
         endpoint = self.API_PATH + "/market/trading_pairs"
         
         query_params = {}
@@ -274,7 +461,9 @@ class BitunixFutures:
         return self._convert_trading_pairs_to_dataframe(raw_data)
 
     @staticmethod
-    def _convert_trading_pairs_to_dataframe(raw_data: List[Dict[str, Any]]) -> pd.DataFrame:
+    def _convert_trading_pairs_to_dataframe(raw_data: List[Dict[str, Any]]) -> 'pd.DataFrame':
+        import pandas as pd
+
         data = np.array([tuple(d.values()) for d in raw_data],
                        dtype=[(k, object) for k in raw_data[0].keys()])
         
@@ -307,8 +496,87 @@ class BitunixFutures:
         sl_order_type: str = "MARKET",  # "LIMIT" or "MARKET"
         sl_order_price: Optional[float] = None,
     ) -> Dict[str, str]:
-        endpoint = self.API_PATH + "/trade/place_order"
-        
+        order_data = self._order_data(
+            symbol=symbol,
+            qty=qty,
+            side=side,
+            trade_side=trade_side,
+            order_type=order_type,
+            price=price,
+            position_id=position_id,
+            effect=effect,
+            client_id=client_id or self._order_ids.next(),
+            reduce_only=reduce_only,
+            tp_price=tp_price,
+            tp_stop_type=tp_stop_type,
+            tp_order_type=tp_order_type,
+            tp_order_price=tp_order_price,
+            sl_price=sl_price,
+            sl_stop_type=sl_stop_type,
+            sl_order_type=sl_order_type,
+            sl_order_price=sl_order_price,
+        )
+        return self._post_order(order_data)
+
+    def _post_order(self, order_data: Dict[str, Any], resend: bool = False) -> Dict[str, str]:
+        # retried on network errors with the same client ID, looked up before each retry (and before the first
+        # attempt when resend, for an order of a failed batch) so an order the exchange already has is not placed twice
+        return call_with_retries(
+            lambda: self._client.post(self.API_PATH + "/trade/place_order", order_data),
+            self._order_description(order_data),
+            self._retry_policy,
+            lambda: self._find_order(order_data["clientId"]),
+            resend,
+        )
+
+    @staticmethod
+    def _order_description(order_data: Dict[str, Any]) -> str:
+        return f"Bitunix {order_data['orderType']} {order_data['side']} order of {order_data['qty']} {order_data['symbol']}"
+
+    @staticmethod
+    def _order_reference(detail: Optional[Dict[str, Any]], client_id: str) -> Optional[Dict[str, str]]:
+        # an order detail in the shape of the place_order response
+        if not detail:
+            return None
+        return {"orderId": detail.get("orderId"), "clientId": detail.get("clientId") or client_id}
+
+    def get_order_detail(self, order_id: Optional[str] = None, client_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        # None when the exchange does not know the order, any other error is raised: the order may exist
+        if not order_id and not client_id:
+            raise ValueError("Either order_id or client_id is required")
+        endpoint = self.API_PATH + "/trade/get_order_detail"
+        query_params = {"orderId": order_id} if order_id else {"clientId": client_id}
+        try:
+            return self._client.get(endpoint, query_params)
+        except BitunixAPIError as e:
+            if e.code != ORDER_NOT_FOUND_CODE:
+                raise
+            return None
+
+    def _find_order(self, client_id: str) -> Optional[Dict[str, str]]:
+        return self._order_reference(self.get_order_detail(client_id=client_id), client_id)
+
+    def _order_data(
+        self,
+        symbol: str,
+        qty: float,
+        side: str,  # "BUY" or "SELL"
+        trade_side: str,  # "OPEN" or "CLOSE"
+        order_type: str,  # "LIMIT" or "MARKET"
+        price: Optional[float] = None,
+        position_id: Optional[str] = None,
+        effect: str = "GTC",  # "IOC", "FOK", "GTC", "POST_ONLY"
+        client_id: Optional[str] = None,
+        reduce_only: bool = False,
+        tp_price: Optional[float] = None,
+        tp_stop_type: str = "LAST_PRICE",  # "MARK_PRICE" or "LAST_PRICE"
+        tp_order_type: str = "MARKET",  # "LIMIT" or "MARKET"
+        tp_order_price: Optional[float] = None,
+        sl_price: Optional[float] = None,
+        sl_stop_type: str = "LAST_PRICE",  # "MARK_PRICE" or "LAST_PRICE"
+        sl_order_type: str = "MARKET",  # "LIMIT" or "MARKET"
+        sl_order_price: Optional[float] = None,
+    ) -> Dict[str, Any]:
         if order_type == "LIMIT" and price is None:
             raise ValueError("Price is required for LIMIT orders")
             
@@ -336,7 +604,81 @@ class BitunixFutures:
             "slOrderPrice": self._price_to_precision(symbol, sl_order_price) if sl_order_price is not None else None,
         }
 
-        return self._client.post(endpoint, {k: v for k, v in order_data.items() if v is not None})
+        return {k: v for k, v in order_data.items() if v is not None}
+
+    def place_orders_bulk(self, orders: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
+        # orders: place_order keyword arguments; a client ID is generated when missing to match the batch results
+        # returns one {"order": {"orderId", "clientId"} or None, "error": str or None} entry per order, in order
+        endpoint = self.API_PATH + "/trade/batch_order"
+        results, order_list, chunks = self._prepare_batches(orders)
+
+        def place_chunk(symbol: str, chunk: List[int]) -> None:
+            try:
+                response_data = self._client.post(endpoint, {"symbol": symbol, "orderList": [order_list[i] for i in chunk]})
+            except BitunixError as e:
+                if not e.retryable:
+                    self._record_batch(results, order_list, symbol, chunk, error=e)
+                    return
+                # the batch may have gone through in part, each order is sent again on its own
+                for i in chunk:
+                    try:
+                        results[i]["order"] = self._post_order({"symbol": symbol, **order_list[i]}, resend=True)
+                    except BitunixError as single_error:
+                        results[i]["error"] = f"Failed to place order {order_list[i]['clientId']}: {single_error}"
+                return
+            self._record_batch(results, order_list, symbol, chunk, response_data=response_data)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks) or 1))) as pool:
+            list(pool.map(lambda item: place_chunk(*item), chunks))
+        return results
+
+    def _prepare_batches(
+        self, orders: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Dict[int, Dict[str, Any]], List[Tuple[str, List[int]]]]:
+        # returns (results, order bodies by order index, [(symbol, order indexes)] chunks of BATCH_ORDER_LIMIT)
+        results = [{"order": None, "error": None} for _ in orders]
+        by_symbol: Dict[str, List[int]] = {}
+        order_list: Dict[int, Dict[str, Any]] = {}
+        for i, order in enumerate(orders):
+            try:
+                order_data = self._order_data(**{**order, "client_id": order.get("client_id") or self._order_ids.next()})
+            except Exception as e:
+                results[i]["error"] = f"Failed to prepare order {order}: {e}"
+                continue
+            by_symbol.setdefault(order_data.pop("symbol"), []).append(i)
+            order_list[i] = order_data
+
+        chunks = [
+            (symbol, indexes[start:start + self.BATCH_ORDER_LIMIT])
+            for symbol, indexes in by_symbol.items()
+            for start in range(0, len(indexes), self.BATCH_ORDER_LIMIT)
+        ]
+        return results, order_list, chunks
+
+    @staticmethod
+    def _record_batch(
+        results: List[Dict[str, Any]],
+        order_list: Dict[int, Dict[str, Any]],
+        symbol: str,
+        chunk: List[int],
+        response_data: Optional[Dict[str, Any]] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        if error is not None:
+            for i in chunk:
+                results[i]["error"] = f"Failed to batch place {symbol} orders: {error}"
+            return
+        successes = {item.get("clientId"): item for item in response_data.get("successList") or []}
+        failures = {item.get("clientId"): item for item in response_data.get("failureList") or []}
+        for i in chunk:
+            client_id = order_list[i]["clientId"]
+            if client_id in successes:
+                results[i]["order"] = successes[client_id]
+            elif client_id in failures:
+                failure = failures[client_id]
+                results[i]["error"] = f"Bitunix API error code {failure.get('errorCode')}: {failure.get('errorMsg')}"
+            else:
+                results[i]["error"] = f"No result returned for order {client_id}"
 
     # ==================
     # Position Methods
@@ -374,6 +716,8 @@ class BitunixFutures:
 
 
 if __name__ == "__main__":
+    # pandas is only needed for the klines, load it while the account setup requests are in flight
+    preload('pandas')
 
     # ==================
     # Bot Parameters
@@ -447,12 +791,10 @@ if __name__ == "__main__":
         )
         close_price = klines['close'].iloc[-2]
 
-        rsi = ta.momentum.rsi(
-            close=klines['close'],
-            window=RSI_PERIOD,
-        ).dropna()
+        rsi = compute_rsi(klines['close'].to_numpy(dtype=np.float64), window=RSI_PERIOD)
+        rsi = rsi[~np.isnan(rsi)]
 
-        current_rsi = rsi.iloc[-2]
+        current_rsi = rsi[-2]
 
         if VERBOSE:
             print(f"  > Last close price: {close_price:.2f} {MARGIN_COIN}")
@@ -466,7 +808,7 @@ if __name__ == "__main__":
     # Trading Signals
     # ==================
     try:
-        previous_rsi = rsi.iloc[-3]
+        previous_rsi = rsi[-3]
         entry_condition = previous_rsi <= RSI_OVERBOUGHT < current_rsi
         exit_condition = previous_rsi >= RSI_OVERBOUGHT > current_rsi
 
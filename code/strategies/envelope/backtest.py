@@ -0,0 +1,270 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Type
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from strategies.envelope.strategy import EnvelopeStrategy
+from utilities.ohlcv_store import OHLCVStore, ohlcv_to_dataframe
+
+
+@dataclass
+class BacktestResult:
+    trades: pd.DataFrame  # one row per closed position
+    equity: np.ndarray  # mark-to-market equity at each candle close
+    stats: Dict[str, float]
+
+
+def _next_index(indexes: np.ndarray, after: int, n: int, inclusive: bool = False) -> int:
+    """First entry of the sorted `indexes` after `after` (or at it if inclusive), `n` if there is none."""
+    position = np.searchsorted(indexes, after, side='left' if inclusive else 'right')
+    return int(indexes[position]) if position < len(indexes) else n
+
+
+def _first_true(mask: np.ndarray, offset: int, n: int) -> int:
+    hits = np.flatnonzero(mask)
+    return offset + int(hits[0]) if len(hits) else n
+
+
+def simulate(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    average: np.ndarray,
+    band_highs: np.ndarray,
+    band_lows: np.ndarray,
+    params: Dict[str, Any],
+    initial_balance: float = 1000.0,
+    fee_rate: float = 0.0006,
+) -> Dict[str, Any]:
+    """
+    Replays the envelope rules over candle arrays. Orders are placed at each candle close from the values
+    of that candle, and fill during the next candle:
+    - entries fill at band_low_i (longs) / band_high_i (shorts) when the candle reaches the band,
+    - the position exits at the average, or at the stop loss computed from the average entry price,
+    - with 'price_jump_pct', the position is closed at the candle close past the threshold,
+    - after a stop loss or price jump close, no new orders are placed until a close crosses the average back,
+      like the tracker's stop_loss_triggered / close_all_triggered status.
+    Within a candle, entries are applied first, then the stop loss, then the exit; the exit is not taken in
+    a candle where an entry filled, so intrabar round trips are never counted as wins.
+
+    Instead of stepping through every candle, the next candle where something can happen is looked up in
+    precomputed event indexes (binary search) or with a vectorized scan, so the Python loop only runs once
+    per fill or position change.
+
+    Args:
+        high, low, close, average (np.ndarray): One value per candle.
+        band_highs, band_lows (np.ndarray): (envelopes, candles) arrays, NaN where the average is undefined.
+        params (Dict[str, Any]): Strategy parameters, see envelope/run.py.
+        initial_balance (float): Starting balance in USDT.
+        fee_rate (float): Fee paid on the notional of every fill.
+
+    Returns:
+        Dict[str, Any]: 'trades' (list of dicts), 'equity' (np.ndarray) and 'stats' (dict).
+    """
+    n = len(close)
+    envelopes_count = band_lows.shape[0]
+    size_factor = params['balance_fraction'] * params['leverage'] / envelopes_count
+    stop_loss_pct = params['stop_loss_pct']
+    price_jump_pct = params.get('price_jump_pct')
+
+    # prices decided at close t-1 are the ones resting in the order book during candle t
+    average_prev = np.r_[np.nan, average[:-1]]
+    band_lows_prev = np.c_[np.full(envelopes_count, np.nan), band_lows[:, :-1]]
+    band_highs_prev = np.c_[np.full(envelopes_count, np.nan), band_highs[:, :-1]]
+    with np.errstate(invalid='ignore'):
+        long_touches = [np.flatnonzero(low <= band_lows_prev[k]) for k in range(envelopes_count)]
+        short_touches = [np.flatnonzero(high >= band_highs_prev[k]) for k in range(envelopes_count)]
+        flat_touch = np.zeros(n, dtype=bool)
+        if params['use_longs']:
+            flat_touch |= low <= band_lows_prev.max(axis=0)
+        if params['use_shorts']:
+            flat_touch |= high >= band_highs_prev.min(axis=0)
+        flat_touches = np.flatnonzero(flat_touch)
+        exits = {1: np.flatnonzero(high >= average_prev), -1: np.flatnonzero(low <= average_prev)}
+        resumes = {1: np.flatnonzero(close >= average), -1: np.flatnonzero(close <= average)}
+
+    cash = initial_balance
+    side = 0  # 1 long, -1 short, 0 flat
+    quantity = 0.0
+    cost = 0.0  # sum of quantity * fill price
+    filled = np.zeros(envelopes_count, dtype=bool)
+    order_balance = 0.0
+    ok_to_trade = True
+    last_side = 0
+    entry_index = 0
+    trades: List[Dict[str, Any]] = []
+    changes = [(0, cash, 0.0, 0.0)]  # (candle, cash, signed quantity, average entry) after each event
+
+    def close_position(j: int, price: float, reason: str) -> None:
+        nonlocal cash, side, quantity, cost
+        average_entry = cost / quantity
+        fee = quantity * price * fee_rate
+        pnl = side * quantity * (price - average_entry) - fee
+        cash += pnl
+        trades.append({
+            'side': 'long' if side == 1 else 'short',
+            'entry_index': entry_index,
+            'exit_index': j,
+            'average_entry': average_entry,
+            'exit_price': price,
+            'quantity': quantity,
+            'pnl': pnl,
+            'reason': reason,
+        })
+        side, quantity, cost = 0, 0.0, 0.0
+        filled[:] = False
+
+    i = int(np.argmax(~np.isnan(average))) if not np.isnan(average).all() else n
+    while i < n - 1:
+        if not ok_to_trade:
+            i = _next_index(resumes[last_side], i, n, inclusive=True)
+            ok_to_trade = True
+            continue
+
+        if side == 0:
+            order_balance = cash * size_factor
+            j = _next_index(flat_touches, i, n)
+        else:
+            average_entry = cost / quantity
+            stop_price = average_entry * (1 - side * stop_loss_pct)
+            touches = long_touches if side == 1 else short_touches
+            j = min(
+                [_next_index(exits[side], i, n)]
+                + [_next_index(touches[k], i, n) for k in range(envelopes_count) if not filled[k]]
+            )
+            end = min(j, n - 1) + 1
+            window = slice(i + 1, end)
+            if side == 1:
+                j = min(j, _first_true(low[window] <= stop_price, i + 1, n))
+                if price_jump_pct is not None:
+                    j = min(j, _first_true(close[window] < average_entry * (1 - price_jump_pct), i + 1, n))
+            else:
+                j = min(j, _first_true(high[window] >= stop_price, i + 1, n))
+                if price_jump_pct is not None:
+                    j = min(j, _first_true(close[window] > average_entry * (1 + price_jump_pct), i + 1, n))
+        if j >= n:
+            break
+
+        # --- entries ---
+        entered = False
+        if side == 0:
+            if params['use_longs'] and low[j] <= np.nanmax(band_lows_prev[:, j]):
+                side = 1
+            elif params['use_shorts']:
+                side = -1
+            entry_index = j
+        bands_prev = band_lows_prev[:, j] if side == 1 else band_highs_prev[:, j]
+        for k in range(envelopes_count):
+            touched = low[j] <= bands_prev[k] if side == 1 else high[j] >= bands_prev[k]
+            if not filled[k] and touched:
+                fill_quantity = order_balance / bands_prev[k]
+                quantity += fill_quantity
+                cost += fill_quantity * bands_prev[k]
+                cash -= fill_quantity * bands_prev[k] * fee_rate
+                filled[k] = True
+                entered = True
+
+        # --- stop loss, exit at the average, price jump close ---
+        average_entry = cost / quantity
+        stop_price = average_entry * (1 - side * stop_loss_pct)
+        if (side == 1 and low[j] <= stop_price) or (side == -1 and high[j] >= stop_price):
+            last_side = side
+            close_position(j, stop_price, 'stop_loss')
+            ok_to_trade = False
+        elif not entered and ((side == 1 and high[j] >= average_prev[j]) or (side == -1 and low[j] <= average_prev[j])):
+            close_position(j, average_prev[j], 'exit')
+        elif price_jump_pct is not None and (
+                (side == 1 and close[j] < average_entry * (1 - price_jump_pct))
+                or (side == -1 and close[j] > average_entry * (1 + price_jump_pct))):
+            last_side = side
+            close_position(j, close[j], 'price_jump')
+            ok_to_trade = False
+
+        changes.append((j, cash, side * quantity, cost / quantity if quantity else 0.0))
+        i = j
+
+    if side != 0:
+        close_position(n - 1, close[-1], 'end')
+        changes.append((n - 1, cash, 0.0, 0.0))
+
+    # piecewise constant state between events, marked to market at every close
+    change_candles = np.array([change[0] for change in changes])
+    state = np.searchsorted(change_candles, np.arange(n), side='right') - 1
+    cash_values = np.array([change[1] for change in changes])[state]
+    signed_quantity = np.array([change[2] for change in changes])[state]
+    average_entries = np.array([change[3] for change in changes])[state]
+    equity = cash_values + signed_quantity * (close - average_entries)
+
+    pnls = np.array([trade['pnl'] for trade in trades])
+    peaks = np.maximum.accumulate(equity) if n else equity
+    stats = {
+        'final_equity': float(equity[-1]) if n else initial_balance,
+        'total_return': float(equity[-1] / initial_balance - 1) if n else 0.0,
+        'max_drawdown': float(np.max(1 - equity / peaks)) if n else 0.0,
+        'trades': len(trades),
+        'win_rate': float(np.mean(pnls > 0)) if len(pnls) else 0.0,
+        'stop_losses': sum(trade['reason'] == 'stop_loss' for trade in trades),
+    }
+    return {'trades': trades, 'equity': equity, 'stats': stats}
+
+
+def run_backtest(
+    data: pd.DataFrame,
+    params: Dict[str, Any],
+    initial_balance: float = 1000.0,
+    fee_rate: float = 0.0006,
+    strategy_class: Type[EnvelopeStrategy] = EnvelopeStrategy,
+) -> BacktestResult:
+    """
+    Backtests an envelope configuration on OHLCV data, e.g. from fetch_recent_ohlcv or OHLCVStore.read_dataframe.
+    The average and bands come from `strategy_class.compute_signals`, so they match the live strategy.
+    """
+    signals = strategy_class(params, None).compute_signals(data)
+    envelopes = range(1, len(params['envelopes']) + 1)
+    result = simulate(
+        signals['high'].to_numpy(dtype=np.float64),
+        signals['low'].to_numpy(dtype=np.float64),
+        signals['close'].to_numpy(dtype=np.float64),
+        signals['average'].to_numpy(dtype=np.float64),
+        np.vstack([signals[f'band_high_{i}'].to_numpy(dtype=np.float64) for i in envelopes]),
+        np.vstack([signals[f'band_low_{i}'].to_numpy(dtype=np.float64) for i in envelopes]),
+        params,
+        initial_balance,
+        fee_rate,
+    )
+    trades = pd.DataFrame(result['trades'], columns=[
+        'side', 'entry_index', 'exit_index', 'average_entry', 'exit_price', 'quantity', 'pnl', 'reason',
+    ])
+    # an empty frame has object columns, which cannot index
+    trades.insert(1, 'entry_time', signals.index[trades['entry_index'].to_numpy(dtype=np.int64)])
+    trades.insert(2, 'exit_time', signals.index[trades['exit_index'].to_numpy(dtype=np.int64)])
+    return BacktestResult(
+        trades=trades.drop(columns=['entry_index', 'exit_index']),
+        equity=result['equity'],
+        stats=result['stats'],
+    )
+
+
+def load_ohlcv(path: str) -> pd.DataFrame:
+    """Reads candles from a CSV with timestamp/open/high/low/close/volume columns (ms timestamps)."""
+    return ohlcv_to_dataframe(pd.read_csv(path)[['timestamp', 'open', 'high', 'low', 'close', 'volume']].to_numpy())
+
+
+if __name__ == "__main__":
+    from strategies.envelope.run import params
+
+    # --- CONFIG ---
+    params = {**params, 'symbol': 'BTC/USDT:USDT', 'timeframe': '1h'}
+    csv_path: Optional[str] = None  # e.g. 'btc_1m.csv', otherwise the candles of the local OHLCV store are used
+
+    data = load_ohlcv(csv_path) if csv_path else OHLCVStore('bitget').read_dataframe(params['symbol'], params['timeframe'])
+    start = time.perf_counter()
+    result = run_backtest(data, params)
+    print(f"{len(data)} candles backtested in {time.perf_counter() - start:.2f}s")
+    print(result.stats)
+    print(result.trades.tail(20))
@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from utilities.account_stream import AccountStream, BitgetAccountProtocol
+from utilities.bitget_futures import BitgetFutures
+from utilities.market_stream import BitgetStreamProtocol, CandleBook, MarketDataFeed
+from utilities.ohlcv_store import ohlcv_to_dataframe
+from utilities.tracker_store import SqliteTrackerStore
+from strategies.envelope.run import params, trigger_price_delta
+from strategies.envelope.strategy import EnvelopeStrategy
+
+
+# --- CONFIG ---
+key_path = 'LiveTradingBots/secret.json'
+
+# one exchange session per key name, shared by every symbol of that account
+accounts = {
+    'envelope': [
+        {**params, 'symbol': 'BTC/USDT:USDT'},
+        {**params, 'symbol': 'ETH/USDT:USDT'},
+        # {**params, 'symbol': 'SOL/USDT:USDT', 'timeframe': '15m', 'trigger_price_delta': 0.0015},
+    ],
+}
+
+stream = True  # run each symbol as soon as the WebSocket stream closes its candle, False polls the REST API on a timer
+stream_url = None  # None for Bitget, 'ws://127.0.0.1:8765' for a local utilities/market_stream_stub.py
+account_stream_url = None  # None for Bitget; with the stream, the private stream of each account keeps its orders and positions
+history = 100  # closed candles handed to each run
+candle_close_delay = 5  # without the stream: seconds to wait after the candle close so the exchange has the closed candle
+markets_reload_interval = 24 * 60 * 60  # seconds
+# the trackers of every symbol in one SQLite database, the tracker_*.json files are imported on first use; None keeps the JSON files
+tracker_db = 'LiveTradingBots/code/strategies/envelope/trackers.sqlite'
+
+
+def next_candle_close(timeframe, now_ms):
+    timeframe_ms = BitgetFutures.timeframe_to_milliseconds[timeframe]
+    return (now_ms // timeframe_ms + 1) * timeframe_ms
+
+
+def run_step(strategy, ohlcv=None):
+    try:
+        strategy.step(ohlcv)
+    except Exception:
+        # one failing symbol must not stop the others
+        print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ {strategy.symbol} run failed")
+        traceback.print_exc()
+
+
+def reload_markets(sessions):
+    for key_name, bitget in sessions.items():
+        try:
+            bitget.reload_markets()
+        except Exception as e:
+            print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ markets reload failed for account {key_name}: {e}")
+
+
+def run_polling(sessions, strategies):
+    markets_loaded_at = time.time()
+    now_ms = int(time.time() * 1000)
+    next_runs = [next_candle_close(strategy.params['timeframe'], now_ms) for strategy in strategies]
+
+    while True:
+        wake_up = min(next_runs) / 1000 + candle_close_delay
+        time.sleep(max(0, wake_up - time.time()))
+
+        if time.time() - markets_loaded_at >= markets_reload_interval:
+            reload_markets(sessions)
+            markets_loaded_at = time.time()
+
+        now_ms = int(time.time() * 1000)
+        for i, strategy in enumerate(strategies):
+            if next_runs[i] > now_ms:
+                continue
+            run_step(strategy)
+            next_runs[i] = next_candle_close(strategy.params['timeframe'], int(time.time() * 1000))
+
+
+def seed_book(book, bitget, symbol, timeframe):
+    # the REST download tops up the candle store, whose closed candles then start the in-memory book
+    bitget.fetch_recent_ohlcv(symbol, timeframe, history)
+    book.seed(symbol, timeframe, bitget.ohlcv_store.read(symbol, timeframe)[-history:])
+
+
+async def run_streaming(sessions, strategies, account_streams):
+    feed = MarketDataFeed(BitgetStreamProtocol(stream_url), CandleBook(max_candles=history))
+    by_candles = {}
+    for strategy in strategies:
+        by_candles.setdefault((strategy.symbol, strategy.params['timeframe']), []).append(strategy)
+    for (symbol, timeframe), symbol_strategies in by_candles.items():
+        feed.subscribe_candles(symbol, timeframe)
+        seed_book(feed.book, symbol_strategies[0].exchange, symbol, timeframe)
+
+    loop = asyncio.get_running_loop()
+    # the runs place orders over REST one at a time, off the event loop so the stream keeps being read
+    executor = ThreadPoolExecutor(max_workers=1)
+    markets_loaded_at = time.time()
+
+    def run_close(event, candles):
+        nonlocal markets_loaded_at
+        if time.time() - markets_loaded_at >= markets_reload_interval:
+            reload_markets(sessions)
+            markets_loaded_at = time.time()
+        symbol_strategies = by_candles[(event.symbol, event.timeframe)]
+        bitget = symbol_strategies[0].exchange
+        print(f"{datetime.now().strftime('%H:%M:%S')}: {event.symbol} {event.timeframe} candle closed, {(time.time() - event.received_at) * 1000:.0f}ms ago")
+        if candles is None:
+            # candles missed by the stream, e.g. during a reconnect: the runs download them
+            ohlcv = None
+        else:
+            bitget.ohlcv_store.append(event.symbol, event.timeframe, [event.candle])
+            ohlcv = ohlcv_to_dataframe(candles)
+        for strategy in symbol_strategies:
+            run_step(strategy, ohlcv)
+        if candles is None:
+            closed = bitget.ohlcv_store.read(event.symbol, event.timeframe)[-history:].copy()
+            loop.call_soon_threadsafe(feed.book.seed, event.symbol, event.timeframe, closed)
+
+    def on_candle_close(event):
+        # the candles are copied on the event loop, the book keeps changing while the run is queued
+        candles = feed.book.candles(event.symbol, event.timeframe, history) if event.contiguous else None
+        loop.run_in_executor(executor, run_close, event, candles)
+
+    def handle_order(order):
+        for strategy in strategies:
+            if strategy.symbol == order['symbol']:
+                try:
+                    strategy.handle_order(order)
+                except Exception:
+                    print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ {strategy.symbol} order update failed")
+                    traceback.print_exc()
+
+    feed.on_candle_close(on_candle_close)
+    for account_stream in account_streams.values():
+        # queued behind the runs, which rewrite the same trackers
+        account_stream.on_order(lambda order: loop.run_in_executor(executor, handle_order, order))
+    try:
+        await asyncio.gather(feed.run(), *[account_stream.run() for account_stream in account_streams.values()])
+    finally:
+        executor.shutdown(wait=True)
+
+
+def main():
+    # --- AUTHENTICATION, paid once for the whole process ---
+    print(f"{datetime.now().strftime('%H:%M:%S')}: >>> starting envelope daemon")
+    with open(key_path, "r") as f:
+        keys = json.load(f)
+    sessions = {
+        key_name: BitgetFutures(keys[key_name], markets_refresh='background', ohlcv_store=True)
+        for key_name in accounts
+    }
+
+    account_streams = {
+        key_name: AccountStream(BitgetAccountProtocol(keys[key_name], account_stream_url))
+        for key_name in accounts
+    } if stream else {}
+    trackers = SqliteTrackerStore(tracker_db) if tracker_db else None
+
+    # --- RUN EVERY SYMBOL AT ITS CANDLE CLOSE ---
+    strategies = [
+        EnvelopeStrategy(
+            symbol_params,
+            sessions[key_name],
+            trigger_price_delta=symbol_params.get('trigger_price_delta', trigger_price_delta),
+            incremental_average=True,
+            account=account_streams[key_name].state if stream else None,
+            tracker=trackers.tracker(
+                f"{key_name}/{symbol_params['symbol']}", legacy_file=EnvelopeStrategy.default_tracker_file(symbol_params['symbol'])
+            ) if trackers else None,
+        )
+        for key_name, symbols in accounts.items() for symbol_params in symbols
+    ]
+    for strategy in strategies:
+        print(f"{datetime.now().strftime('%H:%M:%S')}: scheduled {strategy.symbol} {strategy.params['timeframe']}")
+
+    if stream:
+        asyncio.run(run_streaming(sessions, strategies, account_streams))
+    else:
+        run_polling(sessions, strategies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+import time
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from utilities import indicators
+from utilities.account_snapshot import AccountSnapshot
+from utilities.incremental_indicators import update_from_store
+from utilities.order_reconciler import reconcile_orders
+from utilities.tracker_store import JsonTracker
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass
+class Ladder:
+    """Entry orders of a step, one rung per (side, envelope), with their exit and stop loss."""
+    sides: np.ndarray  # 1 long, -1 short
+    envelopes: np.ndarray  # envelope index, 0-based
+    prices: np.ndarray  # entry limit price, on the band
+    trigger_prices: np.ndarray
+    stop_loss_prices: np.ndarray
+    amounts: np.ndarray
+    tradable: np.ndarray  # False where the amount is below the exchange minimum or the price is not usable
+    exit_price: float  # the average, shared by every rung
+
+    def orders(self, symbol: str, **common: Any) -> List[Dict[str, Any]]:
+        """
+        place_orders_bulk specs of the tradable rungs: entry, exit and stop loss for each, in this order.
+        `common` is merged into every spec, e.g. stop_price_type for KuCoin.
+        """
+        orders = []
+        columns = (self.sides, self.prices, self.trigger_prices, self.stop_loss_prices, self.amounts)
+        for side, price, trigger_price, stop_loss_price, amount in zip(*(column[self.tradable].tolist() for column in columns)):
+            entry_side, close_side = ('buy', 'sell') if side == 1 else ('sell', 'buy')
+            spec = {**common, 'symbol': symbol, 'amount': amount}
+            orders += [
+                {**spec, 'type': 'trigger_limit', 'side': entry_side, 'trigger_price': trigger_price, 'price': price},
+                {**spec, 'type': 'trigger_market', 'side': close_side, 'trigger_price': self.exit_price, 'reduce': True},
+                {**spec, 'type': 'trigger_market', 'side': close_side, 'trigger_price': stop_loss_price, 'reduce': True},
+            ]
+        return orders
+
+
+class EnvelopeStrategy():
+    def __init__(
+        self,
+        params: Dict[str, Any],
+        exchange: Any,
+        tracker_file: Optional[str] = None,
+        trigger_price_delta: float = 0.005,
+        incremental_average: bool = False,
+        account: Optional[Any] = None,
+        tracker: Optional[Any] = None,
+    ) -> None:
+        """
+        Envelope strategy for one symbol: a moving average with bands at fixed distances, a trigger limit
+        entry on each band, an exit at the average and a stop loss per entry.
+
+        Args:
+            params (Dict[str, Any]): Strategy parameters, see the CONFIG section of envelope/run.py.
+            exchange (Any): An authenticated exchange client, e.g. BitgetFutures.
+            tracker_file (Optional[str]): JSON file keeping the state between two steps.
+                                          Defaults to tracker_{symbol}.json in the Bitget strategy folder.
+            trigger_price_delta (float): Distance between the trigger and the limit price of entry orders,
+                                         0.005 fits a 1h timeframe, 0.0015 a 15m timeframe.
+            incremental_average (bool): When the exchange keeps an OHLCV store, update the average of the last
+                                        candle from a state persisted next to the store instead of recomputing
+                                        it over the fetched window. The EMA is then seeded at the start of the
+                                        stored history rather than at the start of the window.
+            account (Optional[Any]): AccountState of the same account kept by an AccountStream, that handle_order
+                                     is called with. The positions are then read from it, and the stop loss
+                                     fills it recorded replace the closed trigger orders download, as long as
+                                     the stream stayed in sync since the previous step.
+            tracker (Optional[Any]): Where the state is kept instead of tracker_file, e.g. a tracker of a
+                                     SqliteTrackerStore shared by the symbols of a daemon.
+        """
+        self.params = params
+        self.exchange = exchange
+        self.symbol = params['symbol']
+        self.tracker_file = tracker_file or self.default_tracker_file(self.symbol)
+        self.tracker = tracker or JsonTracker(self.tracker_file, indent=self.tracker_indent)
+        self.trigger_price_delta = trigger_price_delta
+        self.incremental_average = incremental_average
+        self.account = account
+        self._last_step_at: Optional[float] = None
+        self._snapshot: Optional[AccountSnapshot] = None  # of the running step
+
+    @staticmethod
+    def default_tracker_file(symbol: str) -> str:
+        return f"LiveTradingBots/code/strategies/envelope/tracker_{symbol.replace('/', '-').replace(':', '-')}.json"
+
+    # --- TRACKER FILE ---
+    tracker_indent: Optional[int] = None
+
+    def read_tracker(self) -> Dict[str, Any]:
+        return self.tracker.read()
+
+    def update_tracker(self, data: Dict[str, Any]) -> None:
+        # written atomically: a crash mid-write leaves the previous state
+        self.tracker.write(data)
+
+    def _ensure_tracker(self) -> None:
+        if not self.tracker.exists():
+            self.update_tracker({"status": "ok_to_trade", "last_side": None, "stop_loss_ids": []})
+
+    # --- INDICATORS ---
+    def compute_average(self, data: 'pd.DataFrame') -> 'pd.Series':
+        import pandas as pd  # the DataFrame already loaded it, this only binds the name
+
+        period = self.params['average_period']
+        if 'DCM' == self.params['average_type']:
+            average = indicators.donchian_middle(data['high'].to_numpy(dtype=np.float64), data['low'].to_numpy(dtype=np.float64), period)
+        elif 'SMA' == self.params['average_type']:
+            average = indicators.sma(data['close'].to_numpy(dtype=np.float64), period)
+        elif 'EMA' == self.params['average_type']:
+            average = indicators.ema(data['close'].to_numpy(dtype=np.float64), period)
+        elif 'WMA' == self.params['average_type']:
+            average = indicators.wma(data['close'].to_numpy(dtype=np.float64), period)
+        else:
+            raise ValueError(f"The average type {self.params['average_type']} is not supported")
+        return pd.Series(average, index=data.index)
+
+    @staticmethod
+    def envelope_bands(average: Any, envelope: Any) -> Tuple[Any, Any]:
+        """(band_high, band_low) of one envelope for a Series or an array of averages, or of an array of envelopes."""
+        return average / (1 - envelope), average * (1 - envelope)
+
+    def compute_signals(self, data: 'pd.DataFrame') -> 'pd.DataFrame':
+        """Returns a copy of the OHLCV data with the 'average' column and the band_high_i / band_low_i columns."""
+        data = data.copy()
+        data['average'] = self.compute_average(data)
+        for i, e in enumerate(self.params['envelopes']):
+            data[f'band_high_{i + 1}'], data[f'band_low_{i + 1}'] = self.envelope_bands(data['average'], e)
+        return data
+
+    def compute_latest_signals(self, data: 'pd.DataFrame') -> 'pd.DataFrame':
+        """
+        Returns a copy of the OHLCV data with the 'average' column, which is all a step reads besides the
+        closes: the band prices of the last row come from build_ladder. With `incremental_average`, only the
+        last row gets its average, unless the store does not end at that row.
+        """
+        data = data.copy()
+        store = getattr(self.exchange, 'ohlcv_store', None)
+        if self.incremental_average and store is not None and not data.empty:
+            timestamp, average = update_from_store(
+                store, self.symbol, self.params['timeframe'], self.params['average_type'], self.params['average_period'],
+            )
+            if timestamp == data.index[-1].value // 1_000_000:
+                data['average'] = np.nan
+                data.iloc[-1, data.columns.get_loc('average')] = average
+                return data
+        data['average'] = self.compute_average(data)
+        return data
+
+    def build_ladder(
+        self,
+        average: float,
+        long_envelopes: Sequence[int],
+        short_envelopes: Sequence[int],
+        order_value: float,
+        min_amount: float = 0.0,
+        contract_size: float = 1.0,
+        integer_amounts: bool = False,
+    ) -> Ladder:
+        """
+        Computes the band, trigger and stop loss prices and the amounts of every requested envelope of both
+        sides at once from the latest average.
+
+        Args:
+            average (float): Average of the last closed candle, also the exit price.
+            long_envelopes, short_envelopes (Sequence[int]): 0-based indexes of the envelopes to place per side.
+            order_value (float): Notional of each entry, in USDT.
+            min_amount (float): Smallest tradable amount; smaller rungs are marked not tradable.
+            contract_size (float): Amounts are expressed in contracts of this size.
+            integer_amounts (bool): Round the amounts down to whole contracts.
+        """
+        envelopes = np.asarray(self.params['envelopes'], dtype=np.float64)
+        indexes = np.r_[np.asarray(long_envelopes, dtype=int), np.asarray(short_envelopes, dtype=int)]
+        sides = np.r_[np.ones(len(long_envelopes), dtype=int), -np.ones(len(short_envelopes), dtype=int)]
+        band_highs, band_lows = self.envelope_bands(average, envelopes[indexes])
+        prices = np.where(sides == 1, band_lows, band_highs)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            amounts = order_value / (prices * contract_size)
+        if integer_amounts:
+            amounts = np.floor(amounts)
+        usable = np.isfinite(amounts) & (prices > 0)
+        return Ladder(
+            sides=sides,
+            envelopes=indexes,
+            prices=prices,
+            trigger_prices=prices * (1 + sides * self.trigger_price_delta),
+            stop_loss_prices=prices * (1 - sides * self.params['stop_loss_pct']),
+            amounts=amounts,
+            tradable=usable & (amounts >= min_amount) & (amounts > 0),
+            exit_price=float(average),
+        )
+
+    # --- ONE RUN ---
+    def step(self, ohlcv: Optional['pd.DataFrame'] = None) -> None:
+        """
+        Runs the strategy once, typically right after a candle close.
+
+        Args:
+            ohlcv (Optional[pd.DataFrame]): The closed candles up to the one that just closed, e.g. from a
+                                            MarketDataFeed. Fetched from the exchange when None.
+        """
+        print(f"\n{datetime.now().strftime('%H:%M:%S')}: >>> starting execution for {self.symbol}")
+        self._ensure_tracker()
+        # every order update since the previous step went through handle_order
+        in_sync = self.account is not None and self._last_step_at is not None and self.account.synced_before(self._last_step_at)
+        self._last_step_at = time.time()
+
+        # everything the run reads from the account, in one concurrent burst
+        parts = ['open_orders', 'trigger_orders', 'balance']
+        if self.account is None or self.account.open_positions(self.symbol) is None:
+            parts.append('positions')
+        if not in_sync and self.read_tracker().get('stop_loss_ids'):
+            parts.append('closed_trigger_orders')
+        self._snapshot = AccountSnapshot(self.exchange, self.symbol).fetch(*parts)
+
+        live_orders = self._fetch_live_orders()
+        long_orders_left, short_orders_left = self._entries_left(live_orders)
+
+        if ohlcv is None:
+            ohlcv = self.exchange.fetch_recent_ohlcv(self.symbol, self.params['timeframe'], 100).iloc[:-1]
+            print(f"{datetime.now().strftime('%H:%M:%S')}: ohlcv data fetched")
+        data = self.compute_latest_signals(ohlcv)
+
+        self._check_stop_loss(in_sync)
+        closed_doubles = self._close_double_positions()
+        position = self._fetch_position(fresh=closed_doubles)
+        self._check_price_jump(data, position)
+        if not self._ok_to_trade(data):
+            self._reconcile_orders([], live_orders)
+            return
+
+        if position is None:
+            if not live_orders:
+                # Bitget refuses a margin mode change while orders are open, they were placed under the current one
+                self.exchange.set_margin_mode(self.symbol, margin_mode=self.params['margin_mode'])
+            self.exchange.set_leverage(self.symbol, margin_mode=self.params['margin_mode'], leverage=self.params['leverage'])
+            info = {
+                "status": "ok_to_trade",
+                "last_side": self.read_tracker()['last_side'],
+                "stop_loss_ids": [],
+            }
+            orders = []
+        else:
+            info, orders = self._position_orders(data, position)
+
+        balance = self.params['balance_fraction'] * self.params['leverage'] * self._snapshot.balance()['USDT']['total']
+        print(f"{datetime.now().strftime('%H:%M:%S')}: the trading balance is {balance}")
+
+        orders += self._entry_orders(data, position, balance, long_orders_left, short_orders_left)
+        info["stop_loss_ids"] += self._reconcile_orders(orders, live_orders)
+        self._snapshot.invalidate('trigger_orders')
+        self.update_tracker(info)
+        print(f"{datetime.now().strftime('%H:%M:%S')}: <<< all done")
+
+    def _fetch_live_orders(self) -> List[Dict[str, Any]]:
+        # the limit order of a triggered entry that did not fill is not part of the ladder, it is cancelled
+        orders = self._snapshot.open_orders()
+        if orders:
+            self.exchange.cancel_orders_bulk([order['id'] for order in orders], self.symbol)
+            self._snapshot.invalidate('open_orders')
+        return self._snapshot.trigger_orders()
+
+    def _entries_left(self, trigger_orders: List[Dict[str, Any]]) -> Tuple[int, int]:
+        long_orders_left = 0
+        short_orders_left = 0
+        for order in trigger_orders:
+            if order['side'] == 'buy' and order['info']['tradeSide'] == 'open':
+                long_orders_left += 1
+            elif order['side'] == 'sell' and order['info']['tradeSide'] == 'open':
+                short_orders_left += 1
+        print(f"{datetime.now().strftime('%H:%M:%S')}: {len(trigger_orders)} trigger orders open, {long_orders_left} longs left, {short_orders_left} shorts left")
+        return long_orders_left, short_orders_left
+
+    @staticmethod
+    def _live_order_spec(order: Dict[str, Any]) -> Dict[str, Any]:
+        """The place_orders_bulk spec an open trigger order was placed from, with its 'id'."""
+        reduce = order['info'].get('tradeSide') == 'close'
+        side = order['side']
+        if reduce and not order.get('reduceOnly'):
+            # hedge mode close orders carry the side of their position, ccxt only swaps it back when it reads reduceOnly
+            side = 'sell' if side == 'buy' else 'buy'
+        return {
+            'id': order['id'],
+            'symbol': order['symbol'],
+            'type': f"trigger_{order['type']}",
+            'side': side,
+            'amount': float(order['amount']),
+            'trigger_price': order.get('triggerPrice'),
+            'price': order.get('price'),
+            'reduce': reduce,
+        }
+
+    def _reconcile_orders(self, orders: List[Tuple[str, Dict[str, Any]]], live_orders: List[Dict[str, Any]]) -> List[str]:
+        """
+        Brings the open trigger orders to `orders`, (label, place_orders_bulk spec) pairs, sending only the
+        difference: the orders already open on the same tick and lot are kept, the ones whose band moved are
+        modified, the rest is placed or cancelled. Returns the IDs of the stop losses (see _is_stop_loss).
+        """
+        labels = [label for label, _ in orders]
+        specs = [spec for _, spec in orders]
+        live_specs = [self._live_order_spec(order) for order in live_orders]
+        can_amend = hasattr(self.exchange, 'edit_orders_bulk')
+        plan = reconcile_orders(specs, live_specs, self.exchange.precisions, amend=can_amend)
+
+        order_ids = {i: live['id'] for i, live in plan.keep}
+        to_place = list(plan.place)
+        to_cancel = list(plan.cancel)
+        if plan.amend:
+            edits = [{**specs[i], 'id': live['id']} for i, live in plan.amend]
+            for (i, live), result in zip(plan.amend, self.exchange.edit_orders_bulk(edits)):
+                if result['error']:
+                    # e.g. the order triggered in the meantime: replaced the usual way
+                    print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ {labels[i]} not modified: {result['error']}")
+                    to_place.append(i)
+                    to_cancel.append(live)
+                    continue
+                order_ids[i] = result['order']['id']
+                print(f"{datetime.now().strftime('%H:%M:%S')}: modified {labels[i]}")
+
+        # stale entries go before the new ones are placed, and a failure stops the run rather than doubling them
+        self.exchange.cancel_orders_bulk([live['id'] for live in to_cancel if not live['reduce']], self.symbol, trigger=True)
+        to_place.sort()
+        for i, result in zip(to_place, self.exchange.place_orders_bulk([specs[i] for i in to_place])):
+            if result['error']:
+                print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ {labels[i]} not placed: {result['error']}")
+                continue
+            order_ids[i] = result['order']['id']
+            print(f"{datetime.now().strftime('%H:%M:%S')}: placed {labels[i]}")
+        # stale exits and stop losses only once their replacements are open
+        stale_closes = [live['id'] for live in to_cancel if live['reduce']]
+        try:
+            self.exchange.cancel_orders_bulk(stale_closes, self.symbol, trigger=True)
+        except Exception as e:
+            # still open and still unwanted at the next run, which cancels them then
+            print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ {e}")
+
+        print(f"{datetime.now().strftime('%H:%M:%S')}: orders reconciled, {len(plan.keep)} kept, {len(plan.amend)} modified, {len(plan.place)} placed, {len(plan.cancel)} cancelled, {plan.requests} order requests")
+        return [order_ids[i] for i in sorted(order_ids) if self._is_stop_loss(labels[i])]
+
+    @staticmethod
+    def _is_stop_loss(label: str) -> bool:
+        return label.startswith('sl ')
+
+    def handle_order(self, order: Dict[str, Any]) -> None:
+        """Order update of the account stream: a stop loss fill is recorded in the tracker as it happens."""
+        if order['symbol'] != self.symbol or not order['trigger'] or order['status'] != 'closed':
+            return
+        self._ensure_tracker()
+        if order['id'] in self.read_tracker().get('stop_loss_ids', []):
+            self._record_stop_loss(order['info']['posSide'])
+
+    def _record_stop_loss(self, side: str) -> None:
+        self.update_tracker({
+            "last_side": side,
+            "status": "stop_loss_triggered",
+            "stop_loss_ids": [],
+        })
+        print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ stop loss was triggered")
+
+    def _check_stop_loss(self, in_sync: bool = False) -> None:
+        if in_sync:
+            return  # handle_order recorded any stop loss fill
+        stop_loss_ids = self.read_tracker().get('stop_loss_ids', [])
+        if not stop_loss_ids:
+            return
+        # any of the stop losses, not only the last closed trigger order: the cancelled orders are closed ones too
+        triggered = [
+            order for order in self._snapshot.closed_trigger_orders()
+            if order['id'] in stop_loss_ids and order['status'] == 'closed'
+        ]
+        if triggered:
+            self._record_stop_loss(triggered[-1]['info']['posSide'])
+
+    def _open_positions(self, fresh: bool = False) -> List[Dict[str, Any]]:
+        # from the account stream when it knows them, unless they just changed through a REST call
+        positions = None if fresh or self.account is None else self.account.open_positions(self.symbol)
+        return self._snapshot.positions() if positions is None else positions
+
+    def _close_double_positions(self) -> bool:
+        positions = self._open_positions()
+        if len(positions) < 2:
+            return False
+        sorted_positions = sorted(positions, key=lambda x: x['timestamp'], reverse=True)
+        for pos in sorted_positions[1:]:
+            self.exchange.flash_close_position(pos['symbol'], side=pos['side'])
+            print(f"{datetime.now().strftime('%H:%M:%S')}: double position case, closing the {pos['side']}.")
+        self._snapshot.invalidate('positions', 'balance')
+        return True
+
+    def _fetch_position(self, fresh: bool = False) -> Optional[Dict[str, Any]]:
+        positions = self._open_positions(fresh)
+        if not positions:
+            return None
+        position = positions[0]
+        print(f"{datetime.now().strftime('%H:%M:%S')}: {position['side']} position of {round(position['contracts'] * position['contractSize'],2)} ~ {round(position['contracts'] * position['contractSize'] * position['markPrice'],2)} USDT is running")
+        return position
+
+    def _check_price_jump(self, data: 'pd.DataFrame', position: Optional[Dict[str, Any]]) -> None:
+        if 'price_jump_pct' not in self.params or position is None:
+            return
+        open_price = float(position['info']['openPriceAvg'])
+        if (position['side'] == 'long' and data['close'].iloc[-1] < open_price * (1 - self.params['price_jump_pct'])) or (
+                position['side'] == 'short' and data['close'].iloc[-1] > open_price * (1 + self.params['price_jump_pct'])):
+            self.exchange.flash_close_position(self.symbol)
+            self._snapshot.invalidate('positions', 'balance')
+            self.update_tracker({
+                "last_side": position['side'],
+                "status": "close_all_triggered",
+                "stop_loss_ids": [],
+            })
+            print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ close all was triggered")
+
+    def _ok_to_trade(self, data: 'pd.DataFrame') -> bool:
+        tracker_info = self.read_tracker()
+        print(f"{datetime.now().strftime('%H:%M:%S')}: okay to trade check, status was {tracker_info['status']}")
+        last_price = data['close'].iloc[-1]
+        resume_price = data['average'].iloc[-1]
+        if tracker_info['status'] == "ok_to_trade":
+            return True
+        if ('long' == tracker_info['last_side'] and last_price >= resume_price) or (
+                'short' == tracker_info['last_side'] and last_price <= resume_price):
+            self.update_tracker({"status": "ok_to_trade", "last_side": tracker_info['last_side']})
+            print(f"{datetime.now().strftime('%H:%M:%S')}: status is now ok_to_trade")
+            return True
+        print(f"{datetime.now().strftime('%H:%M:%S')}: <<< status is still {tracker_info['status']}")
+        return False
+
+    def _position_orders(self, data: 'pd.DataFrame', position: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple[str, Dict[str, Any]]]]:
+        """The tracker info and the labelled exit and stop loss orders of the running position."""
+        if position['side'] == 'long':
+            close_side = 'sell'
+            stop_loss_price = float(position['info']['openPriceAvg']) * (1 - self.params['stop_loss_pct'])
+        elif position['side'] == 'short':
+            close_side = 'buy'
+            stop_loss_price = float(position['info']['openPriceAvg']) * (1 + self.params['stop_loss_pct'])
+
+        amount = position['contracts'] * position['contractSize']
+        exit_price = float(data['average'].iloc[-1])
+        spec = {'symbol': self.symbol, 'type': 'trigger_market', 'side': close_side, 'amount': amount, 'reduce': True}
+        orders = [
+            (f"exit {position['side']} position trigger market order of {amount}, price {exit_price}", {**spec, 'trigger_price': exit_price}),
+            (f"sl {position['side']} position trigger market order of {amount}, price {stop_loss_price}", {**spec, 'trigger_price': stop_loss_price}),
+        ]
+        info = {
+            "status": "ok_to_trade",
+            "last_side": position['side'],
+            "stop_loss_price": stop_loss_price,
+            "stop_loss_ids": [],
+        }
+        return info, orders
+
+    def _entry_ranges(self, position: Optional[Dict[str, Any]], long_orders_left: int, short_orders_left: int) -> Tuple[range, range]:
+        """Envelopes to (re)place: all of them without a position, only the bands not hit yet with one."""
+        envelopes_count = len(self.params['envelopes'])
+        if position is None:
+            range_longs = range(envelopes_count) if self.params['use_longs'] else range(0)
+            range_shorts = range(envelopes_count) if self.params['use_shorts'] else range(0)
+        else:
+            long_ok = 'long' == position['side'] and self.params['use_longs']
+            short_ok = 'short' == position['side'] and self.params['use_shorts']
+            range_longs = range(envelopes_count - long_orders_left, envelopes_count) if long_ok else range(0)
+            range_shorts = range(envelopes_count - short_orders_left, envelopes_count) if short_ok else range(0)
+        return range_longs, range_shorts
+
+    def _entry_orders(
+        self,
+        data: 'pd.DataFrame',
+        position: Optional[Dict[str, Any]],
+        balance: float,
+        long_orders_left: int,
+        short_orders_left: int,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """The entry, exit and stop loss ladder as labelled place_orders_bulk specs."""
+        range_longs, range_shorts = self._entry_ranges(position, long_orders_left, short_orders_left)
+        min_amount = self.exchange.fetch_min_amount_tradable(self.symbol)
+        ladder = self.build_ladder(
+            float(data['average'].iloc[-1]), range_longs, range_shorts, balance / len(self.params['envelopes']), min_amount,
+        )
+
+        labels = []
+        for side, i, price, trigger_price, sl_price, amount, tradable in zip(
+                ladder.sides.tolist(), ladder.envelopes.tolist(), ladder.prices.tolist(), ladder.trigger_prices.tolist(),
+                ladder.stop_loss_prices.tolist(), ladder.amounts.tolist(), ladder.tradable.tolist()):
+            side = 'long' if side == 1 else 'short'
+            if not tradable:
+                print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ {side} orders not placed for envelope {i+1}, amount {amount} smaller than minimum requirement {min_amount}")
+                continue
+            labels += [
+                f"open {side} trigger limit order of {amount}, trigger price {trigger_price}, price {price}",
+                f"exit {side} trigger market order of {amount}, price {ladder.exit_price}",
+                f"sl {side} trigger market order of {amount}, price {sl_price}",
+            ]
+        return list(zip(labels, ladder.orders(self.symbol)))
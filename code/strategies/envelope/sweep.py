@@ -0,0 +1,159 @@
+import os
+import sys
+import csv
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from multiprocessing import Pool, shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from strategies.envelope.backtest import simulate
+from strategies.envelope.strategy import EnvelopeStrategy
+from utilities.ohlcv_store import OHLCVStore, OHLCV_COLUMNS
+
+
+RESULT_COLUMNS = [
+    'symbol', 'average_type', 'average_period', 'envelopes', 'stop_loss_pct', 'price_jump_pct',
+    'final_equity', 'total_return', 'max_drawdown', 'trades', 'win_rate', 'stop_losses',
+]
+
+# per worker process: the shared candle arrays, attached once in _init_worker
+_candles: Dict[str, np.ndarray] = {}
+_shared_blocks: List[shared_memory.SharedMemory] = []
+_strategy_class: Type[EnvelopeStrategy] = EnvelopeStrategy
+_base_params: Dict[str, Any] = {}
+
+
+def _init_worker(layout: Dict[str, Tuple[str, Tuple[int, int]]], strategy_class: Type[EnvelopeStrategy], base_params: Dict[str, Any]) -> None:
+    global _strategy_class, _base_params
+    for symbol, (name, shape) in layout.items():
+        block = shared_memory.SharedMemory(name=name)
+        _shared_blocks.append(block)  # keeps the mapping alive for the lifetime of the worker
+        _candles[symbol] = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+    _strategy_class = strategy_class
+    _base_params = base_params
+
+
+@lru_cache(maxsize=32)
+def _average(symbol: str, average_type: str, average_period: int) -> np.ndarray:
+    """Indicator of one (symbol, average_type, average_period), computed once per worker."""
+    params = {**_base_params, 'symbol': symbol, 'average_type': average_type, 'average_period': average_period}
+    data = pd.DataFrame(_candles[symbol][:, 1:5], columns=OHLCV_COLUMNS[1:5])
+    return _strategy_class(params, None).compute_average(data).to_numpy(dtype=np.float64)
+
+
+def _run_task(task: Tuple[str, str, int, List[Dict[str, Any]]]) -> List[List[Any]]:
+    symbol, average_type, average_period, configs = task
+    candles = _candles[symbol]
+    average = _average(symbol, average_type, average_period)
+    rows = []
+    for config in configs:
+        params = {**_base_params, 'symbol': symbol, 'average_type': average_type, 'average_period': average_period, **config}
+        bands = [_strategy_class.envelope_bands(average, e) for e in params['envelopes']]
+        stats = simulate(
+            candles[:, 2], candles[:, 3], candles[:, 4], average,
+            np.vstack([band[0] for band in bands]), np.vstack([band[1] for band in bands]),
+            params,
+        )['stats']
+        rows.append([
+            symbol, average_type, average_period, '/'.join(str(e) for e in params['envelopes']),
+            params['stop_loss_pct'], params.get('price_jump_pct'),
+        ] + [stats[column] for column in RESULT_COLUMNS[6:]])
+    return rows
+
+
+def _tasks(symbols: List[str], grid: Dict[str, List[Any]], chunk_size: int) -> Iterator[Tuple[str, str, int, List[Dict[str, Any]]]]:
+    """One task per chunk of configs sharing a (symbol, average_type, average_period), so the indicator is reused."""
+    config_keys = [key for key in grid if key not in ('average_type', 'average_period')]
+    configs = [dict(zip(config_keys, values)) for values in itertools.product(*(grid[key] for key in config_keys))]
+    for config in configs:
+        if config.get('price_jump_pct') is None:
+            config.pop('price_jump_pct', None)
+    for symbol, average_type, average_period in itertools.product(symbols, grid['average_type'], grid['average_period']):
+        for start in range(0, len(configs), chunk_size):
+            yield symbol, average_type, average_period, configs[start:start + chunk_size]
+
+
+def run_sweep(
+    data: Dict[str, pd.DataFrame],
+    grid: Dict[str, List[Any]],
+    base_params: Dict[str, Any],
+    results_path: str,
+    processes: Optional[int] = None,
+    chunk_size: int = 64,
+    strategy_class: Type[EnvelopeStrategy] = EnvelopeStrategy,
+) -> int:
+    """
+    Backtests every combination of `grid` on every symbol of `data` with a pool of worker processes.
+
+    The candles of each symbol are copied once into shared memory, and the workers attach to them
+    instead of receiving pickled DataFrames. Each task groups the configs sharing an (average_type,
+    average_period), so a worker computes each indicator once. Results are appended to a CSV file
+    as tasks complete, so a long sweep can be followed, or interrupted, without losing finished rows.
+
+    Args:
+        data (Dict[str, pd.DataFrame]): OHLCV DataFrames per symbol, as returned by fetch_recent_ohlcv.
+        grid (Dict[str, List[Any]]): Values to try, keyed by strategy parameter, e.g. 'average_type',
+                                     'average_period', 'envelopes', 'stop_loss_pct' and 'price_jump_pct'
+                                     (None meaning disabled). 'average_type' and 'average_period' are required.
+        base_params (Dict[str, Any]): Remaining strategy parameters, see envelope/run.py.
+        results_path (str): CSV file receiving one row per (symbol, config).
+        processes (Optional[int]): Number of worker processes. Defaults to all cores.
+        chunk_size (int): Configs per task.
+        strategy_class (Type[EnvelopeStrategy]): Strategy providing the indicator and band formulas.
+
+    Returns:
+        int: Number of result rows written.
+    """
+    blocks = []
+    layout = {}
+    try:
+        for symbol, df in data.items():
+            candles = np.column_stack([df.index.as_unit('ms').asi8, df[OHLCV_COLUMNS[1:]].to_numpy(dtype=np.float64)]).astype(np.float64)
+            block = shared_memory.SharedMemory(create=True, size=max(candles.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(candles.shape, dtype=np.float64, buffer=block.buf)[:] = candles
+            layout[symbol] = (block.name, candles.shape)
+
+        written = 0
+        with open(results_path, 'w', newline='') as file, Pool(
+            processes or os.cpu_count(), initializer=_init_worker, initargs=(layout, strategy_class, base_params)
+        ) as pool:
+            writer = csv.writer(file)
+            writer.writerow(RESULT_COLUMNS)
+            for rows in pool.imap_unordered(_run_task, _tasks(list(data), grid, chunk_size)):
+                writer.writerows(rows)
+                file.flush()
+                written += len(rows)
+        return written
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+if __name__ == "__main__":
+    from strategies.envelope.run import params
+
+    # --- CONFIG ---
+    symbols = ['BTC/USDT:USDT', 'ETH/USDT:USDT']
+    timeframe = '1h'
+    grid = {
+        'average_type': ['DCM', 'SMA', 'EMA', 'WMA'],
+        'average_period': [5, 10, 20, 50],
+        'envelopes': [[0.05, 0.08, 0.11], [0.07, 0.11, 0.14], [0.1, 0.15, 0.2]],
+        'stop_loss_pct': [0.1, 0.2, 0.4],
+        'price_jump_pct': [None, 0.3],
+    }
+    results_path = 'envelope_sweep.csv'
+
+    store = OHLCVStore('bitget')
+    data = {symbol: store.read_dataframe(symbol, timeframe) for symbol in symbols}
+    start = time.perf_counter()
+    rows = run_sweep(data, grid, params, results_path)
+    print(f"{rows} backtests in {time.perf_counter() - start:.1f}s, results in {results_path}")
+    print(pd.read_csv(results_path).sort_values('total_return', ascending=False).head(20))
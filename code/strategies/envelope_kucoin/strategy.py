@@ -0,0 +1,456 @@
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from strategies.envelope.strategy import EnvelopeStrategy
+from utilities.account_snapshot import AccountSnapshot
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class KucoinEnvelopeStrategy(EnvelopeStrategy):
+    def __init__(
+        self,
+        params: Dict[str, Any],
+        exchange: Any,
+        tracker_file: Optional[str] = None,
+        trigger_price_delta: float = 0.005,
+        tracker: Optional[Any] = None,
+    ) -> None:
+        """
+        KuCoin Futures flavour of the envelope strategy: amounts in integer contracts, bands at
+        average * (1 +/- envelope), configurable stop price type and no new entries while a position is open.
+
+        Args:
+            params (Dict[str, Any]): Strategy parameters, see the CONFIG section of envelope_kucoin/run.py.
+            exchange (Any): An authenticated KucoinFutures client.
+            tracker_file (Optional[str]): JSON file keeping the state between two steps.
+                                          Defaults to tracker_{symbol}.json next to this file.
+            trigger_price_delta (float): Distance between the trigger and the limit price of entry orders.
+            tracker (Optional[Any]): Where the state is kept instead of tracker_file, see EnvelopeStrategy.
+        """
+        super().__init__(params, exchange, tracker_file, trigger_price_delta, tracker=tracker)
+        # False when the last step stopped on an error that needs attention, for run.py's exit status
+        self.last_step_ok = True
+
+    @staticmethod
+    def default_tracker_file(symbol: str) -> str:
+        return os.path.join(os.path.dirname(__file__), f"tracker_{symbol.replace('/', '-').replace(':', '-')}.json")
+
+    # --- TRACKER FILE ---
+    tracker_indent = 4
+
+    def read_tracker(self) -> Dict[str, Any]:
+        try:
+            return self.tracker.read()
+        except Exception as e:
+            print(f"ERROR reading tracker file {self.tracker_file}: {e}")
+            # Return a default state to prevent crashing, but log the error
+            return {"status": "error_reading_tracker", "last_side": None, "stop_loss_ids": []}
+
+    def update_tracker(self, data: Dict[str, Any]) -> None:
+        try:
+            self.tracker.write(data)
+        except Exception as e:
+            print(f"ERROR writing tracker file {self.tracker_file}: {e}")
+
+    def _ensure_tracker(self) -> None:
+        if not self.tracker.exists():
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Tracker file not found, creating: {self.tracker_file}")
+            self.update_tracker({"status": "ok_to_trade", "last_side": None, "stop_loss_ids": []})
+
+    # --- INDICATORS ---
+    @staticmethod
+    def envelope_bands(average: Any, envelope: float) -> Tuple[Any, Any]:
+        return average * (1 + envelope), average * (1 - envelope)
+
+    def compute_signals(self, data: 'pd.DataFrame') -> 'pd.DataFrame':
+        """
+        Returns a copy of the OHLCV data with the 'average' and band columns, without the rows
+        where the average is not defined yet.
+        """
+        if len(data) < self.params['average_period']:
+            raise ValueError(f"Not enough data for the {self.params['average_type']} average")
+        data = data.copy()
+        data['average'] = self.compute_average(data)
+
+        # Drop rows with NaN in 'average' created by the indicator calculation
+        data.dropna(subset=['average'], inplace=True)
+        if data.empty:
+            raise ValueError("No valid data left after calculating average and dropping NaNs.")
+
+        for i, e in enumerate(self.params['envelopes']):
+            data[f'band_high_{i + 1}'], data[f'band_low_{i + 1}'] = self.envelope_bands(data['average'], e)
+        return data
+
+    # --- ONE RUN ---
+    def step(self, ohlcv: Optional['pd.DataFrame'] = None) -> None:
+        """
+        Runs the strategy once, typically right after a candle close. Sets last_step_ok to False if the
+        run stopped on an error that needs attention (runs that end early because trading is paused are ok).
+
+        Args:
+            ohlcv (Optional[pd.DataFrame]): The closed candles up to the one that just closed, e.g. from a
+                                            MarketDataFeed. Fetched from the exchange when None.
+        """
+        self.last_step_ok = self._step(ohlcv)
+
+    def _step(self, ohlcv: Optional['pd.DataFrame']) -> bool:
+        print(f"\n{datetime.now().strftime('%H:%M:%S')}: >>> Starting KuCoin execution for {self.symbol}")
+        contract_size = self.exchange.markets[self.symbol]['contractSize']
+        self._ensure_tracker()
+
+        # everything the run reads from the account, in one concurrent burst
+        parts = ['open_orders', 'trigger_orders', 'positions', 'balance']
+        if self.read_tracker().get('stop_loss_ids'):
+            parts.append('closed_trigger_orders')
+        self._snapshot = AccountSnapshot(self.exchange, self.symbol).fetch(*parts)
+
+        live_orders = self._fetch_live_orders()
+        if live_orders is None:
+            return False
+        self._reconciled = False
+        try:
+            return self._run(contract_size, live_orders, ohlcv)
+        finally:
+            if not self._reconciled:
+                # the run stopped before deciding on its orders: none is kept, as when they were all cancelled up front
+                self._cancel_trigger_orders(live_orders)
+
+    def _run(self, contract_size: float, live_orders: List[Dict[str, Any]], ohlcv: Optional['pd.DataFrame']) -> bool:
+        try:
+            if ohlcv is None:
+                print(f"{datetime.now().strftime('%H:%M:%S')}: Fetching OHLCV data...")
+                # Fetch 100 periods + average_period for indicator calculation, then drop the last (incomplete) candle
+                fetch_limit = 100 + self.params['average_period']
+                ohlcv = self.exchange.fetch_recent_ohlcv(self.symbol, self.params['timeframe'], limit=fetch_limit).iloc[:-1]
+            if ohlcv.empty or len(ohlcv) < self.params['average_period']:
+                raise ValueError(f"Insufficient OHLCV data ({len(ohlcv)} closed candles) for timeframe {self.params['timeframe']}")
+
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Calculating indicators ({self.params['average_type']} {self.params['average_period']})...")
+            data = self.compute_signals(ohlcv)
+            print(f"{datetime.now().strftime('%H:%M:%S')}: OHLCV data processed. Last close: {data['close'].iloc[-1]}, Last avg: {data['average'].iloc[-1]}")
+        except Exception as e:
+            print(f"ERROR fetching or processing OHLCV data: {e}")
+            return False
+
+        if self.read_tracker()['status'] == "error_reading_tracker":
+            print("ERROR: Cannot proceed due to tracker file read error.")
+            return False
+
+        self._check_stop_loss()
+
+        try:
+            positions = self._close_double_positions()
+        except Exception as e:
+            print(f"ERROR checking or closing multiple positions: {e}")
+            return False
+
+        position = None
+        if positions:
+            if len(positions) > 1:
+                print(f"Warning: {len(positions)} positions remain after cleanup attempt. Cannot proceed with single position logic.")
+                return False
+            position = positions[0]
+            position_value_usdt = abs(float(position.get('contracts', 0)) * float(contract_size) * float(position.get('markPrice', 0)))
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Position found: Side: {position.get('side', 'N/A')}, Contracts: {position.get('contracts', 0)}, Entry: {position.get('entryPrice', 0)}, Mark: {position.get('markPrice', 0)}, Value: ~{position_value_usdt:.2f} USDT")
+        else:
+            print(f"{datetime.now().strftime('%H:%M:%S')}: No open position found for {self.symbol}.")
+
+        try:
+            self._check_price_jump(data, position)
+            if position is not None and not self._snapshot.positions():
+                print(f"{datetime.now().strftime('%H:%M:%S')}: Position closed via price jump trigger. Exiting script run.")
+                return True
+        except Exception as e:
+            print(f"ERROR closing position after price jump detection: {e}")
+            return False
+        if not self._ok_to_trade(data):
+            return True
+
+        if position is None:
+            if not live_orders:
+                # orders placed under the current margin mode may block changing it
+                self._set_margin_mode_and_leverage()
+            return self._place_entry_orders(data, contract_size, live_orders)
+        return self._place_position_orders(data, position, live_orders)
+
+    # --- ORDERS ---
+    def _fetch_live_orders(self) -> Optional[List[Dict[str, Any]]]:
+        """Cancels the regular orders and returns the open trigger orders, or None when they could not be read."""
+        try:
+            # Cancel regular limit orders first (if any were manually placed or leftover)
+            orders = self._snapshot.open_orders()
+            if orders:
+                print(f"Cancelling regular order IDs: {[order['id'] for order in orders]}")
+                self.exchange.cancel_orders_bulk([order['id'] for order in orders], self.symbol)
+                # their margin is free again; untriggered stop orders hold none
+                self._snapshot.invalidate('open_orders', 'balance')
+        except Exception as e:
+            print(f"ERROR during order cancellation: {e}")
+        try:
+            return self._snapshot.trigger_orders()
+        except Exception as e:
+            # without them, placing the ladder could double the orders still open
+            print(f"ERROR fetching open trigger orders: {e}")
+            return None
+
+    @staticmethod
+    def _live_order_spec(order: Dict[str, Any]) -> Dict[str, Any]:
+        """The place_orders_bulk spec an open stop order was placed from, with its 'id'."""
+        return {
+            'id': order['id'],
+            'symbol': order['symbol'],
+            'type': f"trigger_{order['type']}",
+            'side': order['side'],
+            'amount': float(order['amount']),
+            'trigger_price': order.get('triggerPrice'),
+            'price': order.get('price'),
+            'reduce': bool(order.get('reduceOnly', order.get('info', {}).get('reduceOnly', False))),
+        }
+
+    @staticmethod
+    def _is_stop_loss(label: str) -> bool:
+        return ' SL Order' in label
+
+    def _reconcile_orders(self, orders: List[Tuple[str, Dict[str, Any]]], live_orders: List[Dict[str, Any]]) -> List[str]:
+        self._reconciled = True
+        stop_loss_ids = super()._reconcile_orders(orders, live_orders)
+        self._snapshot.invalidate('trigger_orders')
+        return stop_loss_ids
+
+    def _cancel_trigger_orders(self, live_orders: List[Dict[str, Any]]) -> None:
+        if not live_orders:
+            return
+        print(f"Cancelling trigger order IDs: {[order['id'] for order in live_orders]}")
+        try:
+            self.exchange.cancel_orders_bulk([order['id'] for order in live_orders], self.symbol, trigger=True)
+        except Exception as e:
+            print(f"Warning: Failed to cancel trigger orders: {e}")
+        self._snapshot.invalidate('trigger_orders')
+
+    def _check_stop_loss(self) -> None:
+        tracker_info = self.read_tracker()
+        try:
+            # Only check if we previously had stop loss orders tracked
+            if not tracker_info.get('stop_loss_ids'):
+                return
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Checking for triggered stop losses (tracked IDs: {tracker_info['stop_loss_ids']})...")
+            closed_orders = self._snapshot.closed_trigger_orders()
+            for order in reversed(closed_orders or []): # Check newest first
+                if order['id'] in tracker_info['stop_loss_ids']:
+                    print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ Stop loss ID {order['id']} found in closed orders.")
+                    # Infer position side from the side of the triggered SL order
+                    last_position_side = 'long' if order['side'] == 'sell' else 'short'
+                    self.update_tracker({
+                        "last_side": last_position_side,
+                        "status": "stop_loss_triggered",
+                        "stop_loss_ids": [],
+                    })
+                    print(f"{datetime.now().strftime('%H:%M:%S')}: Status updated to stop_loss_triggered (inferred position: {last_position_side}).")
+                    return
+            print(f"{datetime.now().strftime('%H:%M:%S')}: No tracked stop loss IDs found among recent closed trigger orders.")
+        except Exception as e:
+            print(f"Warning: Failed to check closed trigger orders: {e}")
+
+    def _close_double_positions(self) -> List[Dict[str, Any]]:
+        """Closes all but the latest position of the symbol and returns the positions left open."""
+        print(f"{datetime.now().strftime('%H:%M:%S')}: Checking open positions...")
+        positions = self._snapshot.positions()
+        if len(positions) <= 1:
+            return positions
+
+        print(f"Warning: Found {len(positions)} open positions for {self.symbol}. Attempting to close older ones.")
+        sorted_positions = sorted(positions, key=lambda p: p.get('timestamp', p.get('info', {}).get('openTm', 0)), reverse=True)
+        latest_position = sorted_positions[0]
+        print(f"Keeping latest position: Side {latest_position.get('side')}, Contracts {latest_position.get('contracts')}")
+        for pos in sorted_positions[1:]:
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Double position case. Closing older position: Side {pos.get('side')}, Contracts {pos.get('contracts')}")
+            try:
+                self.exchange.close_position(pos['symbol'])
+            except Exception as e_close:
+                print(f"ERROR closing older position (Side: {pos.get('side')}): {e_close}")
+        self._snapshot.invalidate('positions', 'balance')
+        return self._snapshot.positions()
+
+    def _check_price_jump(self, data: 'pd.DataFrame', position: Optional[Dict[str, Any]]) -> None:
+        if 'price_jump_pct' not in self.params or position is None:
+            return
+        print(f"{datetime.now().strftime('%H:%M:%S')}: Checking for price jump closure...")
+        last_close_price = data['close'].iloc[-1]
+        entry_price = float(position.get('entryPrice', 0))
+        pos_side = position.get('side')
+        should_close = False
+
+        if entry_price == 0:
+            print("Warning: Cannot check price jump, entry price is zero.")
+        elif pos_side == 'long':
+            close_threshold = entry_price * (1 - self.params['price_jump_pct'])
+            if last_close_price < close_threshold:
+                print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ Price jump detected for LONG. Close: {last_close_price} < Threshold: {close_threshold}")
+                should_close = True
+        elif pos_side == 'short':
+            close_threshold = entry_price * (1 + self.params['price_jump_pct'])
+            if last_close_price > close_threshold:
+                print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ Price jump detected for SHORT. Close: {last_close_price} > Threshold: {close_threshold}")
+                should_close = True
+
+        if not should_close:
+            return
+        print(f"{datetime.now().strftime('%H:%M:%S')}: Closing position due to price jump...")
+        self.exchange.close_position(self.symbol)
+        self._snapshot.invalidate('positions', 'balance')
+        self.update_tracker({
+            "last_side": pos_side,
+            "status": "close_all_triggered",
+            "stop_loss_ids": [],
+        })
+
+    def _ok_to_trade(self, data: 'pd.DataFrame') -> bool:
+        tracker_info = self.read_tracker() # Re-read in case it was updated by SL check
+        print(f"{datetime.now().strftime('%H:%M:%S')}: Okay to trade check, status was '{tracker_info.get('status', 'unknown')}'")
+        last_price = data['close'].iloc[-1]
+        resume_price = data['average'].iloc[-1]
+
+        if tracker_info.get('status') == "ok_to_trade":
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Status is 'ok_to_trade'. Proceeding.")
+            return True
+
+        print(f"Current Status: {tracker_info.get('status')}. Last Side: {tracker_info.get('last_side')}. Last Price: {last_price}. Resume Price (Avg): {resume_price}")
+        if tracker_info.get('last_side') == 'long' and last_price >= resume_price:
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Price crossed above average after long SL/close. Resuming trading.")
+        elif tracker_info.get('last_side') == 'short' and last_price <= resume_price:
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Price crossed below average after short SL/close. Resuming trading.")
+        else:
+            print(f"{datetime.now().strftime('%H:%M:%S')}: <<< Conditions not met to resume trading. Status remains '{tracker_info.get('status')}'. Exiting.")
+            return False
+        self.update_tracker({"status": "ok_to_trade", "last_side": tracker_info.get('last_side'), "stop_loss_ids": []})
+        return True
+
+    def _set_margin_mode_and_leverage(self) -> None:
+        try:
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Setting margin mode to '{self.params['margin_mode']}' and leverage to {self.params['leverage']}x for {self.symbol}...")
+            # Set margin mode first (important for KuCoin)
+            self.exchange.set_margin_mode(self.symbol, margin_mode=self.params['margin_mode'])
+            self.exchange.set_leverage(self.symbol, leverage=self.params['leverage'])
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Margin mode and leverage set.")
+        except Exception as e:
+            print(f"Warning: Failed to set margin mode or leverage: {e}. Check KuCoin account state.")
+
+    def _place_position_orders(self, data: 'pd.DataFrame', position: Dict[str, Any], live_orders: List[Dict[str, Any]]) -> bool:
+        print(f"{datetime.now().strftime('%H:%M:%S')}: Managing Take Profit (TP) and Stop Loss (SL) for open {position.get('side')} position...")
+        entry_price = float(position.get('entryPrice', 0))
+        if entry_price == 0:
+            print("ERROR: Cannot set TP/SL because entry price is zero. Exiting.")
+            return False
+
+        # TP at the current average, SL based on the entry price
+        take_profit_price = data['average'].iloc[-1]
+        if position.get('side') == 'long':
+            close_side = 'sell'
+            stop_loss_price = entry_price * (1 - self.params['stop_loss_pct'])
+        elif position.get('side') == 'short':
+            close_side = 'buy'
+            stop_loss_price = entry_price * (1 + self.params['stop_loss_pct'])
+        else:
+            print(f"ERROR: Unknown position side '{position.get('side')}'. Cannot set TP/SL.")
+            return False
+
+        current_stop_loss_ids = []
+        amount_contracts = abs(float(position.get('contracts', 0)))
+        if amount_contracts == 0:
+            print("Warning: Position size is zero, cannot place TP/SL.")
+        else:
+            print(f"Placing TP/SL for {amount_contracts} contracts. TP Trigger: {take_profit_price}, SL Trigger: {stop_loss_price}")
+            orders = [
+                (f"{position.get('side').capitalize()} Position {kind} Order (Trigger: {trigger_price:.4f})", {
+                    'symbol': self.symbol,
+                    'type': 'trigger_market',
+                    'side': close_side,
+                    'amount': amount_contracts,
+                    'trigger_price': trigger_price,
+                    'reduce': True,
+                    'stop_price_type': self.params['stop_price_type'],
+                })
+                for kind, trigger_price in (('TP', take_profit_price), ('SL', stop_loss_price))
+            ]
+            try:
+                # the entry ladder is cancelled, the TP and SL kept while the position and average stay put
+                current_stop_loss_ids = self._reconcile_orders(orders, live_orders)
+            except Exception as e:
+                print(f"ERROR placing TP/SL orders: {e}")
+
+        self.update_tracker({
+            "status": "ok_to_trade",
+            "last_side": position.get('side'),
+            "stop_loss_price": stop_loss_price, # Store calculated SL price for reference
+            "stop_loss_ids": current_stop_loss_ids, # Track only the SL IDs placed *now*
+        })
+        return True
+
+    def _place_entry_orders(self, data: 'pd.DataFrame', contract_size: float, live_orders: List[Dict[str, Any]]) -> bool:
+        print(f"{datetime.now().strftime('%H:%M:%S')}: No open position. Placing new entry, TP, and SL orders...")
+        try:
+            balance_data = self._snapshot.balance()
+            available_balance = float(balance_data.get('USDT', {}).get('free', 0)) # Use free balance
+            if available_balance <= 0:
+                raise ValueError("Insufficient free USDT balance (0 or less).")
+
+            total_usdt_for_trades = available_balance * self.params['balance_fraction']
+            usdt_per_order = total_usdt_for_trades / len(self.params['envelopes'])
+            print(f"{datetime.now().strftime('%H:%M:%S')}: Available Balance: {available_balance:.2f} USDT. Total for strategy: {total_usdt_for_trades:.2f} USDT. USDT per envelope: {usdt_per_order:.2f}")
+
+            min_amount_contracts = self.exchange.fetch_min_amount_tradable(self.symbol)
+            print(f"Minimum order size: {min_amount_contracts} contracts.")
+
+            # Every envelope without a position: the entries still open are kept by the reconciliation, not skipped
+            ranges = {}
+            if self.params['use_longs']:
+                ranges['long'] = range(len(self.params['envelopes']))
+            if self.params['use_shorts']:
+                ranges['short'] = range(len(self.params['envelopes']))
+
+            # Prices and amounts of every envelope of both sides at once, then only the orders not open yet in one burst
+            ladder = self.build_ladder(
+                float(data['average'].iloc[-1]),
+                ranges.get('long', range(0)),
+                ranges.get('short', range(0)),
+                usdt_per_order,
+                min_amount_contracts,
+                contract_size=contract_size,
+                integer_amounts=True,  # KuCoin requires integer contracts
+            )
+            for side, indexes in ranges.items():
+                print(f"--- Preparing {side.upper()} Orders (Envelopes {list(r+1 for r in indexes)}) ---")
+
+            ladder_labels = []
+            for side, i, price, trigger_price, sl_price, amount, tradable in zip(
+                    ladder.sides.tolist(), ladder.envelopes.tolist(), ladder.prices.tolist(), ladder.trigger_prices.tolist(),
+                    ladder.stop_loss_prices.tolist(), ladder.amounts.tolist(), ladder.tradable.tolist()):
+                side = 'long' if side == 1 else 'short'
+                if price <= 0 or contract_size <= 0:
+                    print(f"Warning: Invalid price ({price}) or contract size ({contract_size}) for {side} envelope {i+1}. Skipping.")
+                    continue
+                print(f"{side.capitalize()} Env {i+1}: Limit: {price:.4f}, Trigger: {trigger_price:.4f}, Contracts: {amount:.0f}")
+                if not tradable:
+                    print(f"  Skipping {side.capitalize()} Env {i+1}: Calculated amount {amount:.0f} < min {min_amount_contracts}")
+                    continue
+                ladder_labels += [
+                    f"{side.capitalize()} Env {i+1} Entry Order",
+                    f"{side.capitalize()} Env {i+1} TP Order (Trigger: {ladder.exit_price:.4f})",
+                    f"{side.capitalize()} Env {i+1} SL Order (Trigger: {sl_price:.4f})",
+                ]
+            ladder_orders = ladder.orders(self.symbol, stop_price_type=self.params['stop_price_type'])
+
+            current_stop_loss_ids = self._reconcile_orders(list(zip(ladder_labels, ladder_orders)), live_orders)
+
+            # Update tracker file with the SL IDs placed for the new potential entries
+            self.update_tracker({
+                "status": "ok_to_trade",
+                "last_side": self.read_tracker().get('last_side'), # Keep last side until a position is actually entered
+                "stop_loss_ids": current_stop_loss_ids,
+            })
+        except Exception as e:
+            print(f"ERROR during balance fetching or new order placement: {e}")
+        return True
@@ -0,0 +1,83 @@
+from typing import Any, Callable, Dict, List
+
+from utilities.parallel_fetch import run_concurrently
+
+
+class AccountSnapshot():
+    def __init__(self, exchange: Any, symbol: str, max_workers: int = 4) -> None:
+        """
+        What one run knows of its account: the positions, balance, open orders and open and closed trigger
+        orders of one symbol. Each part is fetched once, the first ones together in one concurrent burst, and
+        read from here by every check of the run instead of asking the exchange again. An action of the run
+        invalidates the parts it changed, and only those are fetched again when next read.
+
+            snapshot = AccountSnapshot(bitget, 'BTC/USDT:USDT').fetch('positions', 'balance', 'open_orders')
+            positions = snapshot.positions()
+            bitget.flash_close_position('BTC/USDT:USDT')
+            snapshot.invalidate('positions', 'balance')
+
+        Args:
+            exchange (Any): An exchange wrapper, e.g. BitgetFutures or KucoinFutures.
+            symbol (str): The symbol of the run.
+            max_workers (int): Maximum number of requests in flight in fetch().
+        """
+        self.exchange = exchange
+        self.symbol = symbol
+        self.max_workers = max_workers
+        self._fetchers: Dict[str, Callable[[], Any]] = {
+            'positions': lambda: exchange.fetch_open_positions(symbol),
+            'balance': lambda: exchange.fetch_balance(),
+            'open_orders': lambda: exchange.fetch_open_orders(symbol),
+            'trigger_orders': lambda: exchange.fetch_open_trigger_orders(symbol),
+            'closed_trigger_orders': lambda: exchange.fetch_closed_trigger_orders(symbol),
+        }
+        self._parts: Dict[str, Any] = {}  # part: result, or the exception its fetch raised
+
+    def fetch(self, *parts: str) -> 'AccountSnapshot':
+        """
+        Fetches the `parts` not known yet concurrently. A failed fetch is raised when its part is read,
+        where the run handles the errors of that request.
+        """
+        missing = [part for part in dict.fromkeys(parts) if part not in self._parts]
+        for part in missing:
+            if part not in self._fetchers:
+                raise ValueError(f"Unknown account part {part}, expected one of {list(self._fetchers)}")
+        # spaced like the wrappers' own bursts, 0 when their rate limiter spaces the requests
+        results = run_concurrently(
+            lambda part: self._fetchers[part](),
+            missing,
+            self.max_workers,
+            getattr(self.exchange, '_request_spacing_ms', 0),
+            return_exceptions=True,
+        )
+        self._parts.update(zip(missing, results))
+        return self
+
+    def invalidate(self, *parts: str) -> None:
+        """Forgets `parts`, e.g. the positions after closing one, so the next read fetches them again."""
+        for part in parts:
+            self._parts.pop(part, None)
+
+    def _get(self, part: str) -> Any:
+        if part not in self._parts:
+            self._parts[part] = self._fetchers[part]()
+        result = self._parts[part]
+        if isinstance(result, Exception):
+            del self._parts[part]  # the next read tries again
+            raise result
+        return result
+
+    def positions(self) -> List[Dict[str, Any]]:
+        return self._get('positions')
+
+    def balance(self) -> Dict[str, Any]:
+        return self._get('balance')
+
+    def open_orders(self) -> List[Dict[str, Any]]:
+        return self._get('open_orders')
+
+    def trigger_orders(self) -> List[Dict[str, Any]]:
+        return self._get('trigger_orders')
+
+    def closed_trigger_orders(self) -> List[Dict[str, Any]]:
+        return self._get('closed_trigger_orders')
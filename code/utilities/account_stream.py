@@ -0,0 +1,248 @@
+import hmac
+import json
+import time
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from utilities.market_stream import RECONNECT_BACKOFF, WebSocketStream
+from utilities.retry import RetryPolicy
+
+
+# Bitget order and trigger order statuses, parsed as ccxt parses those of the REST API
+BITGET_ORDER_STATUSES = {
+    'new': 'open', 'init': 'open', 'live': 'open', 'not_trigger': 'open', 'executing': 'open',
+    'partial_fill': 'open', 'partially_fill': 'open', 'partially_filled': 'open',
+    'filled': 'closed', 'full_fill': 'closed', 'triggered': 'closed', 'executed': 'closed',
+    'cancel': 'canceled', 'canceled': 'canceled', 'cancelled': 'canceled',
+    'fail_trigger': 'rejected', 'fail_execute': 'rejected',
+}
+
+
+class AccountState():
+    def __init__(self, max_orders: int = 10000) -> None:
+        """
+        Orders and positions of one account as pushed by its private stream, in the layout of the ccxt
+        REST results the strategies already read ('id', 'symbol', 'status', 'side', 'info', ...).
+
+        The stream updates it on the event loop while the strategies read it from their threads, hence
+        the lock. Positions are unknown (None) until the stream pushed them after (re)connecting, and
+        `synced_since` tells from when no event can have been missed.
+
+        Args:
+            max_orders (int): Orders kept, the least recently updated are dropped first.
+        """
+        self.max_orders = max_orders
+        self.synced_since: Optional[float] = None  # time.time() since which the stream has been subscribed without a break
+        self._lock = threading.Lock()
+        self._orders: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._positions: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+    def subscribed(self) -> None:
+        with self._lock:
+            self.synced_since = time.time()
+
+    def disconnected(self) -> None:
+        with self._lock:
+            self.synced_since = None
+            self._positions = None
+
+    def synced_before(self, timestamp: float) -> bool:
+        """Whether every event since `timestamp` (time.time()) was received."""
+        with self._lock:
+            return self.synced_since is not None and self.synced_since <= timestamp
+
+    def apply_order(self, order: Dict[str, Any]) -> None:
+        with self._lock:
+            self._orders[order['id']] = order
+            self._orders.move_to_end(order['id'])
+            while len(self._orders) > self.max_orders:
+                self._orders.popitem(last=False)
+
+    def apply_positions(self, positions: List[Dict[str, Any]]) -> None:
+        """Replaces the open positions with `positions`, all the open positions of the account."""
+        by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+        for position in positions:
+            by_symbol.setdefault(position['symbol'], []).append(position)
+        with self._lock:
+            self._positions = by_symbol
+
+    def order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._orders.get(order_id)
+
+    def orders(self, symbol: str, status: Optional[str] = None, trigger: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Orders of `symbol` seen by the stream, oldest update first, optionally of one ccxt status and kind."""
+        with self._lock:
+            return [
+                order for order in self._orders.values()
+                if order['symbol'] == symbol
+                and (status is None or order['status'] == status)
+                and (trigger is None or order['trigger'] == trigger)
+            ]
+
+    def open_positions(self, symbol: str) -> Optional[List[Dict[str, Any]]]:
+        """The open positions of `symbol`, like fetch_open_positions, or None when the stream does not know them."""
+        with self._lock:
+            if self._positions is None:
+                return None
+            return list(self._positions.get(symbol, []))
+
+
+class BitgetAccountProtocol():
+    """Bitget private WebSocket API: login, then the order, trigger order and position channels of one product."""
+    url = 'wss://ws.bitget.com/v2/ws/private'
+    ping_interval = 25.0
+    channels = ('orders', 'orders-algo', 'positions')
+
+    def __init__(self, api_setup: Dict[str, Any], url: Optional[str] = None, inst_type: str = 'USDT-FUTURES') -> None:
+        """
+        Args:
+            api_setup (Dict[str, Any]): The 'apiKey', 'secret' and 'password' of secret.json, as for BitgetFutures.
+            url (Optional[str]): Stream URL, e.g. of a local market_stream_stub.
+            inst_type (str): Bitget product type of the channels.
+        """
+        self.api_setup = api_setup
+        self.url = url or self.url
+        self.inst_type = inst_type
+
+    def login_message(self) -> Dict[str, Any]:
+        timestamp = str(int(time.time()))
+        digest = hmac.new(self.api_setup['secret'].encode(), f"{timestamp}GET/user/verify".encode(), hashlib.sha256).digest()
+        return {'op': 'login', 'args': [{
+            'apiKey': self.api_setup['apiKey'],
+            'passphrase': self.api_setup['password'],
+            'timestamp': timestamp,
+            'sign': base64.b64encode(digest).decode(),
+        }]}
+
+    def subscribe_messages(self) -> List[Any]:
+        return [{'op': 'subscribe', 'args': [
+            {'instType': self.inst_type, 'channel': channel, 'instId': 'default'} for channel in self.channels
+        ]}]
+
+    def ping_message(self) -> Any:
+        return 'ping'
+
+    @staticmethod
+    def symbol(inst_id: str) -> str:
+        # 'BTCUSDT' -> 'BTC/USDT:USDT', the ccxt symbol of a USDT margined contract
+        if inst_id.endswith('USDT'):
+            return f"{inst_id[:-4]}/USDT:USDT"
+        return inst_id
+
+    def _order(self, item: Dict[str, Any], trigger: bool) -> Dict[str, Any]:
+        return {
+            'id': item['orderId'],
+            'clientOrderId': item.get('clientOid'),
+            'symbol': self.symbol(item['instId']),
+            'status': BITGET_ORDER_STATUSES.get(item.get('status'), item.get('status')),
+            'side': item.get('side'),
+            'trigger': trigger,
+            'timestamp': int(item.get('uTime') or item.get('cTime') or 0),
+            'info': item,
+        }
+
+    def _position(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': item.get('posId'),
+            'symbol': self.symbol(item['instId']),
+            'side': item.get('holdSide'),
+            'contracts': float(item.get('total') or 0),
+            'contractSize': 1.0,  # USDT margined Bitget contracts are counted in the base coin
+            'entryPrice': float(item['openPriceAvg']) if item.get('openPriceAvg') else None,
+            'markPrice': float(item['markPrice']) if item.get('markPrice') else None,
+            'timestamp': int(item.get('cTime') or 0),
+            'info': item,
+        }
+
+    def parse(self, message: str) -> List[Tuple[Any, ...]]:
+        """('login',), ('subscribed', arg), ('order', order) and ('positions', all open positions) items."""
+        if message == 'pong':
+            return []
+        payload = json.loads(message)
+        event = payload.get('event')
+        if event == 'error':
+            raise ValueError(f"Bitget stream error {payload.get('code')}: {payload.get('msg')}")
+        if event == 'login':
+            return [('login',)]
+        if event == 'subscribe':
+            return [('subscribed', payload.get('arg'))]
+        channel, data = (payload.get('arg') or {}).get('channel'), payload.get('data') or []
+        if channel in ('orders', 'orders-algo'):
+            return [('order', self._order(item, channel == 'orders-algo')) for item in data]
+        if channel == 'positions':
+            # every push holds all the open positions of the product, none once they are all closed
+            return [('positions', [self._position(item) for item in data if float(item.get('total') or 0)])]
+        return []
+
+
+class AccountStream(WebSocketStream):
+    name = 'account stream'
+
+    def __init__(
+        self,
+        protocol: BitgetAccountProtocol,
+        state: Optional[AccountState] = None,
+        reconnect_backoff: RetryPolicy = RECONNECT_BACKOFF,
+        login_timeout: float = 10.0,
+    ) -> None:
+        """
+        Private WebSocket connection of one account keeping an AccountState up to date with every order,
+        trigger order and position update, and calling the order callbacks as they arrive, e.g. to record
+        a stop loss fill at once instead of finding it in the closed orders at the next run.
+
+            stream = AccountStream(BitgetAccountProtocol(api_setup))
+            stream.on_order(lambda order: print(order['id'], order['status']))
+            await stream.run()
+
+        Args:
+            protocol (BitgetAccountProtocol): Exchange message format, credentials and URL.
+            state (Optional[AccountState]): Where the orders and positions are kept.
+            reconnect_backoff (RetryPolicy): Delays between reconnection attempts.
+            login_timeout (float): Seconds to wait for the login answer.
+        """
+        super().__init__(protocol, reconnect_backoff)
+        self.state = state or AccountState()
+        self.login_timeout = login_timeout
+        self._pending_subscriptions = 0
+        self._order_callbacks: List[Callable[[Dict[str, Any]], Any]] = []
+        self._positions_callbacks: List[Callable[[List[Dict[str, Any]]], Any]] = []
+
+    def on_order(self, callback: Callable[[Dict[str, Any]], Any]) -> None:
+        """`callback(order)` runs on the event loop, a coroutine is awaited: hand slow work to an executor."""
+        self._order_callbacks.append(callback)
+
+    def on_positions(self, callback: Callable[[List[Dict[str, Any]]], Any]) -> None:
+        self._positions_callbacks.append(callback)
+
+    async def _on_connect(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        # the private channels only accept subscriptions once logged in
+        await ws.send_json(self.protocol.login_message())
+        message = await ws.receive(timeout=self.login_timeout)
+        if message.type != aiohttp.WSMsgType.TEXT or ('login',) not in self.protocol.parse(message.data):
+            raise ValueError(f"Unexpected answer to the login: {message.data}")
+        subscriptions = self.protocol.subscribe_messages()
+        self._pending_subscriptions = sum(len(subscription['args']) for subscription in subscriptions)
+        for subscription in subscriptions:
+            await ws.send_json(subscription)
+
+    def _on_disconnect(self) -> None:
+        self.state.disconnected()
+
+    async def _handle(self, message: str) -> None:
+        for item in self.protocol.parse(message):
+            if item[0] == 'subscribed':
+                self._pending_subscriptions -= 1
+                if self._pending_subscriptions == 0:
+                    self.state.subscribed()
+            elif item[0] == 'order':
+                self.state.apply_order(item[1])
+                await self._dispatch(self._order_callbacks, item[1])
+            elif item[0] == 'positions':
+                self.state.apply_positions(item[1])
+                await self._dispatch(self._positions_callbacks, item[1])
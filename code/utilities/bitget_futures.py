@@ -1,11 +1,36 @@
 import ccxt
 import time
-import pandas as pd
-from typing import Any, Optional, Dict, List
+from typing import TYPE_CHECKING, Any, Optional, Dict, List, Tuple
+
+from utilities.markets_cache import MarketsCache, DEFAULT_MARKETS_TTL
+from utilities.ohlcv_store import OHLCVStore, ohlcv_to_dataframe
+from utilities.parallel_fetch import fetch_pages_concurrently, run_concurrently
+from utilities.precision import MarketPrecisions, orders_to_precision
+from utilities.rate_limiter import rate_limit_ccxt
+from utilities.retry import DEFAULT_RETRY_POLICY, ClientOrderIds, RetryPolicy, call_with_retries, is_retryable, retry_ccxt_reads
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class BitgetFutures():
-    def __init__(self, api_setup: Optional[Dict[str, Any]] = None) -> None:
+    bitget_fetch_limit = 200
+    cancel_batch_size = 50
+    create_batch_size = 50
+    timeframe_to_milliseconds = {
+        '1m': 60000, '5m': 300000, '15m': 900000, '30m': 1800000, '1h': 3600000, '2h': 7200000, '4h': 14400000, '1d': 86400000,
+    }
+
+    def __init__(
+        self,
+        api_setup: Optional[Dict[str, Any]] = None,
+        markets_cache: bool = True,
+        markets_ttl: float = DEFAULT_MARKETS_TTL,
+        markets_refresh: str = 'auto',
+        ohlcv_store: bool = False,
+        rate_limiter: bool = True,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    ) -> None:
 
         if api_setup == None:
             self.session = ccxt.bitget()
@@ -13,8 +38,38 @@ class BitgetFutures():
             api_setup.setdefault("options", {"defaultType": "future"})
             self.session = ccxt.bitget(api_setup)
 
-        self.markets = self.session.load_markets()
-  
+        self._markets_cache = MarketsCache('bitget', ttl=markets_ttl) if markets_cache else None
+        self._markets_reloaded = False
+        self.rate_limiter = rate_limit_ccxt(self.session, 'bitget') if rate_limiter else None
+        self.retry_policy = retry_policy
+        retry_ccxt_reads(self.session, retry_policy)
+        self.order_ids = ClientOrderIds()
+        self._request_spacing_ms = 0 if self.rate_limiter else self.session.rateLimit  # for run_concurrently
+        self.precisions = MarketPrecisions(self.session, self.session.precisionMode == ccxt.DECIMAL_PLACES)
+        self.markets = self._load_markets(markets_refresh)
+        self.ohlcv_store = OHLCVStore('bitget') if ohlcv_store else None
+
+    def _load_markets(self, refresh: str = 'auto') -> Dict[str, Any]:
+        if self._markets_cache is None:
+            return self.session.load_markets()
+        return self._markets_cache.load_into(self.session, refresh)
+
+    def reload_markets(self) -> Dict[str, Any]:
+        try:
+            self.markets = self._load_markets('force')
+            return self.markets
+        except Exception as e:
+            raise Exception(f"Failed to reload markets: {e}")
+
+    def _reload_markets_after_reject(self) -> bool:
+        # an order rejected while trading on cached markets may come from outdated precision/limits,
+        # reload them once per session and let the caller retry
+        if self._markets_cache is None or not self._markets_cache.from_disk or self._markets_reloaded:
+            return False
+        self._markets_reloaded = True
+        self.reload_markets()
+        return True
+
     def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
         try:
             return self.session.fetch_ticker(symbol)
@@ -29,13 +84,13 @@ class BitgetFutures():
         
     def amount_to_precision(self, symbol: str, amount: float) -> str:
         try:
-            return self.session.amount_to_precision(symbol, amount)
+            return self.precisions(symbol).amount_to_precision(amount)
         except Exception as e:
             raise Exception(f"Failed to convert amount {amount} {symbol} to precision", e)
 
     def price_to_precision(self, symbol: str, price: float) -> str:
         try:
-            return self.session.price_to_precision(symbol, price)
+            return self.precisions(symbol).price_to_precision(price)
         except Exception as e:
             raise Exception(f"Failed to convert price {price} to precision for {symbol}", e)
 
@@ -83,6 +138,35 @@ class BitgetFutures():
         except Exception as e:
             raise Exception(f"Failed to cancel the {symbol} trigger order {id}", e)
 
+    def cancel_orders_bulk(self, ids: List[str], symbol: str, trigger: bool = False, max_workers: int = 4) -> List[Dict[str, Any]]:
+        if not ids:
+            return []
+        params = {'stop': True} if trigger else {}
+        if self.session.has.get('cancelOrders'):
+            try:
+                results = []
+                for i in range(0, len(ids), self.cancel_batch_size):
+                    results.extend(self.session.cancel_orders(ids[i:i + self.cancel_batch_size], symbol, params=params))
+                return results
+            except Exception as e:
+                raise Exception(f"Failed to batch cancel the {symbol} {'trigger ' if trigger else ''}orders {ids}: {e}")
+
+        cancel = self.cancel_trigger_order if trigger else self.cancel_order
+        results = run_concurrently(lambda id: cancel(id, symbol), ids, max_workers, self._request_spacing_ms, return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise Exception(f"Failed to cancel {len(errors)} of {len(ids)} {symbol} orders: {errors}")
+        return results
+
+    def cancel_all_trigger_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        if self.session.has.get('cancelAllOrders'):
+            try:
+                return self.session.cancel_all_orders(symbol, params={'stop': True})
+            except Exception as e:
+                raise Exception(f"Failed to cancel all the {symbol} trigger orders: {e}")
+        trigger_orders = self.fetch_open_trigger_orders(symbol)
+        return self.cancel_orders_bulk([order['id'] for order in trigger_orders], symbol, trigger=True)
+
     def fetch_open_positions(self, symbol: str) -> List[Dict[str, Any]]:
         try:
             positions = self.session.fetch_positions([symbol], params={'productType': 'USDT-FUTURES', 'marginCoin': 'USDT'})
@@ -140,51 +224,102 @@ class BitgetFutures():
         except Exception as e:
             raise Exception(f"Failed to set leverage: {e}")
 
-    def fetch_recent_ohlcv(self, symbol: str, timeframe: str, limit: int = 1000) -> pd.DataFrame:
-        bitget_fetch_limit = 200
-        timeframe_to_milliseconds = {
-            '1m': 60000, '5m': 300000, '15m': 900000, '30m': 1800000, '1h': 3600000, '2h': 7200000, '4h': 14400000, '1d': 86400000,
-        }
-        end_timestamp = int(time.time() * 1000)
-        start_timestamp = end_timestamp - (limit * timeframe_to_milliseconds[timeframe])
+    def _fetch_ohlcv_page(self, symbol: str, timeframe: str, window: Tuple[int, int]) -> List[List[float]]:
+        try:
+            return self.session.fetch_ohlcv(
+                symbol,
+                timeframe,
+                params={
+                    "startTime": str(window[0]),
+                    "endTime": str(window[1]),
+                    "limit": self.bitget_fetch_limit,
+                }
+            )
+        except Exception as e:
+            raise Exception(f"Failed to fetch OHLCV data for {symbol} in timeframe {timeframe}: {e}")
+
+    def _fetch_ohlcv_window(self, symbol: str, timeframe: str, start_timestamp: int, end_timestamp: int, max_workers: int = 1) -> List[List[float]]:
+        page_milliseconds = self.bitget_fetch_limit * self.timeframe_to_milliseconds[timeframe]
+        windows = []
         current_timestamp = start_timestamp
+        while current_timestamp < end_timestamp:
+            windows.append((current_timestamp, min(current_timestamp + page_milliseconds, end_timestamp)))
+            current_timestamp += page_milliseconds + 1
+
+        if max_workers > 1 and len(windows) > 1:
+            return fetch_pages_concurrently(
+                lambda window: self._fetch_ohlcv_page(symbol, timeframe, window),
+                windows,
+                max_workers,
+                self._request_spacing_ms,
+            )
 
         ohlcv_data = []
-        while current_timestamp < end_timestamp:
-            request_end_timestamp = min(current_timestamp + (bitget_fetch_limit * timeframe_to_milliseconds[timeframe]),
-                                        end_timestamp)
-            try:
-                fetched_data = self.session.fetch_ohlcv(
-                    symbol,
-                    timeframe,
-                    params={
-                        "startTime": str(current_timestamp),
-                        "endTime": str(request_end_timestamp),
-                        "limit": bitget_fetch_limit,
-                    }
-                )
-                ohlcv_data.extend(fetched_data)
-            except Exception as e:
-                raise Exception(f"Failed to fetch OHLCV data for {symbol} in timeframe {timeframe}: {e}")
+        for window in windows:
+            ohlcv_data.extend(self._fetch_ohlcv_page(symbol, timeframe, window))
+        return ohlcv_data
+
+    def fetch_recent_ohlcv(self, symbol: str, timeframe: str, limit: int = 1000, max_workers: int = 1) -> 'pd.DataFrame':
+        end_timestamp = int(time.time() * 1000)
+        start_timestamp = end_timestamp - (limit * self.timeframe_to_milliseconds[timeframe])
+
+        if self.ohlcv_store is None:
+            ohlcv_data = self._fetch_ohlcv_window(symbol, timeframe, start_timestamp, end_timestamp, max_workers)
+        else:
+            ohlcv_data = self.ohlcv_store.top_up(
+                symbol,
+                timeframe,
+                self.timeframe_to_milliseconds[timeframe],
+                start_timestamp,
+                end_timestamp,
+                lambda since, until: self._fetch_ohlcv_window(symbol, timeframe, since, until, max_workers),
+            )
 
-            current_timestamp += (bitget_fetch_limit * timeframe_to_milliseconds[timeframe]) + 1
+        return ohlcv_to_dataframe(ohlcv_data)
 
-        df = pd.DataFrame(ohlcv_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        df.sort_index(inplace=True)
+    def _find_order_by_client_id(self, symbol: str, client_order_id: str, trigger: bool = False) -> Optional[Dict[str, Any]]:
+        # the open orders, then the closed ones, e.g. a market order filled right away
+        params = {'stop': True} if trigger else {}
+        for fetch in (self.session.fetch_open_orders, self.session.fetch_closed_orders):
+            for order in fetch(symbol, params=params):
+                if order.get('clientOrderId') == client_order_id:
+                    return order
+        return None
 
-        return df
+    def _create_order(
+        self,
+        symbol: str,
+        type: str,
+        side: str,
+        amount: str,
+        price: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        resend: bool = False,
+    ) -> Dict[str, Any]:
+        # session.create_order with a client order ID fixed before the first attempt, retried on network errors.
+        # Before a retry, or before the first attempt with `resend` (the order went out in a failed batch), the
+        # order is looked up by that ID, so one the exchange already accepted is returned instead of placed twice.
+        params = dict(params or {})
+        params.setdefault('clientOrderId', self.order_ids.next())
+        return call_with_retries(
+            lambda: self.session.create_order(symbol, type, side, amount, price, params=params),
+            f"{type} {side} order of {amount} {symbol}",
+            self.retry_policy,
+            lambda: self._find_order_by_client_id(symbol, params['clientOrderId'], 'triggerPrice' in params),
+            resend,
+        )
 
     def place_market_order(self, symbol: str, side: str, amount: float, reduce: bool = False) -> Dict[str, Any]:
         try:
             params = {
                 'reduceOnly': reduce,
             }
-            amount = self.amount_to_precision(symbol, amount)
-            return self.session.create_order(symbol, 'market', side, amount, params=params)
+            amount_str = self.amount_to_precision(symbol, amount)
+            return self._create_order(symbol, 'market', side, amount_str, params=params)
 
         except Exception as e:
+            if isinstance(e, ccxt.InvalidOrder) and self._reload_markets_after_reject():
+                return self.place_market_order(symbol, side, amount, reduce)
             raise Exception(f"Failed to place market order of {amount} {symbol}: {e}")
 
     def place_limit_order(self, symbol: str, side: str, amount: float, price: float, reduce: bool = False) -> Dict[str, Any]:
@@ -192,24 +327,28 @@ class BitgetFutures():
             params = {
                 'reduceOnly': reduce,
             }
-            amount = self.amount_to_precision(symbol, amount)
-            price = self.price_to_precision(symbol, price)
-            return self.session.create_order(symbol, 'limit', side, amount, price, params=params)
+            amount_str = self.amount_to_precision(symbol, amount)
+            price_str = self.price_to_precision(symbol, price)
+            return self._create_order(symbol, 'limit', side, amount_str, price_str, params=params)
 
         except Exception as e:
+            if isinstance(e, ccxt.InvalidOrder) and self._reload_markets_after_reject():
+                return self.place_limit_order(symbol, side, amount, price, reduce)
             raise Exception(f"Failed to place limit order of {amount} {symbol} at price {price}: {e}")
 
     def place_trigger_market_order(self, symbol: str, side: str, amount: float, trigger_price: float, reduce: bool = False, print_error: bool = False) -> Optional[Dict[str, Any]]:
         try:
-            amount = self.amount_to_precision(symbol, amount)
-            trigger_price = self.price_to_precision(symbol, trigger_price)
+            amount_str = self.amount_to_precision(symbol, amount)
+            trigger_price_str = self.price_to_precision(symbol, trigger_price)
             params = {
                 'reduceOnly': reduce,
-                'triggerPrice': trigger_price,
+                'triggerPrice': trigger_price_str,
                 'delegateType': 'price_fill',
             }
-            return self.session.create_order(symbol, 'market', side, amount, params=params)
+            return self._create_order(symbol, 'market', side, amount_str, params=params)
         except Exception as err:
+            if isinstance(err, ccxt.InvalidOrder) and self._reload_markets_after_reject():
+                return self.place_trigger_market_order(symbol, side, amount, trigger_price, reduce, print_error)
             if print_error:
                 print(err)
                 return None
@@ -218,18 +357,126 @@ class BitgetFutures():
 
     def place_trigger_limit_order(self, symbol: str, side: str, amount: float, trigger_price: float, price: float, reduce: bool = False, print_error: bool = False) -> Optional[Dict[str, Any]]:
         try:
-            amount = self.amount_to_precision(symbol, amount)
-            trigger_price = self.price_to_precision(symbol, trigger_price)
-            price = self.price_to_precision(symbol, price)
+            amount_str = self.amount_to_precision(symbol, amount)
+            trigger_price_str = self.price_to_precision(symbol, trigger_price)
+            price_str = self.price_to_precision(symbol, price)
             params = {
                 'reduceOnly': reduce,
-                'triggerPrice': trigger_price,
+                'triggerPrice': trigger_price_str,
                 'delegateType': 'price_fill',
             }
-            return self.session.create_order(symbol, 'limit', side, amount, price, params=params)
+            return self._create_order(symbol, 'limit', side, amount_str, price_str, params=params)
         except Exception as err:
+            if isinstance(err, ccxt.InvalidOrder) and self._reload_markets_after_reject():
+                return self.place_trigger_limit_order(symbol, side, amount, trigger_price, price, reduce, print_error)
             if print_error:
                 print(err)
                 return None
             else:
                 raise err
+
+    def _order_request(self, order: Dict[str, Any], precise: Dict[str, str]) -> Dict[str, Any]:
+        symbol = order['symbol']
+        order_type = order.get('type', 'limit')
+        params = {
+            'reduceOnly': order.get('reduce', False),
+            'clientOrderId': order.get('client_order_id') or self.order_ids.next(),
+        }
+        if order_type.startswith('trigger_'):
+            params['triggerPrice'] = precise['trigger_price']
+            params['delegateType'] = 'price_fill'
+        return {
+            'symbol': symbol,
+            'type': order_type.replace('trigger_', ''),
+            'side': order['side'],
+            'amount': precise['amount'],
+            'price': precise['price'] if order_type.endswith('limit') else None,
+            'params': params,
+        }
+
+    def place_orders_bulk(self, orders: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
+        # orders: [{'symbol', 'type': 'market' | 'limit' | 'trigger_market' | 'trigger_limit', 'side', 'amount', 'price', 'trigger_price', 'reduce', 'client_order_id'}]
+        # plain orders go through the batch endpoint per symbol, trigger orders (not accepted there) through concurrent requests
+        results = [{'order': None, 'error': None} for _ in orders]
+        requests = {}
+        precise_orders = orders_to_precision(orders, self.precisions)
+        for i, (order, precise) in enumerate(zip(orders, precise_orders)):
+            try:
+                if isinstance(precise, Exception):
+                    raise precise
+                requests[i] = self._order_request(order, precise)
+            except Exception as e:
+                results[i]['error'] = f"Failed to prepare order {order}: {e}"
+
+        batches = {}
+        singles = []
+        resent = set()
+        for i, request in requests.items():
+            if self.session.has.get('createOrders') and 'triggerPrice' not in request['params']:
+                batches.setdefault(request['symbol'], []).append(i)
+            else:
+                singles.append(i)
+
+        for symbol, indexes in batches.items():
+            for chunk_start in range(0, len(indexes), self.create_batch_size):
+                chunk = indexes[chunk_start:chunk_start + self.create_batch_size]
+                try:
+                    created = self.session.create_orders([requests[i] for i in chunk])
+                    for i, order in zip(chunk, created):
+                        results[i]['order'] = order
+                        if order.get('status') == 'rejected':
+                            results[i]['error'] = f"Order rejected: {order.get('info')}"
+                except Exception as e:
+                    if is_retryable(e):
+                        # the batch may have gone through in part, each order is sent again on its own
+                        resent.update(chunk)
+                        singles.extend(chunk)
+                        continue
+                    for i in chunk:
+                        results[i]['error'] = f"Failed to batch place {symbol} orders: {e}"
+
+        responses = run_concurrently(
+            lambda i: self._create_order(**requests[i], resend=i in resent), singles, max_workers, self._request_spacing_ms, return_exceptions=True
+        )
+        for i, response in zip(singles, responses):
+            if isinstance(response, Exception):
+                results[i]['error'] = f"Failed to place {requests[i]['type']} order of {requests[i]['amount']} {requests[i]['symbol']}: {response}"
+            else:
+                results[i]['order'] = response
+
+        return results
+
+    def _edit_order(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # setting the same size and prices again is harmless, so a modification is retried without a lookup
+        order = call_with_retries(
+            lambda: self.session.edit_order(
+                request['id'], request['symbol'], request['type'], request['side'], request['amount'], request['price'], params=request['params']
+            ),
+            f"edit of {request['type']} order {request['id']} {request['symbol']}",
+            self.retry_policy,
+        )
+        # the modify plan order endpoint only answers the IDs, the order keeps its ID
+        return {**order, 'id': order.get('id') or request['id']}
+
+    def edit_orders_bulk(self, orders: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
+        # orders: place_orders_bulk specs with the 'id' of the open order to modify into them, e.g. a trigger order
+        # following its band: one request per order instead of a cancel and a new order, and it stays open meanwhile
+        results = [{'order': None, 'error': None} for _ in orders]
+        requests = {}
+        for i, (order, precise) in enumerate(zip(orders, orders_to_precision(orders, self.precisions))):
+            try:
+                if isinstance(precise, Exception):
+                    raise precise
+                requests[i] = {'id': order['id'], **self._order_request(order, precise)}
+                requests[i]['params'] = {key: value for key, value in requests[i]['params'].items() if key == 'triggerPrice'}
+            except Exception as e:
+                results[i]['error'] = f"Failed to prepare the edit of order {order}: {e}"
+
+        indexes = list(requests)
+        responses = run_concurrently(lambda i: self._edit_order(requests[i]), indexes, max_workers, self._request_spacing_ms, return_exceptions=True)
+        for i, response in zip(indexes, responses):
+            if isinstance(response, Exception):
+                results[i]['error'] = f"Failed to edit the {requests[i]['symbol']} order {requests[i]['id']}: {response}"
+            else:
+                results[i]['order'] = response
+        return results
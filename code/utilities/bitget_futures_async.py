@@ -0,0 +1,473 @@
+import asyncio
+import ccxt
+import ccxt.async_support as ccxt_async
+import time
+import pandas as pd
+from typing import Any, Optional, Dict, List, Tuple
+
+from utilities.markets_cache import MarketsCache, DEFAULT_MARKETS_TTL
+from utilities.ohlcv_store import OHLCVStore, ohlcv_to_dataframe
+from utilities.parallel_fetch import stitch_ohlcv
+from utilities.precision import MarketPrecisions, orders_to_precision
+from utilities.rate_limiter import rate_limit_ccxt
+from utilities.retry import DEFAULT_RETRY_POLICY, ClientOrderIds, RetryPolicy, call_with_retries_async, is_retryable, retry_ccxt_reads
+
+
+class AsyncBitgetFutures():
+    """
+    Asyncio counterpart of BitgetFutures, built on ccxt.async_support, so independent calls can overlap:
+
+        bitget = await AsyncBitgetFutures.create(api_setup)
+        data, balance, orders = await asyncio.gather(
+            bitget.fetch_recent_ohlcv(symbol, '1h', 100),
+            bitget.fetch_balance(),
+            bitget.fetch_open_orders(symbol),
+        )
+        await bitget.close()
+    """
+    bitget_fetch_limit = 200
+    cancel_batch_size = 50
+    create_batch_size = 50
+    timeframe_to_milliseconds = {
+        '1m': 60000, '5m': 300000, '15m': 900000, '30m': 1800000, '1h': 3600000, '2h': 7200000, '4h': 14400000, '1d': 86400000,
+    }
+
+    def __init__(
+        self,
+        api_setup: Optional[Dict[str, Any]] = None,
+        markets_cache: bool = True,
+        markets_ttl: float = DEFAULT_MARKETS_TTL,
+        ohlcv_store: bool = False,
+        rate_limiter: bool = True,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    ) -> None:
+
+        if api_setup == None:
+            self.session = ccxt_async.bitget()
+        else:
+            api_setup.setdefault("options", {"defaultType": "future"})
+            self.session = ccxt_async.bitget(api_setup)
+
+        self._markets_cache = MarketsCache('bitget', ttl=markets_ttl) if markets_cache else None
+        self._markets_reloaded = False
+        self.rate_limiter = rate_limit_ccxt(self.session, 'bitget') if rate_limiter else None
+        self.retry_policy = retry_policy
+        retry_ccxt_reads(self.session, retry_policy)
+        self.order_ids = ClientOrderIds()
+        self.precisions = MarketPrecisions(self.session, self.session.precisionMode == ccxt.DECIMAL_PLACES)
+        self.markets: Dict[str, Any] = {}
+        self.ohlcv_store = OHLCVStore('bitget') if ohlcv_store else None
+
+    @classmethod
+    async def create(cls, api_setup: Optional[Dict[str, Any]] = None, markets_refresh: str = 'auto', **kwargs: Any) -> 'AsyncBitgetFutures':
+        client = cls(api_setup, **kwargs)
+        try:
+            await client.load_markets(markets_refresh)
+        except Exception:
+            await client.close()
+            raise
+        return client
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    async def __aenter__(self) -> 'AsyncBitgetFutures':
+        if not self.markets:
+            await self.load_markets()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def load_markets(self, refresh: str = 'auto') -> Dict[str, Any]:
+        try:
+            if self._markets_cache is not None and self._markets_cache.load_cached_into(self.session, refresh, ccxt.bitget):
+                self.markets = self.session.markets
+            else:
+                self.markets = await self.session.load_markets(reload=True)
+                if self._markets_cache is not None:
+                    self._markets_cache.from_disk = False
+                    self._markets_cache.save(self.markets)
+            return self.markets
+        except Exception as e:
+            raise Exception(f"Failed to load markets: {e}")
+
+    async def reload_markets(self) -> Dict[str, Any]:
+        return await self.load_markets('force')
+
+    async def _reload_markets_after_reject(self) -> bool:
+        # an order rejected while trading on cached markets may come from outdated precision/limits,
+        # reload them once per session and let the caller retry
+        if self._markets_cache is None or not self._markets_cache.from_disk or self._markets_reloaded:
+            return False
+        self._markets_reloaded = True
+        await self.reload_markets()
+        return True
+
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        try:
+            return await self.session.fetch_ticker(symbol)
+        except Exception as e:
+            raise Exception(f"Failed to fetch ticker for {symbol}: {e}")
+
+    def fetch_min_amount_tradable(self, symbol: str) -> float:
+        try:
+            return self.markets[symbol]['limits']['amount']['min']
+        except Exception as e:
+            raise Exception(f"Failed to fetch minimum amount tradable: {e}")
+
+    def amount_to_precision(self, symbol: str, amount: float) -> str:
+        try:
+            return self.precisions(symbol).amount_to_precision(amount)
+        except Exception as e:
+            raise Exception(f"Failed to convert amount {amount} {symbol} to precision", e)
+
+    def price_to_precision(self, symbol: str, price: float) -> str:
+        try:
+            return self.precisions(symbol).price_to_precision(price)
+        except Exception as e:
+            raise Exception(f"Failed to convert price {price} to precision for {symbol}", e)
+
+    async def fetch_balance(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if params is None:
+            params = {}
+        try:
+            return await self.session.fetch_balance(params)
+        except Exception as e:
+            raise Exception(f"Failed to fetch balance: {e}")
+
+    async def fetch_order(self, id: str, symbol: str) -> Dict[str, Any]:
+        try:
+            return await self.session.fetch_order(id, symbol)
+        except Exception as e:
+            raise Exception(f"Failed to fetch order {id} info for {symbol}: {e}")
+
+    async def fetch_open_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        try:
+            return await self.session.fetch_open_orders(symbol)
+        except Exception as e:
+            raise Exception(f"Failed to fetch open orders: {e}")
+
+    async def fetch_open_trigger_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        try:
+            return await self.session.fetch_open_orders(symbol, params={'stop': True})
+        except Exception as e:
+            raise Exception(f"Failed to fetch open trigger orders: {e}")
+
+    async def fetch_closed_trigger_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        try:
+            return await self.session.fetch_closed_orders(symbol, params={'stop': True})
+        except Exception as e:
+            raise Exception(f"Failed to fetch closed trigger orders: {e}")
+
+    async def cancel_order(self, id: str, symbol: str) -> Dict[str, Any]:
+        try:
+            return await self.session.cancel_order(id, symbol)
+        except Exception as e:
+            raise Exception(f"Failed to cancel the {symbol} order {id}", e)
+
+    async def cancel_trigger_order(self, id: str, symbol: str) -> Dict[str, Any]:
+        try:
+            return await self.session.cancel_order(id, symbol, params={'stop': True})
+        except Exception as e:
+            raise Exception(f"Failed to cancel the {symbol} trigger order {id}", e)
+
+    async def cancel_orders_bulk(self, ids: List[str], symbol: str, trigger: bool = False, max_workers: int = 4) -> List[Dict[str, Any]]:
+        if not ids:
+            return []
+        params = {'stop': True} if trigger else {}
+        if self.session.has.get('cancelOrders'):
+            try:
+                batches = [ids[i:i + self.cancel_batch_size] for i in range(0, len(ids), self.cancel_batch_size)]
+                responses = await asyncio.gather(*[self.session.cancel_orders(batch, symbol, params=params) for batch in batches])
+                return [result for response in responses for result in response]
+            except Exception as e:
+                raise Exception(f"Failed to batch cancel the {symbol} {'trigger ' if trigger else ''}orders {ids}: {e}")
+
+        # the rate limiter spaces the requests, the semaphore bounds how many are in flight
+        cancel = self.cancel_trigger_order if trigger else self.cancel_order
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def cancel_one(id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await cancel(id, symbol)
+
+        results = await asyncio.gather(*[cancel_one(id) for id in ids], return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise Exception(f"Failed to cancel {len(errors)} of {len(ids)} {symbol} orders: {errors}")
+        return results
+
+    async def cancel_all_trigger_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        if self.session.has.get('cancelAllOrders'):
+            try:
+                return await self.session.cancel_all_orders(symbol, params={'stop': True})
+            except Exception as e:
+                raise Exception(f"Failed to cancel all the {symbol} trigger orders: {e}")
+        trigger_orders = await self.fetch_open_trigger_orders(symbol)
+        return await self.cancel_orders_bulk([order['id'] for order in trigger_orders], symbol, trigger=True)
+
+    async def fetch_open_positions(self, symbol: str) -> List[Dict[str, Any]]:
+        try:
+            positions = await self.session.fetch_positions([symbol], params={'productType': 'USDT-FUTURES', 'marginCoin': 'USDT'})
+            return [position for position in positions if float(position['contracts']) > 0]
+        except Exception as e:
+            raise Exception(f"Failed to fetch open positions: {e}")
+
+    async def flash_close_position(self, symbol: str, side: Optional[str] = None) -> Dict[str, Any]:
+        try:
+            return await self.session.close_position(symbol, side=side)
+        except Exception as e:
+            raise Exception(f"Failed to fetch closed order for {symbol}", e)
+
+    async def set_margin_mode(self, symbol: str, margin_mode: str = 'isolated') -> None:
+        try:
+            await self.session.set_margin_mode(
+                margin_mode,
+                symbol,
+                params={'productType': 'USDT-FUTURES', 'marginCoin': 'USDT'},
+            )
+        except Exception as e:
+            raise Exception(f"Failed to set margin mode: {e}")
+
+    async def set_leverage(self, symbol: str, margin_mode: str = 'isolated', leverage: int = 1) -> None:
+        try:
+            if margin_mode == 'isolated':
+                await asyncio.gather(*[
+                    self.session.set_leverage(
+                        leverage,
+                        symbol,
+                        params={
+                            'productType': 'USDT-FUTURES',
+                            'marginCoin': 'USDT',
+                            'holdSide': hold_side,
+                        },
+                    )
+                    for hold_side in ('long', 'short')
+                ])
+            else:
+                await self.session.set_leverage(
+                    leverage,
+                    symbol,
+                    params={'productType': 'USDT-FUTURES', 'marginCoin': 'USDT'},
+                )
+        except Exception as e:
+            raise Exception(f"Failed to set leverage: {e}")
+
+    async def _fetch_ohlcv_page(self, symbol: str, timeframe: str, window: Tuple[int, int]) -> List[List[float]]:
+        try:
+            return await self.session.fetch_ohlcv(
+                symbol,
+                timeframe,
+                params={
+                    "startTime": str(window[0]),
+                    "endTime": str(window[1]),
+                    "limit": self.bitget_fetch_limit,
+                }
+            )
+        except Exception as e:
+            raise Exception(f"Failed to fetch OHLCV data for {symbol} in timeframe {timeframe}: {e}")
+
+    async def _fetch_ohlcv_window(self, symbol: str, timeframe: str, start_timestamp: int, end_timestamp: int, max_workers: int = 1) -> List[List[float]]:
+        page_milliseconds = self.bitget_fetch_limit * self.timeframe_to_milliseconds[timeframe]
+        windows = []
+        current_timestamp = start_timestamp
+        while current_timestamp < end_timestamp:
+            windows.append((current_timestamp, min(current_timestamp + page_milliseconds, end_timestamp)))
+            current_timestamp += page_milliseconds + 1
+
+        # the rate limiter spaces the requests, the semaphore bounds how many are in flight
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def fetch_page(window: Tuple[int, int]) -> List[List[float]]:
+            async with semaphore:
+                return await self._fetch_ohlcv_page(symbol, timeframe, window)
+
+        pages = await asyncio.gather(*[fetch_page(window) for window in windows])
+        return stitch_ohlcv(pages)
+
+    async def fetch_recent_ohlcv(self, symbol: str, timeframe: str, limit: int = 1000, max_workers: int = 1) -> pd.DataFrame:
+        end_timestamp = int(time.time() * 1000)
+        start_timestamp = end_timestamp - (limit * self.timeframe_to_milliseconds[timeframe])
+
+        if self.ohlcv_store is None:
+            ohlcv_data = await self._fetch_ohlcv_window(symbol, timeframe, start_timestamp, end_timestamp, max_workers)
+        else:
+            timeframe_ms = self.timeframe_to_milliseconds[timeframe]
+            fetch_from = self.ohlcv_store.fetch_start(symbol, timeframe, timeframe_ms, start_timestamp)
+            fetched = await self._fetch_ohlcv_window(symbol, timeframe, fetch_from, end_timestamp, max_workers)
+            ohlcv_data = self.ohlcv_store.merge(symbol, timeframe, timeframe_ms, start_timestamp, end_timestamp, fetched)
+
+        return ohlcv_to_dataframe(ohlcv_data)
+
+    async def _find_order_by_client_id(self, symbol: str, client_order_id: str, trigger: bool = False) -> Optional[Dict[str, Any]]:
+        # the open orders, then the closed ones, e.g. a market order filled right away
+        params = {'stop': True} if trigger else {}
+        for fetch in (self.session.fetch_open_orders, self.session.fetch_closed_orders):
+            for order in await fetch(symbol, params=params):
+                if order.get('clientOrderId') == client_order_id:
+                    return order
+        return None
+
+    async def _create_order(
+        self,
+        symbol: str,
+        type: str,
+        side: str,
+        amount: str,
+        price: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        resend: bool = False,
+    ) -> Dict[str, Any]:
+        # as BitgetFutures._create_order: retried with a fixed client order ID, looked up before a retry
+        params = dict(params or {})
+        params.setdefault('clientOrderId', self.order_ids.next())
+        return await call_with_retries_async(
+            lambda: self.session.create_order(symbol, type, side, amount, price, params=params),
+            f"{type} {side} order of {amount} {symbol}",
+            self.retry_policy,
+            lambda: self._find_order_by_client_id(symbol, params['clientOrderId'], 'triggerPrice' in params),
+            resend,
+        )
+
+    async def place_market_order(self, symbol: str, side: str, amount: float, reduce: bool = False) -> Dict[str, Any]:
+        try:
+            params = {
+                'reduceOnly': reduce,
+            }
+            amount_str = self.amount_to_precision(symbol, amount)
+            return await self._create_order(symbol, 'market', side, amount_str, params=params)
+
+        except Exception as e:
+            if isinstance(e, ccxt.InvalidOrder) and await self._reload_markets_after_reject():
+                return await self.place_market_order(symbol, side, amount, reduce)
+            raise Exception(f"Failed to place market order of {amount} {symbol}: {e}")
+
+    async def place_limit_order(self, symbol: str, side: str, amount: float, price: float, reduce: bool = False) -> Dict[str, Any]:
+        try:
+            params = {
+                'reduceOnly': reduce,
+            }
+            amount_str = self.amount_to_precision(symbol, amount)
+            price_str = self.price_to_precision(symbol, price)
+            return await self._create_order(symbol, 'limit', side, amount_str, price_str, params=params)
+
+        except Exception as e:
+            if isinstance(e, ccxt.InvalidOrder) and await self._reload_markets_after_reject():
+                return await self.place_limit_order(symbol, side, amount, price, reduce)
+            raise Exception(f"Failed to place limit order of {amount} {symbol} at price {price}: {e}")
+
+    async def place_trigger_market_order(self, symbol: str, side: str, amount: float, trigger_price: float, reduce: bool = False, print_error: bool = False) -> Optional[Dict[str, Any]]:
+        try:
+            amount_str = self.amount_to_precision(symbol, amount)
+            trigger_price_str = self.price_to_precision(symbol, trigger_price)
+            params = {
+                'reduceOnly': reduce,
+                'triggerPrice': trigger_price_str,
+                'delegateType': 'price_fill',
+            }
+            return await self._create_order(symbol, 'market', side, amount_str, params=params)
+        except Exception as err:
+            if isinstance(err, ccxt.InvalidOrder) and await self._reload_markets_after_reject():
+                return await self.place_trigger_market_order(symbol, side, amount, trigger_price, reduce, print_error)
+            if print_error:
+                print(err)
+                return None
+            else:
+                raise err
+
+    async def place_trigger_limit_order(self, symbol: str, side: str, amount: float, trigger_price: float, price: float, reduce: bool = False, print_error: bool = False) -> Optional[Dict[str, Any]]:
+        try:
+            amount_str = self.amount_to_precision(symbol, amount)
+            trigger_price_str = self.price_to_precision(symbol, trigger_price)
+            price_str = self.price_to_precision(symbol, price)
+            params = {
+                'reduceOnly': reduce,
+                'triggerPrice': trigger_price_str,
+                'delegateType': 'price_fill',
+            }
+            return await self._create_order(symbol, 'limit', side, amount_str, price_str, params=params)
+        except Exception as err:
+            if isinstance(err, ccxt.InvalidOrder) and await self._reload_markets_after_reject():
+                return await self.place_trigger_limit_order(symbol, side, amount, trigger_price, price, reduce, print_error)
+            if print_error:
+                print(err)
+                return None
+            else:
+                raise err
+
+    def _order_request(self, order: Dict[str, Any], precise: Dict[str, str]) -> Dict[str, Any]:
+        symbol = order['symbol']
+        order_type = order.get('type', 'limit')
+        params = {
+            'reduceOnly': order.get('reduce', False),
+            'clientOrderId': order.get('client_order_id') or self.order_ids.next(),
+        }
+        if order_type.startswith('trigger_'):
+            params['triggerPrice'] = precise['trigger_price']
+            params['delegateType'] = 'price_fill'
+        return {
+            'symbol': symbol,
+            'type': order_type.replace('trigger_', ''),
+            'side': order['side'],
+            'amount': precise['amount'],
+            'price': precise['price'] if order_type.endswith('limit') else None,
+            'params': params,
+        }
+
+    async def place_orders_bulk(self, orders: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
+        # see BitgetFutures.place_orders_bulk, batches and single requests are sent concurrently
+        results = [{'order': None, 'error': None} for _ in orders]
+        requests = {}
+        precise_orders = orders_to_precision(orders, self.precisions)
+        for i, (order, precise) in enumerate(zip(orders, precise_orders)):
+            try:
+                if isinstance(precise, Exception):
+                    raise precise
+                requests[i] = self._order_request(order, precise)
+            except Exception as e:
+                results[i]['error'] = f"Failed to prepare order {order}: {e}"
+
+        batches = []
+        singles = []
+        by_symbol = {}
+        for i, request in requests.items():
+            if self.session.has.get('createOrders') and 'triggerPrice' not in request['params']:
+                by_symbol.setdefault(request['symbol'], []).append(i)
+            else:
+                singles.append(i)
+        for indexes in by_symbol.values():
+            batches.extend(indexes[j:j + self.create_batch_size] for j in range(0, len(indexes), self.create_batch_size))
+
+        # the rate limiter spaces the requests, the semaphore bounds how many are in flight
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def place_batch(chunk: List[int]) -> None:
+            async with semaphore:
+                try:
+                    created = await self.session.create_orders([requests[i] for i in chunk])
+                except Exception as e:
+                    if not is_retryable(e):
+                        for i in chunk:
+                            results[i]['error'] = f"Failed to batch place {requests[i]['symbol']} orders: {e}"
+                        return
+                    created = None
+            if created is None:
+                # the batch may have gone through in part, each order is sent again on its own
+                await asyncio.gather(*[place_one(i, resend=True) for i in chunk])
+                return
+            for i, order in zip(chunk, created):
+                results[i]['order'] = order
+                if order.get('status') == 'rejected':
+                    results[i]['error'] = f"Order rejected: {order.get('info')}"
+
+        async def place_one(i: int, resend: bool = False) -> None:
+            request = requests[i]
+            async with semaphore:
+                try:
+                    results[i]['order'] = await self._create_order(**request, resend=resend)
+                except Exception as e:
+                    results[i]['error'] = f"Failed to place {request['type']} order of {request['amount']} {request['symbol']}: {e}"
+
+        await asyncio.gather(*[place_batch(chunk) for chunk in batches], *[place_one(i) for i in singles])
+        return results
@@ -0,0 +1,20 @@
+import importlib
+import threading
+
+
+def preload(*modules: str) -> threading.Thread:
+    """
+    Imports `modules` in a background thread. A cron-invoked script calls this before authenticating, so a
+    heavy library it only needs later (pandas for the candles) loads while the main thread waits on the
+    exchange. An `import` of the same module from the main thread waits for this one if it is still running.
+    """
+    def run() -> None:
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass  # raised again where the module is actually used
+
+    thread = threading.Thread(target=run, name='preload', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,223 @@
+import os
+import json
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Dict, Optional, Tuple, Type
+
+from utilities.ohlcv_store import OHLCVStore
+
+
+class IncrementalAverage(ABC):
+    """
+    Moving average updated one candle at a time in constant time, giving the same values as the ta
+    indicator of the same name over the same candles. `update` returns NaN until `period` candles were seen.
+
+    The whole state is a small JSON-able dict (`state` / `from_state`), so it can be kept next to the
+    candle store and resumed by the next run instead of recomputing the indicator from the history.
+    """
+    average_type = ''
+
+    def __init__(self, period: int) -> None:
+        if period < 1:
+            raise ValueError(f"The average period must be at least 1, got {period}")
+        self.period = period
+        self.count = 0  # candles seen
+        self.value = math.nan
+
+    @abstractmethod
+    def update(self, high: float, low: float, close: float) -> float:
+        """Adds the candle that just closed and returns the average, NaN during the warm-up."""
+
+    def state(self) -> Dict[str, Any]:
+        return {'average_type': self.average_type, 'period': self.period, 'count': self.count, 'value': self.value}
+
+    def _load(self, state: Dict[str, Any]) -> None:
+        self.count = state['count']
+        self.value = state['value']
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'IncrementalAverage':
+        indicator = AVERAGE_TYPES[state['average_type']](state['period'])
+        indicator._load(state)
+        return indicator
+
+
+class IncrementalDCM(IncrementalAverage):
+    """Donchian channel middle band, the highest high and lowest low kept in monotonic deques."""
+    average_type = 'DCM'
+
+    def __init__(self, period: int) -> None:
+        super().__init__(period)
+        self.highs: deque = deque()  # (candle number, high), highs decreasing
+        self.lows: deque = deque()  # (candle number, low), lows increasing
+
+    def update(self, high: float, low: float, close: float) -> float:
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((self.count, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((self.count, low))
+        self.count += 1
+        oldest = self.count - self.period
+        if self.highs[0][0] < oldest:
+            self.highs.popleft()
+        if self.lows[0][0] < oldest:
+            self.lows.popleft()
+        if self.count >= self.period:
+            highest, lowest = self.highs[0][1], self.lows[0][1]
+            self.value = ((highest - lowest) / 2.0) + lowest
+        return self.value
+
+    def state(self) -> Dict[str, Any]:
+        return {**super().state(), 'highs': list(self.highs), 'lows': list(self.lows)}
+
+    def _load(self, state: Dict[str, Any]) -> None:
+        super()._load(state)
+        self.highs = deque(tuple(item) for item in state['highs'])
+        self.lows = deque(tuple(item) for item in state['lows'])
+
+
+class IncrementalSMA(IncrementalAverage):
+    """Simple moving average from a rolling sum."""
+    average_type = 'SMA'
+
+    def __init__(self, period: int) -> None:
+        super().__init__(period)
+        self.window: deque = deque()
+        self.total = 0.0
+
+    def _push(self, close: float) -> Optional[float]:
+        self.window.append(close)
+        self.total += close
+        dropped = self.window.popleft() if len(self.window) > self.period else None
+        if dropped is not None:
+            self.total -= dropped
+        self.count += 1
+        if self.count % self.period == 0:
+            # the rolling sum is rebuilt once per period so the float error cannot build up
+            self.total = math.fsum(self.window)
+        return dropped
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self._push(close)
+        if self.count >= self.period:
+            self.value = self.total / self.period
+        return self.value
+
+    def state(self) -> Dict[str, Any]:
+        return {**super().state(), 'window': list(self.window), 'total': self.total}
+
+    def _load(self, state: Dict[str, Any]) -> None:
+        super()._load(state)
+        self.window = deque(state['window'])
+        self.total = state['total']
+
+
+class IncrementalWMA(IncrementalSMA):
+    """Linearly weighted moving average (weights 1..period, newest heaviest) from a rolling weighted sum."""
+    average_type = 'WMA'
+
+    def __init__(self, period: int) -> None:
+        super().__init__(period)
+        self.weighted_total = 0.0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if len(self.window) < self.period:
+            self.weighted_total += (len(self.window) + 1) * close
+        else:
+            # every value moves one weight down: subtract the window sum, then add the new one at full weight
+            self.weighted_total += self.period * close - self.total
+        self._push(close)
+        if self.count % self.period == 0:
+            self.weighted_total = math.fsum((i + 1) * value for i, value in enumerate(self.window))
+        if self.count >= self.period:
+            self.value = self.weighted_total * 2 / (self.period * (self.period + 1))
+        return self.value
+
+    def state(self) -> Dict[str, Any]:
+        return {**super().state(), 'weighted_total': self.weighted_total}
+
+    def _load(self, state: Dict[str, Any]) -> None:
+        super()._load(state)
+        self.weighted_total = state['weighted_total']
+
+
+class IncrementalEMA(IncrementalAverage):
+    """Exponential moving average seeded with the first close, like ta's ewm(adjust=False)."""
+    average_type = 'EMA'
+
+    def __init__(self, period: int) -> None:
+        super().__init__(period)
+        self.alpha = 2 / (period + 1)
+        self.ema = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self.ema = close if self.count == 0 else self.alpha * close + (1 - self.alpha) * self.ema
+        self.count += 1
+        if self.count >= self.period:
+            self.value = self.ema
+        return self.value
+
+    def state(self) -> Dict[str, Any]:
+        return {**super().state(), 'ema': self.ema}
+
+    def _load(self, state: Dict[str, Any]) -> None:
+        super()._load(state)
+        self.ema = state['ema']
+
+
+AVERAGE_TYPES: Dict[str, Type[IncrementalAverage]] = {
+    'DCM': IncrementalDCM,
+    'SMA': IncrementalSMA,
+    'EMA': IncrementalEMA,
+    'WMA': IncrementalWMA,
+}
+
+
+def make_average(average_type: str, period: int) -> IncrementalAverage:
+    if average_type not in AVERAGE_TYPES:
+        raise ValueError(f"The average type {average_type} is not supported")
+    return AVERAGE_TYPES[average_type](period)
+
+
+def update_from_store(store: OHLCVStore, symbol: str, timeframe: str, average_type: str, period: int) -> Tuple[Optional[int], float]:
+    """
+    Brings the persisted average of (symbol, timeframe) up to the last candle of the store.
+
+    The state is saved in the store directory with the timestamp of the last candle it consumed, so a run
+    only feeds the candles appended since the previous one, usually a single candle. The first run, or a
+    run after the state or the candle file was removed, replays the whole stored history once.
+
+    Returns:
+        Tuple[Optional[int], float]: Timestamp (ms) of the last candle consumed, None if the store is empty,
+                                     and the average at that candle (NaN during warm-up).
+    """
+    path = store.state_path(symbol, timeframe, f"{average_type}{period}")
+    indicator, timestamp = None, None
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as file:
+                saved = json.load(file)
+            indicator, timestamp = IncrementalAverage.from_state(saved['indicator']), saved['timestamp']
+        except (ValueError, KeyError, TypeError):
+            indicator, timestamp = None, None  # unreadable state, rebuilt from the candles below
+
+    last_timestamp = store.last_timestamp(symbol, timeframe)
+    if indicator is None or last_timestamp is None or last_timestamp < timestamp:
+        # no state yet, or the candle file was reset behind it
+        indicator, timestamp = make_average(average_type, period), None
+    candles = store.read(symbol, timeframe, since=None if timestamp is None else timestamp + 1)
+    if not len(candles):
+        return timestamp, indicator.value
+
+    for high, low, close in candles[:, 2:5].tolist():
+        indicator.update(high, low, close)
+    timestamp = int(candles[-1, 0])
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", 'w') as file:
+        json.dump({'timestamp': timestamp, 'indicator': indicator.state()}, file)
+    os.replace(f"{path}.tmp", path)
+    return timestamp, indicator.value
@@ -1,10 +1,32 @@
 import ccxt
+import math
 import time
-import pandas as pd
-from typing import Any, Optional, Dict, List
+from typing import TYPE_CHECKING, Any, Optional, Dict, List, Tuple
+
+from utilities.markets_cache import MarketsCache, DEFAULT_MARKETS_TTL
+from utilities.ohlcv_store import OHLCVStore, ohlcv_to_dataframe
+from utilities.parallel_fetch import fetch_pages_concurrently, run_concurrently
+from utilities.precision import MarketPrecisions, orders_to_precision
+from utilities.rate_limiter import rate_limit_ccxt
+from utilities.retry import DEFAULT_RETRY_POLICY, ClientOrderIds, RetryPolicy, call_with_retries, is_retryable, retry_ccxt_reads
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class KucoinFutures():
-    def __init__(self, api_setup: Optional[Dict[str, Any]] = None) -> None:
+    cancel_batch_size = 50
+    create_batch_size = 20 # KuCoin Futures accepts up to 20 orders per batch request
+
+    def __init__(
+        self,
+        api_setup: Optional[Dict[str, Any]] = None,
+        markets_cache: bool = True,
+        markets_ttl: float = DEFAULT_MARKETS_TTL,
+        markets_refresh: str = 'auto',
+        ohlcv_store: bool = False,
+        rate_limiter: bool = True,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    ) -> None:
         """
         Initializes the KucoinFutures client.
 
@@ -12,6 +34,14 @@ class KucoinFutures():
             api_setup (Optional[Dict[str, Any]]): Dictionary containing API key, secret,
                                                   and optional password for KuCoin Futures.
                                                   If None, initializes an unauthenticated client.
+            markets_cache (bool): Load markets from the on-disk cache instead of downloading them every run.
+            markets_ttl (float): Age in seconds after which the cached markets are downloaded again.
+            markets_refresh (str): 'auto', 'force' or 'background', see MarketsCache.load_into.
+            ohlcv_store (bool): Keep closed candles in a local OHLCVStore so each run only downloads the new ones.
+            rate_limiter (bool): Pace the requests with token buckets shared by the bot processes of the machine
+                                 (see rate_limit_ccxt) instead of the per-session ccxt throttle.
+            retry_policy (RetryPolicy): Retries of the reads and, with their client order ID, of the orders
+                                        on network errors.
         """
         if api_setup is None:
             self.session = ccxt.kucoinfutures()
@@ -25,10 +55,52 @@ class KucoinFutures():
             if api_setup.get("sandbox_mode", False): # Assuming you add 'sandbox_mode': True to api_setup
                  self.session.set_sandbox_mode(True)
 
+        self._sandbox_mode = bool(api_setup and api_setup.get("sandbox_mode", False))
+        cache_name = 'kucoinfutures_sandbox' if self._sandbox_mode else 'kucoinfutures'
+        self._markets_cache = MarketsCache(cache_name, ttl=markets_ttl) if markets_cache else None
+        self._markets_reloaded = False
+        self.rate_limiter = rate_limit_ccxt(self.session, cache_name) if rate_limiter else None
+        self.retry_policy = retry_policy
+        retry_ccxt_reads(self.session, retry_policy)
+        self.order_ids = ClientOrderIds()
+        self._request_spacing_ms = 0 if self.rate_limiter else self.session.rateLimit  # for run_concurrently
+        self.precisions = MarketPrecisions(self.session, self.session.precisionMode == ccxt.DECIMAL_PLACES)
         try:
-            self.markets = self.session.load_markets()
+            self.markets = self._load_markets(markets_refresh)
         except Exception as e:
             raise Exception(f"Failed to load KuCoin Futures markets: {e}")
+        self.ohlcv_store = OHLCVStore(cache_name) if ohlcv_store else None
+
+    def _public_session(self) -> ccxt.kucoinfutures:
+        """Unauthenticated session on the same environment (live/sandbox), used for background market refreshes."""
+        session = ccxt.kucoinfutures()
+        if self._sandbox_mode:
+            session.set_sandbox_mode(True)
+        return session
+
+    def _load_markets(self, refresh: str = 'auto') -> Dict[str, Any]:
+        if self._markets_cache is None:
+            return self.session.load_markets()
+        return self._markets_cache.load_into(self.session, refresh, self._public_session)
+
+    def reload_markets(self) -> Dict[str, Any]:
+        """Downloads the markets again and rewrites the on-disk cache."""
+        try:
+            self.markets = self._load_markets('force')
+            return self.markets
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to reload markets: {e}")
+
+    def _reload_markets_after_reject(self) -> bool:
+        """
+        Reloads the markets once per session if an order was rejected while trading on cached markets,
+        as the rejection may come from outdated precision/limits. Returns True if the caller should retry.
+        """
+        if self._markets_cache is None or not self._markets_cache.from_disk or self._markets_reloaded:
+            return False
+        self._markets_reloaded = True
+        self.reload_markets()
+        return True
 
     def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
         """Fetches the ticker information for a specific symbol."""
@@ -57,20 +129,16 @@ class KucoinFutures():
             raise Exception(f"KuCoin Futures: Failed to fetch minimum amount tradable for {symbol}: {e}")
 
     def amount_to_precision(self, symbol: str, amount: float) -> str:
-        """Formats the amount to the precision required by the exchange for the given symbol."""
+        """Truncates the amount to the lot size of the symbol, in contracts for KuCoin futures."""
         try:
-            # For KuCoin futures, amount is typically an integer number of contracts.
-            # Using amount_to_precision might work, but ensure it rounds correctly for integers.
-            # return self.session.amount_to_precision(symbol, amount)
-            # Safer approach for integer contracts:
-            return str(int(amount))
+            return self.precisions(symbol).amount_to_precision(amount)
         except Exception as e:
             raise Exception(f"KuCoin Futures: Failed to convert amount {amount} for {symbol} to precision: {e}")
 
     def price_to_precision(self, symbol: str, price: float) -> str:
         """Formats the price to the precision required by the exchange for the given symbol."""
         try:
-            return self.session.price_to_precision(symbol, price)
+            return self.precisions(symbol).price_to_precision(price)
         except Exception as e:
             raise Exception(f"KuCoin Futures: Failed to convert price {price} to precision for {symbol}: {e}")
 
@@ -142,6 +210,49 @@ class KucoinFutures():
         except Exception as e:
             raise Exception(f"KuCoin Futures: Failed to cancel the {symbol} trigger order {id}: {e}. Check ccxt implementation details.")
 
+    def cancel_orders_bulk(self, ids: List[str], symbol: str, trigger: bool = False, max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Cancels several orders at once: through the batch cancel endpoint if ccxt supports one for
+        KuCoin Futures, otherwise through concurrent single cancels spaced by the session rate limit.
+
+        Args:
+            ids (List[str]): IDs of the orders to cancel.
+            symbol (str): The trading symbol.
+            trigger (bool): True if the IDs are stop/trigger orders.
+            max_workers (int): Maximum number of single cancels in flight.
+
+        Returns:
+            List[Dict[str, Any]]: The cancel responses.
+        """
+        if not ids:
+            return []
+        params = {'stop': True} if trigger else {}
+        if self.session.has.get('cancelOrders'):
+            try:
+                results = []
+                for i in range(0, len(ids), self.cancel_batch_size):
+                    results.extend(self.session.cancel_orders(ids[i:i + self.cancel_batch_size], symbol, params=params))
+                return results
+            except Exception as e:
+                raise Exception(f"KuCoin Futures: Failed to batch cancel the {symbol} {'trigger ' if trigger else ''}orders {ids}: {e}")
+
+        cancel = self.cancel_trigger_order if trigger else self.cancel_order
+        results = run_concurrently(lambda id: cancel(id, symbol), ids, max_workers, self._request_spacing_ms, return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise Exception(f"KuCoin Futures: Failed to cancel {len(errors)} of {len(ids)} {symbol} orders: {errors}")
+        return results
+
+    def cancel_all_trigger_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        """Cancels every open stop/trigger order of a symbol, in one request when the exchange supports it."""
+        if self.session.has.get('cancelAllOrders'):
+            try:
+                return self.session.cancel_all_orders(symbol, params={'stop': True})
+            except Exception as e:
+                raise Exception(f"KuCoin Futures: Failed to cancel all the {symbol} trigger orders: {e}")
+        trigger_orders = self.fetch_open_trigger_orders(symbol)
+        return self.cancel_orders_bulk([order['id'] for order in trigger_orders], symbol, trigger=True)
+
     def fetch_open_positions(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
         """Fetches open positions, optionally filtered by symbol."""
         try:
@@ -199,27 +310,57 @@ class KucoinFutures():
         except Exception as e:
             raise Exception(f"KuCoin Futures: Failed to set leverage for {symbol}: {e}")
 
-    def fetch_recent_ohlcv(self, symbol: str, timeframe: str, limit: int = 1000) -> pd.DataFrame:
-        """
-        Fetches recent OHLCV data, handling pagination if necessary.
+    def _back_off(self, endpoint_class: str, seconds: float) -> None:
+        """Waits out a rate limit error. With the shared rate limiter, the other bot processes hold off too."""
+        if self.rate_limiter is None:
+            time.sleep(seconds)
+        else:
+            self.rate_limiter.hold(endpoint_class, seconds)  # the retried call waits in the limiter
 
-        Args:
-            symbol (str): The trading symbol (e.g., 'BTC/USDT:USDT').
-            timeframe (str): The timeframe (e.g., '1m', '5m', '1h', '1d').
-            limit (int): The total number of candles to fetch.
+    def _fetch_ohlcv_page(self, symbol: str, timeframe: str, window: Tuple[int, int]) -> List[List[float]]:
+        """Fetches one page of `window[1]` candles starting at `window[0]`, waiting out up to retry_policy.attempts rate limit errors."""
+        for attempt in range(self.retry_policy.attempts):
+            try:
+                return self.session.fetch_ohlcv(symbol, timeframe, since=window[0], limit=window[1])
+            except ccxt.RateLimitExceeded as e:
+                if attempt + 1 >= self.retry_policy.attempts:
+                    raise Exception(f"KuCoin Futures: Still rate limited fetching OHLCV data for {symbol} after {attempt + 1} attempts: {e}")
+                print(f"Rate limit exceeded, sleeping: {e}")
+                self._back_off('public', 5)
+            except Exception as e:
+                raise Exception(f"KuCoin Futures: Failed to fetch OHLCV data chunk for {symbol} in timeframe {timeframe}: {e}")
+
+    def _fetch_ohlcv_candles(self, symbol: str, timeframe: str, limit: int, end_timestamp: int, max_workers: int = 1) -> List[List[float]]:
+        """
+        Fetches the `limit` candles ending at `end_timestamp`, paginating backwards.
+        With max_workers > 1, the pages are computed up front and fetched concurrently instead.
 
         Returns:
-            pd.DataFrame: DataFrame with OHLCV data indexed by timestamp.
+            List[List[float]]: Raw ccxt OHLCV rows in chronological order.
         """
         # KuCoin's fetch_ohlcv limit per request (check ccxt docs, often 1500)
         kucoin_fetch_limit = 1500
         timeframe_to_milliseconds = self.session.parse_timeframe(timeframe) * 1000
 
         all_ohlcv = []
-        # Fetching backwards from the current time
-        end_timestamp = self.session.milliseconds()
+        # Fetching backwards from end_timestamp
         since = end_timestamp - limit * timeframe_to_milliseconds
 
+        if max_workers > 1 and limit > kucoin_fetch_limit:
+            windows = [
+                (since + offset * timeframe_to_milliseconds, min(kucoin_fetch_limit, limit - offset))
+                for offset in range(0, limit, kucoin_fetch_limit)
+            ]
+            print(f"Fetching {limit} candles for {symbol} in {len(windows)} pages with {max_workers} workers...")
+            all_ohlcv = fetch_pages_concurrently(
+                lambda window: self._fetch_ohlcv_page(symbol, timeframe, window),
+                windows,
+                max_workers,
+                self._request_spacing_ms,
+            )
+            return all_ohlcv[-limit:]
+
+        rate_limited = 0  # consecutive rate limit errors on the current chunk
         while len(all_ohlcv) < limit:
             try:
                 # Calculate how many more candles are needed, capped by KuCoin's limit
@@ -230,7 +371,7 @@ class KucoinFutures():
                 # Ensure we don't request data from before the overall target 'since'
                 current_since = max(current_since, since)
 
-                print(f"Fetching {fetch_num} candles for {symbol} since {pd.to_datetime(current_since, unit='ms')}...")
+                print(f"Fetching {fetch_num} candles for {symbol} since {self.session.iso8601(current_since)}...")
 
                 fetched_data = self.session.fetch_ohlcv(
                     symbol,
@@ -238,6 +379,7 @@ class KucoinFutures():
                     since=current_since,
                     limit=fetch_num # Request the calculated number
                 )
+                rate_limited = 0
 
                 if not fetched_data:
                     print("No more data returned, stopping fetch.")
@@ -249,33 +391,93 @@ class KucoinFutures():
                 # Update the end_timestamp for the next iteration to the start of the fetched data
                 end_timestamp = fetched_data[0][0] # Timestamp of the earliest candle fetched
 
-                # Small delay to avoid rate limits
-                time.sleep(self.session.rateLimit / 1000)
-
                 # Break if we fetched data older than our overall target 'since'
                 # (handles cases where exchange returns slightly more/less than requested)
                 if fetched_data[0][0] < since:
                      break
 
             except ccxt.RateLimitExceeded as e:
+                rate_limited += 1
+                if rate_limited >= self.retry_policy.attempts:
+                    raise Exception(f"KuCoin Futures: Still rate limited fetching OHLCV data for {symbol} after {rate_limited} attempts: {e}")
                 print(f"Rate limit exceeded, sleeping: {e}")
-                time.sleep(5) # Wait longer if rate limited
+                self._back_off('public', 5)
             except Exception as e:
                 raise Exception(f"KuCoin Futures: Failed to fetch OHLCV data chunk for {symbol} in timeframe {timeframe}: {e}")
 
-        if not all_ohlcv:
-             return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-
         # Trim excess candles if we fetched more than requested due to chunking alignment
-        all_ohlcv = all_ohlcv[-limit:]
+        return all_ohlcv[-limit:]
 
-        df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        df.sort_index(inplace=True) # Ensure data is sorted chronologically
+    def fetch_recent_ohlcv(self, symbol: str, timeframe: str, limit: int = 1000, max_workers: int = 1) -> 'pd.DataFrame':
+        """
+        Fetches recent OHLCV data, handling pagination if necessary.
+        With the OHLCV store enabled, only the candles missing from the store are downloaded.
 
-        return df
+        Args:
+            symbol (str): The trading symbol (e.g., 'BTC/USDT:USDT').
+            timeframe (str): The timeframe (e.g., '1m', '5m', '1h', '1d').
+            limit (int): The total number of candles to fetch.
+            max_workers (int): Number of pages fetched concurrently for long windows (1 = sequential).
 
+        Returns:
+            pd.DataFrame: DataFrame with OHLCV data indexed by timestamp.
+        """
+        end_timestamp = self.session.milliseconds()
+
+        if self.ohlcv_store is None:
+            all_ohlcv = self._fetch_ohlcv_candles(symbol, timeframe, limit, end_timestamp, max_workers)
+        else:
+            timeframe_to_milliseconds = self.session.parse_timeframe(timeframe) * 1000
+            all_ohlcv = self.ohlcv_store.top_up(
+                symbol,
+                timeframe,
+                timeframe_to_milliseconds,
+                end_timestamp - limit * timeframe_to_milliseconds,
+                end_timestamp,
+                lambda since, until: self._fetch_ohlcv_candles(
+                    symbol, timeframe, math.ceil((until - since) / timeframe_to_milliseconds), until, max_workers
+                ),
+            )[-limit:]
+
+        if not len(all_ohlcv):
+             return ohlcv_to_dataframe([])
+
+        return ohlcv_to_dataframe(all_ohlcv) # Sorted chronologically
+
+
+    def _find_order_by_client_id(self, symbol: str, client_order_id: str, trigger: bool = False) -> Optional[Dict[str, Any]]:
+        """Looks an order up by client order ID among the open orders, then the closed ones (e.g. a filled market order)."""
+        params = {'stop': True} if trigger else {}
+        for fetch in (self.session.fetch_open_orders, self.session.fetch_closed_orders):
+            for order in fetch(symbol, params=params):
+                if order.get('clientOrderId') == client_order_id:
+                    return order
+        return None
+
+    def _create_order(
+        self,
+        symbol: str,
+        type: str,
+        side: str,
+        amount: float,
+        price: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None,
+        resend: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        session.create_order with a client order ID fixed before the first attempt, retried on network errors.
+        Before a retry, or before the first attempt with `resend` (the order went out in a failed batch), the
+        order is looked up by that ID, so one the exchange already accepted is returned instead of placed twice.
+        """
+        params = dict(params or {})
+        params.setdefault('clientOrderId', self.order_ids.next())
+        return call_with_retries(
+            lambda: self.session.create_order(symbol, type, side, amount, price, params=params),
+            f"KuCoin Futures: {type} {side} order of {amount} contracts {symbol}",
+            self.retry_policy,
+            lambda: self._find_order_by_client_id(symbol, params['clientOrderId'], 'stopPrice' in params),
+            resend,
+        )
 
     def place_market_order(self, symbol: str, side: str, amount: float, reduce: bool = False) -> Dict[str, Any]:
         """Places a market order."""
@@ -286,9 +488,11 @@ class KucoinFutures():
             # Amount for KuCoin Futures is in contracts (integer)
             amount_str = self.amount_to_precision(symbol, amount)
             print(f"Placing KuCoin Market Order: {symbol}, {side}, Amount: {amount_str}, Reduce: {reduce}")
-            return self.session.create_order(symbol, 'market', side, float(amount_str), params=params) # Use float for ccxt call
+            return self._create_order(symbol, 'market', side, float(amount_str), params=params) # Use float for ccxt call
 
         except Exception as e:
+            if isinstance(e, ccxt.InvalidOrder) and self._reload_markets_after_reject():
+                return self.place_market_order(symbol, side, amount, reduce)
             raise Exception(f"KuCoin Futures: Failed to place market order of {amount} contracts {symbol}: {e}")
 
     def place_limit_order(self, symbol: str, side: str, amount: float, price: float, reduce: bool = False) -> Dict[str, Any]:
@@ -300,9 +504,11 @@ class KucoinFutures():
             amount_str = self.amount_to_precision(symbol, amount)
             price_str = self.price_to_precision(symbol, price)
             print(f"Placing KuCoin Limit Order: {symbol}, {side}, Amount: {amount_str}, Price: {price_str}, Reduce: {reduce}")
-            return self.session.create_order(symbol, 'limit', side, float(amount_str), float(price_str), params=params) # Use float for ccxt call
+            return self._create_order(symbol, 'limit', side, float(amount_str), float(price_str), params=params) # Use float for ccxt call
 
         except Exception as e:
+            if isinstance(e, ccxt.InvalidOrder) and self._reload_markets_after_reject():
+                return self.place_limit_order(symbol, side, amount, price, reduce)
             raise Exception(f"KuCoin Futures: Failed to place limit order of {amount} contracts {symbol} at price {price}: {e}")
 
     def place_trigger_market_order(
@@ -329,8 +535,10 @@ class KucoinFutures():
 
             print(f"Placing KuCoin Trigger Market: {symbol}, {side}, Amount: {amount_str}, Trigger: {trigger_price_str}, Reduce: {reduce}, StopType: {stop_price_type}")
             # Use 'market' type with stopPrice param for stop-market
-            return self.session.create_order(symbol, 'market', side, float(amount_str), params=params)
+            return self._create_order(symbol, 'market', side, float(amount_str), params=params)
         except Exception as err:
+            if isinstance(err, ccxt.InvalidOrder) and self._reload_markets_after_reject():
+                return self.place_trigger_market_order(symbol, side, amount, trigger_price, reduce, stop_price_type, print_error)
             if print_error:
                 print(f"KuCoin Futures Error placing trigger market order: {err}")
                 return None
@@ -363,14 +571,108 @@ class KucoinFutures():
 
             print(f"Placing KuCoin Trigger Limit: {symbol}, {side}, Amount: {amount_str}, Trigger: {trigger_price_str}, LimitPrice: {price_str}, Reduce: {reduce}, StopType: {stop_price_type}")
             # Use 'limit' type with stopPrice param for stop-limit
-            return self.session.create_order(symbol, 'limit', side, float(amount_str), float(price_str), params=params)
+            return self._create_order(symbol, 'limit', side, float(amount_str), float(price_str), params=params)
         except Exception as err:
+            if isinstance(err, ccxt.InvalidOrder) and self._reload_markets_after_reject():
+                return self.place_trigger_limit_order(symbol, side, amount, trigger_price, price, reduce, stop_price_type, print_error)
             if print_error:
                 print(f"KuCoin Futures Error placing trigger limit order: {err}")
                 return None
             else:
                 raise err
 
+    def _order_request(self, order: Dict[str, Any], precise: Dict[str, str]) -> Dict[str, Any]:
+        """Converts an order spec of place_orders_bulk into create_order arguments, with its `precise` amount and prices."""
+        symbol = order['symbol']
+        order_type = order.get('type', 'limit')
+        params = {
+            'reduceOnly': order.get('reduce', False),
+            'clientOrderId': order.get('client_order_id') or self.order_ids.next(),
+        }
+        if order_type.startswith('trigger_'):
+            params['stopPrice'] = float(precise['trigger_price'])
+            if order.get('stop_price_type'):
+                params['stopPriceType'] = order['stop_price_type']
+        return {
+            'symbol': symbol,
+            'type': order_type.replace('trigger_', ''),
+            'side': order['side'],
+            'amount': float(precise['amount']),
+            'price': float(precise['price']) if order_type.endswith('limit') else None,
+            'params': params,
+        }
+
+    def place_orders_bulk(self, orders: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Places several orders in one burst instead of one request after the other.
+
+        All amounts and prices are converted to precision up front. Plain market/limit orders go through
+        the batch order endpoint per symbol when ccxt supports it, stop orders through concurrent single
+        requests spaced by the session rate limit. A failing order does not stop the others.
+
+        Args:
+            orders (List[Dict[str, Any]]): Order specs with 'symbol', 'type' ('market', 'limit',
+                                           'trigger_market' or 'trigger_limit'), 'side', 'amount' and,
+                                           depending on the type, 'price', 'trigger_price', 'reduce'
+                                           and 'stop_price_type'. An optional 'client_order_id' replaces
+                                           the generated one.
+            max_workers (int): Maximum number of single requests in flight.
+
+        Returns:
+            List[Dict[str, Any]]: One {'order': ..., 'error': ...} result per spec, in the same order.
+        """
+        results = [{'order': None, 'error': None} for _ in orders]
+        requests = {}
+        precise_orders = orders_to_precision(orders, self.precisions)
+        for i, (order, precise) in enumerate(zip(orders, precise_orders)):
+            try:
+                if isinstance(precise, Exception):
+                    raise precise
+                requests[i] = self._order_request(order, precise)
+            except Exception as e:
+                results[i]['error'] = f"KuCoin Futures: Failed to prepare order {order}: {e}"
+
+        batches = {}
+        singles = []
+        resent = set()
+        for i, request in requests.items():
+            if self.session.has.get('createOrders') and 'stopPrice' not in request['params']:
+                batches.setdefault(request['symbol'], []).append(i)
+            else:
+                singles.append(i)
+
+        for symbol, indexes in batches.items():
+            for chunk_start in range(0, len(indexes), self.create_batch_size):
+                chunk = indexes[chunk_start:chunk_start + self.create_batch_size]
+                print(f"Placing {len(chunk)} KuCoin orders in one batch for {symbol}")
+                try:
+                    created = self.session.create_orders([requests[i] for i in chunk])
+                    for i, order in zip(chunk, created):
+                        results[i]['order'] = order
+                        if order.get('status') == 'rejected':
+                            results[i]['error'] = f"KuCoin Futures: Order rejected: {order.get('info')}"
+                except Exception as e:
+                    if is_retryable(e):
+                        # the batch may have gone through in part, each order is sent again on its own
+                        resent.update(chunk)
+                        singles.extend(chunk)
+                        continue
+                    for i in chunk:
+                        results[i]['error'] = f"KuCoin Futures: Failed to batch place {symbol} orders: {e}"
+
+        if singles:
+            print(f"Placing {len(singles)} KuCoin orders concurrently")
+        responses = run_concurrently(
+            lambda i: self._create_order(**requests[i], resend=i in resent), singles, max_workers, self._request_spacing_ms, return_exceptions=True
+        )
+        for i, response in zip(singles, responses):
+            if isinstance(response, Exception):
+                results[i]['error'] = f"KuCoin Futures: Failed to place {requests[i]['type']} order of {requests[i]['amount']} contracts {requests[i]['symbol']}: {response}"
+            else:
+                results[i]['order'] = response
+
+        return results
+
 # Example Usage (replace with your actual keys and desired symbol)
 # Ensure you have installed ccxt: pip install ccxt pandas
 
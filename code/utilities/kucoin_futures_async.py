@@ -0,0 +1,549 @@
+import asyncio
+import ccxt
+import ccxt.async_support as ccxt_async
+import math
+import pandas as pd
+from typing import Any, Optional, Dict, List, Tuple
+
+from utilities.markets_cache import MarketsCache, DEFAULT_MARKETS_TTL
+from utilities.ohlcv_store import OHLCVStore, ohlcv_to_dataframe
+from utilities.parallel_fetch import stitch_ohlcv
+from utilities.precision import MarketPrecisions, orders_to_precision
+from utilities.rate_limiter import rate_limit_ccxt
+from utilities.retry import DEFAULT_RETRY_POLICY, ClientOrderIds, RetryPolicy, call_with_retries_async, is_retryable, retry_ccxt_reads
+
+class AsyncKucoinFutures():
+    cancel_batch_size = 50
+    create_batch_size = 20 # KuCoin Futures accepts up to 20 orders per batch request
+
+    def __init__(
+        self,
+        api_setup: Optional[Dict[str, Any]] = None,
+        markets_cache: bool = True,
+        markets_ttl: float = DEFAULT_MARKETS_TTL,
+        ohlcv_store: bool = False,
+        rate_limiter: bool = True,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    ) -> None:
+        """
+        Asyncio counterpart of KucoinFutures, built on ccxt.async_support.
+        Use `await AsyncKucoinFutures.create(api_setup)` (or `async with`) so the markets get loaded,
+        and `await close()` when done.
+
+        Args:
+            api_setup (Optional[Dict[str, Any]]): Same as KucoinFutures, including the optional 'sandbox_mode' key.
+            markets_cache (bool): Load markets from the on-disk cache instead of downloading them every run.
+            markets_ttl (float): Age in seconds after which the cached markets are downloaded again.
+            ohlcv_store (bool): Keep closed candles in a local OHLCVStore so each run only downloads the new ones.
+            rate_limiter (bool): Pace the requests with token buckets shared by the bot processes of the machine
+                                 (see rate_limit_ccxt) instead of the per-session ccxt throttle.
+            retry_policy (RetryPolicy): Retries of the reads and, with their client order ID, of the orders
+                                        on network errors.
+        """
+        if api_setup is None:
+            self.session = ccxt_async.kucoinfutures()
+        else:
+            api_setup.setdefault("options", {})
+            api_setup["options"].setdefault("defaultType", "future")
+            self.session = ccxt_async.kucoinfutures(api_setup)
+            if api_setup.get("sandbox_mode", False):
+                 self.session.set_sandbox_mode(True)
+
+        self._sandbox_mode = bool(api_setup and api_setup.get("sandbox_mode", False))
+        cache_name = 'kucoinfutures_sandbox' if self._sandbox_mode else 'kucoinfutures'
+        self._markets_cache = MarketsCache(cache_name, ttl=markets_ttl) if markets_cache else None
+        self._markets_reloaded = False
+        self.rate_limiter = rate_limit_ccxt(self.session, cache_name) if rate_limiter else None
+        self.retry_policy = retry_policy
+        retry_ccxt_reads(self.session, retry_policy)
+        self.order_ids = ClientOrderIds()
+        self.precisions = MarketPrecisions(self.session, self.session.precisionMode == ccxt.DECIMAL_PLACES)
+        self.markets: Dict[str, Any] = {}
+        self.ohlcv_store = OHLCVStore(cache_name) if ohlcv_store else None
+
+    @classmethod
+    async def create(cls, api_setup: Optional[Dict[str, Any]] = None, markets_refresh: str = 'auto', **kwargs: Any) -> 'AsyncKucoinFutures':
+        """Builds the client and loads its markets."""
+        client = cls(api_setup, **kwargs)
+        try:
+            await client.load_markets(markets_refresh)
+        except Exception:
+            await client.close()
+            raise
+        return client
+
+    async def close(self) -> None:
+        """Closes the underlying aiohttp session."""
+        await self.session.close()
+
+    async def __aenter__(self) -> 'AsyncKucoinFutures':
+        if not self.markets:
+            await self.load_markets()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def _public_session(self) -> ccxt.kucoinfutures:
+        """Synchronous unauthenticated session on the same environment, used for background market refreshes."""
+        session = ccxt.kucoinfutures()
+        if self._sandbox_mode:
+            session.set_sandbox_mode(True)
+        return session
+
+    async def load_markets(self, refresh: str = 'auto') -> Dict[str, Any]:
+        """Loads the markets, from the on-disk cache when possible (see MarketsCache.load_cached_into)."""
+        try:
+            if self._markets_cache is not None and self._markets_cache.load_cached_into(self.session, refresh, self._public_session):
+                self.markets = self.session.markets
+            else:
+                self.markets = await self.session.load_markets(reload=True)
+                if self._markets_cache is not None:
+                    self._markets_cache.from_disk = False
+                    self._markets_cache.save(self.markets)
+            return self.markets
+        except Exception as e:
+            raise Exception(f"Failed to load KuCoin Futures markets: {e}")
+
+    async def reload_markets(self) -> Dict[str, Any]:
+        """Downloads the markets again and rewrites the on-disk cache."""
+        return await self.load_markets('force')
+
+    async def _reload_markets_after_reject(self) -> bool:
+        """
+        Reloads the markets once per session if an order was rejected while trading on cached markets.
+        Returns True if the caller should retry.
+        """
+        if self._markets_cache is None or not self._markets_cache.from_disk or self._markets_reloaded:
+            return False
+        self._markets_reloaded = True
+        await self.reload_markets()
+        return True
+
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        """Fetches the ticker information for a specific symbol."""
+        try:
+            return await self.session.fetch_ticker(symbol)
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to fetch ticker for {symbol}: {e}")
+
+    def fetch_min_amount_tradable(self, symbol: str) -> float:
+        """Fetches the minimum order amount (in contracts) for a symbol."""
+        try:
+            min_amount = self.markets[symbol]['limits']['amount']['min']
+            if min_amount is None:
+                 print(f"Warning: Minimum amount not directly found for {symbol}. Check market data: {self.markets[symbol]['limits']}")
+                 return 1.0 # Defaulting to 1 contract, as in KucoinFutures
+            return float(min_amount)
+        except KeyError as e:
+             raise Exception(f"KuCoin Futures: Could not find limit information '{e}' for {symbol} in markets.")
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to fetch minimum amount tradable for {symbol}: {e}")
+
+    def amount_to_precision(self, symbol: str, amount: float) -> str:
+        """Truncates the amount to the lot size of the symbol, in contracts for KuCoin futures."""
+        try:
+            return self.precisions(symbol).amount_to_precision(amount)
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to convert amount {amount} for {symbol} to precision: {e}")
+
+    def price_to_precision(self, symbol: str, price: float) -> str:
+        """Formats the price to the precision required by the exchange for the given symbol."""
+        try:
+            return self.precisions(symbol).price_to_precision(price)
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to convert price {price} to precision for {symbol}: {e}")
+
+    async def fetch_balance(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Fetches the account balance."""
+        if params is None:
+            params = {'type': 'future', 'code': 'USDT'}
+        try:
+            return await self.session.fetch_balance(params=params)
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to fetch balance: {e}")
+
+    async def fetch_order(self, id: str, symbol: str) -> Dict[str, Any]:
+        """Fetches information about a specific order by its ID."""
+        try:
+            return await self.session.fetch_order(id, symbol)
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to fetch order {id} info for {symbol}: {e}")
+
+    async def fetch_open_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        """Fetches all open orders for a specific symbol."""
+        try:
+            return await self.session.fetch_open_orders(symbol)
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to fetch open orders for {symbol}: {e}")
+
+    async def fetch_open_trigger_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        """Fetches open stop/trigger orders for a symbol."""
+        try:
+            return await self.session.fetch_open_orders(symbol, params={'stop': True})
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to fetch open trigger orders for {symbol}: {e}. Check ccxt implementation details.")
+
+    async def fetch_closed_trigger_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        """Fetches closed stop/trigger orders for a symbol."""
+        try:
+            return await self.session.fetch_closed_orders(symbol, params={'stop': True})
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to fetch closed trigger orders for {symbol}: {e}. This might require fetch_orders with filtering.")
+
+    async def cancel_order(self, id: str, symbol: str) -> Dict[str, Any]:
+        """Cancels a regular open order."""
+        try:
+            return await self.session.cancel_order(id, symbol)
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to cancel the {symbol} order {id}: {e}")
+
+    async def cancel_trigger_order(self, id: str, symbol: str) -> Dict[str, Any]:
+        """Cancels an open stop/trigger order."""
+        try:
+            return await self.session.cancel_order(id, symbol, params={'stop': True})
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to cancel the {symbol} trigger order {id}: {e}. Check ccxt implementation details.")
+
+    async def cancel_orders_bulk(self, ids: List[str], symbol: str, trigger: bool = False, max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Batch cancel endpoint when ccxt supports one, otherwise concurrent single cancels (see KucoinFutures.cancel_orders_bulk)."""
+        if not ids:
+            return []
+        params = {'stop': True} if trigger else {}
+        if self.session.has.get('cancelOrders'):
+            try:
+                batches = [ids[i:i + self.cancel_batch_size] for i in range(0, len(ids), self.cancel_batch_size)]
+                responses = await asyncio.gather(*[self.session.cancel_orders(batch, symbol, params=params) for batch in batches])
+                return [result for response in responses for result in response]
+            except Exception as e:
+                raise Exception(f"KuCoin Futures: Failed to batch cancel the {symbol} {'trigger ' if trigger else ''}orders {ids}: {e}")
+
+        # the rate limiter spaces the requests, the semaphore bounds how many are in flight
+        cancel = self.cancel_trigger_order if trigger else self.cancel_order
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def cancel_one(id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await cancel(id, symbol)
+
+        results = await asyncio.gather(*[cancel_one(id) for id in ids], return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise Exception(f"KuCoin Futures: Failed to cancel {len(errors)} of {len(ids)} {symbol} orders: {errors}")
+        return results
+
+    async def cancel_all_trigger_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        """Cancels every open stop/trigger order of a symbol, in one request when the exchange supports it."""
+        if self.session.has.get('cancelAllOrders'):
+            try:
+                return await self.session.cancel_all_orders(symbol, params={'stop': True})
+            except Exception as e:
+                raise Exception(f"KuCoin Futures: Failed to cancel all the {symbol} trigger orders: {e}")
+        trigger_orders = await self.fetch_open_trigger_orders(symbol)
+        return await self.cancel_orders_bulk([order['id'] for order in trigger_orders], symbol, trigger=True)
+
+    async def fetch_open_positions(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Fetches open positions, optionally filtered by symbol."""
+        try:
+            positions = await self.session.fetch_positions(symbols=[symbol] if symbol else None)
+            return [
+                p for p in positions if p.get('info') and float(p['info'].get('currentQty', 0)) != 0
+            ]
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to fetch open positions for {symbol if symbol else 'all symbols'}: {e}")
+
+    async def close_position(self, symbol: str, side: Optional[str] = None) -> Dict[str, Any]:
+        """Closes an open position for the given symbol using ccxt's close_position."""
+        try:
+            return await self.session.close_position(symbol, side=side)
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to close position for {symbol}: {e}")
+
+    async def set_margin_mode(self, symbol: str, margin_mode: str = 'isolated') -> None:
+        """Sets the margin mode (isolated or cross) for a symbol."""
+        try:
+            await self.session.set_margin_mode(margin_mode.lower(), symbol)
+            print(f"KuCoin Futures: Set margin mode to {margin_mode} for {symbol}")
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to set margin mode for {symbol}: {e}. Ensure no open positions/orders.")
+
+    async def set_leverage(self, symbol: str, leverage: int, params: Optional[Dict[str, Any]] = None) -> None:
+        """Sets the leverage for a symbol."""
+        if params is None:
+            params = {}
+        try:
+            await self.session.set_leverage(leverage, symbol, params=params)
+            print(f"KuCoin Futures: Set leverage to {leverage}x for {symbol}")
+        except Exception as e:
+            raise Exception(f"KuCoin Futures: Failed to set leverage for {symbol}: {e}")
+
+    async def _back_off(self, endpoint_class: str, seconds: float) -> None:
+        """Waits out a rate limit error. With the shared rate limiter, the other bot processes hold off too."""
+        if self.rate_limiter is None:
+            await asyncio.sleep(seconds)
+        else:
+            self.rate_limiter.hold(endpoint_class, seconds)  # the retried call waits in the limiter
+
+    async def _fetch_ohlcv_page(self, symbol: str, timeframe: str, window: Tuple[int, int]) -> List[List[float]]:
+        """Fetches one page of `window[1]` candles starting at `window[0]`, waiting out up to retry_policy.attempts rate limit errors."""
+        for attempt in range(self.retry_policy.attempts):
+            try:
+                return await self.session.fetch_ohlcv(symbol, timeframe, since=window[0], limit=window[1])
+            except ccxt.RateLimitExceeded as e:
+                if attempt + 1 >= self.retry_policy.attempts:
+                    raise Exception(f"KuCoin Futures: Still rate limited fetching OHLCV data for {symbol} after {attempt + 1} attempts: {e}")
+                print(f"Rate limit exceeded, sleeping: {e}")
+                await self._back_off('public', 5)
+            except Exception as e:
+                raise Exception(f"KuCoin Futures: Failed to fetch OHLCV data chunk for {symbol} in timeframe {timeframe}: {e}")
+
+    async def _fetch_ohlcv_candles(self, symbol: str, timeframe: str, limit: int, end_timestamp: int, max_workers: int = 1) -> List[List[float]]:
+        """
+        Fetches the `limit` candles ending at `end_timestamp`. The pages are computed up front and
+        fetched with at most `max_workers` in flight; the rate limiter spaces the requests.
+        """
+        kucoin_fetch_limit = 1500
+        timeframe_to_milliseconds = self.session.parse_timeframe(timeframe) * 1000
+        since = end_timestamp - limit * timeframe_to_milliseconds
+        windows = [
+            (since + offset * timeframe_to_milliseconds, min(kucoin_fetch_limit, limit - offset))
+            for offset in range(0, limit, kucoin_fetch_limit)
+        ]
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def fetch_page(window: Tuple[int, int]) -> List[List[float]]:
+            async with semaphore:
+                return await self._fetch_ohlcv_page(symbol, timeframe, window)
+
+        pages = await asyncio.gather(*[fetch_page(window) for window in windows])
+        return stitch_ohlcv(pages)[-limit:]
+
+    async def fetch_recent_ohlcv(self, symbol: str, timeframe: str, limit: int = 1000, max_workers: int = 1) -> pd.DataFrame:
+        """
+        Fetches recent OHLCV data, see KucoinFutures.fetch_recent_ohlcv.
+
+        Returns:
+            pd.DataFrame: DataFrame with OHLCV data indexed by timestamp.
+        """
+        end_timestamp = self.session.milliseconds()
+
+        if self.ohlcv_store is None:
+            all_ohlcv = await self._fetch_ohlcv_candles(symbol, timeframe, limit, end_timestamp, max_workers)
+        else:
+            timeframe_to_milliseconds = self.session.parse_timeframe(timeframe) * 1000
+            start_timestamp = end_timestamp - limit * timeframe_to_milliseconds
+            fetch_from = self.ohlcv_store.fetch_start(symbol, timeframe, timeframe_to_milliseconds, start_timestamp)
+            missing = math.ceil((end_timestamp - fetch_from) / timeframe_to_milliseconds)
+            fetched = await self._fetch_ohlcv_candles(symbol, timeframe, missing, end_timestamp, max_workers) if missing > 0 else []
+            all_ohlcv = self.ohlcv_store.merge(
+                symbol, timeframe, timeframe_to_milliseconds, start_timestamp, end_timestamp, fetched
+            )[-limit:]
+
+        if not len(all_ohlcv):
+             return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+        return ohlcv_to_dataframe(all_ohlcv)
+
+    async def _find_order_by_client_id(self, symbol: str, client_order_id: str, trigger: bool = False) -> Optional[Dict[str, Any]]:
+        """Looks an order up by client order ID among the open orders, then the closed ones (e.g. a filled market order)."""
+        params = {'stop': True} if trigger else {}
+        for fetch in (self.session.fetch_open_orders, self.session.fetch_closed_orders):
+            for order in await fetch(symbol, params=params):
+                if order.get('clientOrderId') == client_order_id:
+                    return order
+        return None
+
+    async def _create_order(
+        self,
+        symbol: str,
+        type: str,
+        side: str,
+        amount: float,
+        price: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None,
+        resend: bool = False,
+    ) -> Dict[str, Any]:
+        """KuCoinFutures._create_order: retried with a fixed client order ID, looked up before a retry."""
+        params = dict(params or {})
+        params.setdefault('clientOrderId', self.order_ids.next())
+        return await call_with_retries_async(
+            lambda: self.session.create_order(symbol, type, side, amount, price, params=params),
+            f"KuCoin Futures: {type} {side} order of {amount} contracts {symbol}",
+            self.retry_policy,
+            lambda: self._find_order_by_client_id(symbol, params['clientOrderId'], 'stopPrice' in params),
+            resend,
+        )
+
+    async def place_market_order(self, symbol: str, side: str, amount: float, reduce: bool = False) -> Dict[str, Any]:
+        """Places a market order."""
+        try:
+            params = {
+                'reduceOnly': reduce,
+            }
+            amount_str = self.amount_to_precision(symbol, amount)
+            print(f"Placing KuCoin Market Order: {symbol}, {side}, Amount: {amount_str}, Reduce: {reduce}")
+            return await self._create_order(symbol, 'market', side, float(amount_str), params=params)
+
+        except Exception as e:
+            if isinstance(e, ccxt.InvalidOrder) and await self._reload_markets_after_reject():
+                return await self.place_market_order(symbol, side, amount, reduce)
+            raise Exception(f"KuCoin Futures: Failed to place market order of {amount} contracts {symbol}: {e}")
+
+    async def place_limit_order(self, symbol: str, side: str, amount: float, price: float, reduce: bool = False) -> Dict[str, Any]:
+        """Places a limit order."""
+        try:
+            params = {
+                'reduceOnly': reduce,
+            }
+            amount_str = self.amount_to_precision(symbol, amount)
+            price_str = self.price_to_precision(symbol, price)
+            print(f"Placing KuCoin Limit Order: {symbol}, {side}, Amount: {amount_str}, Price: {price_str}, Reduce: {reduce}")
+            return await self._create_order(symbol, 'limit', side, float(amount_str), float(price_str), params=params)
+
+        except Exception as e:
+            if isinstance(e, ccxt.InvalidOrder) and await self._reload_markets_after_reject():
+                return await self.place_limit_order(symbol, side, amount, price, reduce)
+            raise Exception(f"KuCoin Futures: Failed to place limit order of {amount} contracts {symbol} at price {price}: {e}")
+
+    async def place_trigger_market_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        trigger_price: float,
+        reduce: bool = False,
+        stop_price_type: Optional[str] = None, # e.g., 'MP', 'IP', 'TP' - Mark, Index, Trade Price
+        print_error: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Places a stop-market (trigger) order."""
+        try:
+            amount_str = self.amount_to_precision(symbol, amount)
+            trigger_price_str = self.price_to_precision(symbol, trigger_price)
+            params = {
+                'reduceOnly': reduce,
+                'stopPrice': float(trigger_price_str),
+            }
+            if stop_price_type:
+                params['stopPriceType'] = stop_price_type
+
+            print(f"Placing KuCoin Trigger Market: {symbol}, {side}, Amount: {amount_str}, Trigger: {trigger_price_str}, Reduce: {reduce}, StopType: {stop_price_type}")
+            return await self._create_order(symbol, 'market', side, float(amount_str), params=params)
+        except Exception as err:
+            if isinstance(err, ccxt.InvalidOrder) and await self._reload_markets_after_reject():
+                return await self.place_trigger_market_order(symbol, side, amount, trigger_price, reduce, stop_price_type, print_error)
+            if print_error:
+                print(f"KuCoin Futures Error placing trigger market order: {err}")
+                return None
+            else:
+                raise err
+
+    async def place_trigger_limit_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        trigger_price: float,
+        price: float, # The limit price once triggered
+        reduce: bool = False,
+        stop_price_type: Optional[str] = None, # e.g., 'MP', 'IP', 'TP'
+        print_error: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Places a stop-limit (trigger) order."""
+        try:
+            amount_str = self.amount_to_precision(symbol, amount)
+            trigger_price_str = self.price_to_precision(symbol, trigger_price)
+            price_str = self.price_to_precision(symbol, price)
+            params = {
+                'reduceOnly': reduce,
+                'stopPrice': float(trigger_price_str),
+            }
+            if stop_price_type:
+                params['stopPriceType'] = stop_price_type
+
+            print(f"Placing KuCoin Trigger Limit: {symbol}, {side}, Amount: {amount_str}, Trigger: {trigger_price_str}, LimitPrice: {price_str}, Reduce: {reduce}, StopType: {stop_price_type}")
+            return await self._create_order(symbol, 'limit', side, float(amount_str), float(price_str), params=params)
+        except Exception as err:
+            if isinstance(err, ccxt.InvalidOrder) and await self._reload_markets_after_reject():
+                return await self.place_trigger_limit_order(symbol, side, amount, trigger_price, price, reduce, stop_price_type, print_error)
+            if print_error:
+                print(f"KuCoin Futures Error placing trigger limit order: {err}")
+                return None
+            else:
+                raise err
+
+    def _order_request(self, order: Dict[str, Any], precise: Dict[str, str]) -> Dict[str, Any]:
+        symbol = order['symbol']
+        order_type = order.get('type', 'limit')
+        params = {
+            'reduceOnly': order.get('reduce', False),
+            'clientOrderId': order.get('client_order_id') or self.order_ids.next(),
+        }
+        if order_type.startswith('trigger_'):
+            params['stopPrice'] = float(precise['trigger_price'])
+            if order.get('stop_price_type'):
+                params['stopPriceType'] = order['stop_price_type']
+        return {
+            'symbol': symbol,
+            'type': order_type.replace('trigger_', ''),
+            'side': order['side'],
+            'amount': float(precise['amount']),
+            'price': float(precise['price']) if order_type.endswith('limit') else None,
+            'params': params,
+        }
+
+    async def place_orders_bulk(self, orders: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Async counterpart of KucoinFutures.place_orders_bulk, batches and single requests are sent concurrently."""
+        results = [{'order': None, 'error': None} for _ in orders]
+        requests = {}
+        precise_orders = orders_to_precision(orders, self.precisions)
+        for i, (order, precise) in enumerate(zip(orders, precise_orders)):
+            try:
+                if isinstance(precise, Exception):
+                    raise precise
+                requests[i] = self._order_request(order, precise)
+            except Exception as e:
+                results[i]['error'] = f"KuCoin Futures: Failed to prepare order {order}: {e}"
+
+        batches = []
+        singles = []
+        by_symbol = {}
+        for i, request in requests.items():
+            if self.session.has.get('createOrders') and 'stopPrice' not in request['params']:
+                by_symbol.setdefault(request['symbol'], []).append(i)
+            else:
+                singles.append(i)
+        for indexes in by_symbol.values():
+            batches.extend(indexes[j:j + self.create_batch_size] for j in range(0, len(indexes), self.create_batch_size))
+
+        # the rate limiter spaces the requests, the semaphore bounds how many are in flight
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def place_batch(chunk: List[int]) -> None:
+            async with semaphore:
+                try:
+                    created = await self.session.create_orders([requests[i] for i in chunk])
+                except Exception as e:
+                    if not is_retryable(e):
+                        for i in chunk:
+                            results[i]['error'] = f"KuCoin Futures: Failed to batch place {requests[i]['symbol']} orders: {e}"
+                        return
+                    created = None
+            if created is None:
+                # the batch may have gone through in part, each order is sent again on its own
+                await asyncio.gather(*[place_one(i, resend=True) for i in chunk])
+                return
+            for i, order in zip(chunk, created):
+                results[i]['order'] = order
+                if order.get('status') == 'rejected':
+                    results[i]['error'] = f"KuCoin Futures: Order rejected: {order.get('info')}"
+
+        async def place_one(i: int, resend: bool = False) -> None:
+            request = requests[i]
+            async with semaphore:
+                try:
+                    results[i]['order'] = await self._create_order(**request, resend=resend)
+                except Exception as e:
+                    results[i]['error'] = f"KuCoin Futures: Failed to place {request['type']} order of {request['amount']} contracts {request['symbol']}: {e}"
+
+        await asyncio.gather(*[place_batch(chunk) for chunk in batches], *[place_one(i) for i in singles])
+        return results
@@ -0,0 +1,438 @@
+import json
+import time
+import asyncio
+import traceback
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+from utilities.ohlcv_store import OHLCV_COLUMNS, ohlcv_to_dataframe
+from utilities.retry import RetryPolicy
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# reconnects never give up, `attempts` is not used
+RECONNECT_BACKOFF = RetryPolicy(base_delay=1.0, max_delay=30.0)
+
+
+@dataclass(frozen=True)
+class CandleClose:
+    symbol: str
+    timeframe: str
+    candle: Tuple[float, ...]  # timestamp (ms, candle open), open, high, low, close, volume
+    received_at: float  # time.time() when the close was detected
+    contiguous: bool  # the book holds the candles before this one without a gap, e.g. none missed during a reconnect
+
+
+@dataclass(frozen=True)
+class Ticker:
+    symbol: str
+    last: float
+    timestamp: int  # ms
+
+
+class CandleBook():
+    def __init__(self, max_candles: int = 1000) -> None:
+        """
+        Closed candles of each (symbol, timeframe) in memory, plus the candle still open.
+
+        Candle updates for the open candle replace it; the first update of a newer candle closes it. A
+        candle whose end is past can also be closed by close_due, for the symbols whose next candle has
+        no trade yet. Updates older than the open candle, e.g. replayed after a reconnect, are ignored.
+
+        Args:
+            max_candles (int): Closed candles kept per (symbol, timeframe), the oldest are dropped.
+        """
+        self.max_candles = max_candles
+        self._timeframe_ms: Dict[Tuple[str, str], int] = {}
+        self._closed: Dict[Tuple[str, str], Deque[Tuple[float, ...]]] = {}
+        self._open: Dict[Tuple[str, str], Tuple[float, ...]] = {}
+
+    def track(self, symbol: str, timeframe: str, timeframe_ms: int) -> None:
+        key = (symbol, timeframe)
+        self._timeframe_ms[key] = timeframe_ms
+        self._closed.setdefault(key, deque(maxlen=self.max_candles))
+
+    def seed(self, symbol: str, timeframe: str, candles: Any) -> None:
+        """Replaces the closed candles with `candles`, rows of OHLCV_COLUMNS sorted by timestamp, e.g. from the REST API."""
+        key = (symbol, timeframe)
+        rows = np.asarray(candles, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        self._closed[key] = deque((tuple(row) for row in rows.tolist()), maxlen=self.max_candles)
+        open_candle = self._open.get(key)
+        if open_candle is not None and self._closed[key] and open_candle[0] <= self._closed[key][-1][0]:
+            del self._open[key]
+
+    def update(self, symbol: str, timeframe: str, candle: Tuple[float, ...]) -> Optional[CandleClose]:
+        """Applies a candle update and returns the candle it closed, if any."""
+        key = (symbol, timeframe)
+        closed = self._closed[key]
+        if closed and candle[0] <= closed[-1][0]:
+            return None
+        event = None
+        open_candle = self._open.get(key)
+        if open_candle is not None:
+            if candle[0] < open_candle[0]:
+                return None
+            if candle[0] > open_candle[0]:
+                event = self._close(key)
+        self._open[key] = tuple(candle)
+        return event
+
+    def backfill(self, symbol: str, timeframe: str, candles: List[Tuple[float, ...]]) -> Optional[CandleClose]:
+        """
+        Adds the closed candles the book is missing, e.g. the history a stream sends when (re)subscribing,
+        and returns the close of the newest one added: after a reconnect, the candle that closed meanwhile.
+        """
+        key = (symbol, timeframe)
+        closed = self._closed[key]
+        new = [tuple(candle) for candle in candles if not closed or candle[0] > closed[-1][0]]
+        if not new:
+            return None
+        open_candle = self._open.get(key)
+        if open_candle is not None and open_candle[0] <= new[-1][0]:
+            del self._open[key]
+        timestamps = ([closed[-1][0]] if closed else []) + [candle[0] for candle in new]
+        contiguous = len(timestamps) > 1 and all(
+            later - earlier == self._timeframe_ms[key] for earlier, later in zip(timestamps, timestamps[1:])
+        )
+        closed.extend(new)
+        return CandleClose(symbol, timeframe, new[-1], time.time(), contiguous)
+
+    def close_due(self, now_ms: float) -> List[CandleClose]:
+        """Closes the open candles whose period ended before `now_ms`."""
+        return [
+            self._close(key) for key, candle in list(self._open.items())
+            if candle[0] + self._timeframe_ms[key] <= now_ms
+        ]
+
+    def next_close(self) -> Optional[float]:
+        """ms timestamp at which the first open candle ends."""
+        ends = [candle[0] + self._timeframe_ms[key] for key, candle in self._open.items()]
+        return min(ends) if ends else None
+
+    def _close(self, key: Tuple[str, str]) -> CandleClose:
+        candle = self._open.pop(key)
+        closed = self._closed[key]
+        contiguous = bool(closed) and closed[-1][0] + self._timeframe_ms[key] == candle[0]
+        closed.append(candle)
+        return CandleClose(key[0], key[1], candle, time.time(), contiguous)
+
+    def candles(self, symbol: str, timeframe: str, limit: Optional[int] = None) -> np.ndarray:
+        """The last `limit` closed candles as a (n, 6) array, a copy safe to hand to another thread."""
+        closed = self._closed.get((symbol, timeframe), ())
+        rows = list(closed)[-limit:] if limit else list(closed)
+        return np.asarray(rows, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+
+    def dataframe(self, symbol: str, timeframe: str, limit: Optional[int] = None) -> 'pd.DataFrame':
+        """Closed candles in the DataFrame layout of fetch_recent_ohlcv, without its trailing open candle."""
+        return ohlcv_to_dataframe(self.candles(symbol, timeframe, limit))
+
+
+class StreamProtocol(ABC):
+    """
+    Message format of one exchange's public WebSocket API. `parse` turns a received message into
+    ('candle', symbol, timeframe, candle), ('history', symbol, timeframe, closed candles) and
+    ('ticker', Ticker) items, with the symbols the caller subscribed with.
+    """
+    url = ''
+    ping_interval = 20.0  # seconds between two application pings, the exchanges drop silent connections
+    timeframes: Dict[str, Tuple[str, int]] = {}  # timeframe: (channel, ms)
+
+    def timeframe_ms(self, timeframe: str) -> int:
+        if timeframe not in self.timeframes:
+            raise ValueError(f"The timeframe {timeframe} is not supported by {type(self).__name__}")
+        return self.timeframes[timeframe][1]
+
+    @abstractmethod
+    def subscribe_messages(self, candles: List[Tuple[str, str]], tickers: List[str]) -> List[Any]:
+        """Messages subscribing to the candles of (symbol, timeframe) pairs and to the tickers of symbols."""
+
+    @abstractmethod
+    def ping_message(self) -> Any:
+        """Application ping, a str sent as is or a dict sent as JSON."""
+
+    @abstractmethod
+    def parse(self, message: str) -> List[Tuple[Any, ...]]:
+        """The items of a received text message, see the class docstring."""
+
+
+class BitgetStreamProtocol(StreamProtocol):
+    url = 'wss://ws.bitget.com/v2/ws/public'
+    ping_interval = 25.0
+    timeframes = {
+        '1m': ('candle1m', 60000), '5m': ('candle5m', 300000), '15m': ('candle15m', 900000), '30m': ('candle30m', 1800000),
+        '1h': ('candle1H', 3600000), '4h': ('candle4H', 14400000), '12h': ('candle12H', 43200000), '1d': ('candle1D', 86400000),
+    }
+
+    def __init__(self, url: Optional[str] = None, inst_type: str = 'USDT-FUTURES') -> None:
+        self.url = url or self.url
+        self.inst_type = inst_type
+        self._symbols: Dict[str, str] = {}  # instId: ccxt symbol
+        self._timeframes = {channel: timeframe for timeframe, (channel, _) in self.timeframes.items()}
+
+    @staticmethod
+    def inst_id(symbol: str) -> str:
+        # 'BTC/USDT:USDT' -> 'BTCUSDT'
+        return symbol.split(':')[0].replace('/', '')
+
+    def _arg(self, symbol: str, channel: str) -> Dict[str, str]:
+        self._symbols[self.inst_id(symbol)] = symbol
+        return {'instType': self.inst_type, 'channel': channel, 'instId': self.inst_id(symbol)}
+
+    def subscribe_messages(self, candles: List[Tuple[str, str]], tickers: List[str]) -> List[Any]:
+        args = [self._arg(symbol, self.timeframes[timeframe][0]) for symbol, timeframe in candles]
+        args += [self._arg(symbol, 'ticker') for symbol in tickers]
+        return [{'op': 'subscribe', 'args': args}] if args else []
+
+    def ping_message(self) -> Any:
+        return 'ping'
+
+    def parse(self, message: str) -> List[Tuple[Any, ...]]:
+        if message == 'pong':
+            return []
+        payload = json.loads(message)
+        if payload.get('event') == 'error':
+            raise ValueError(f"Bitget stream error {payload.get('code')}: {payload.get('msg')}")
+        arg, data = payload.get('arg') or {}, payload.get('data')
+        symbol = self._symbols.get(arg.get('instId'))
+        if not data or symbol is None:
+            return []
+        channel = arg.get('channel', '')
+        if channel in self._timeframes:
+            # [ts, open, high, low, close, base volume, quote volume, USDT volume], oldest first
+            timeframe = self._timeframes[channel]
+            candles = sorted(tuple(float(value) for value in row[:6]) for row in data)
+            if payload.get('action') == 'snapshot':
+                # sent on subscribing: the recent history, the last candle still open
+                return [('history', symbol, timeframe, candles[:-1]), ('candle', symbol, timeframe, candles[-1])]
+            return [('candle', symbol, timeframe, candle) for candle in candles]
+        if channel == 'ticker':
+            return [('ticker', Ticker(symbol, float(item['lastPr']), int(item['ts']))) for item in data]
+        return []
+
+
+class BitunixStreamProtocol(StreamProtocol):
+    url = 'wss://fapi.bitunix.com/public/'
+    timeframes = {
+        '1m': ('market_kline_1min', 60000), '5m': ('market_kline_5min', 300000), '15m': ('market_kline_15min', 900000),
+        '30m': ('market_kline_30min', 1800000), '1h': ('market_kline_60min', 3600000), '4h': ('market_kline_4h', 14400000),
+        '1d': ('market_kline_1day', 86400000),
+    }
+
+    def __init__(self, url: Optional[str] = None) -> None:
+        self.url = url or self.url
+        self._timeframes = {channel: timeframe for timeframe, (channel, _) in self.timeframes.items()}
+
+    def subscribe_messages(self, candles: List[Tuple[str, str]], tickers: List[str]) -> List[Any]:
+        args = [{'symbol': symbol, 'ch': self.timeframes[timeframe][0]} for symbol, timeframe in candles]
+        args += [{'symbol': symbol, 'ch': 'ticker'} for symbol in tickers]
+        return [{'op': 'subscribe', 'args': args}] if args else []
+
+    def ping_message(self) -> Any:
+        return {'op': 'ping', 'ping': int(time.time())}
+
+    def parse(self, message: str) -> List[Tuple[Any, ...]]:
+        payload = json.loads(message)
+        channel, data, symbol = payload.get('ch'), payload.get('data'), payload.get('symbol')
+        if not data or not symbol:
+            return []
+        if channel in self._timeframes:
+            # the push carries its own time, not the candle's: the candle is the one that time falls in
+            timeframe = self._timeframes[channel]
+            timeframe_ms = self.timeframes[timeframe][1]
+            timestamp = int(payload['ts']) // timeframe_ms * timeframe_ms
+            candle = (float(timestamp), float(data['o']), float(data['h']), float(data['l']), float(data['c']), float(data['b']))
+            return [('candle', symbol, timeframe, candle)]
+        if channel == 'ticker':
+            return [('ticker', Ticker(symbol, float(data['la']), int(payload['ts'])))]
+        return []
+
+
+class WebSocketStream(ABC):
+    """
+    One WebSocket connection kept open until stop(): re-established with backoff when it drops, with the
+    subscriptions sent again on each connection, and pinged so the exchange does not drop it as idle.
+    Subclasses send their subscriptions in `_on_connect` and handle each text message in `_handle`.
+    """
+    name = 'stream'  # for the log lines
+
+    def __init__(self, protocol: Any, reconnect_backoff: RetryPolicy = RECONNECT_BACKOFF) -> None:
+        self.protocol = protocol
+        self.reconnect_backoff = reconnect_backoff
+        self._stopped = asyncio.Event()
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def run(self) -> None:
+        """Streams until stop() is called."""
+        self._stopped.clear()
+        retry = 0
+        async with aiohttp.ClientSession() as session:
+            while not self._stopped.is_set():
+                try:
+                    if await self._stream(session):
+                        retry = 0
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ {self.name} failed: {e!r}")
+                if self._stopped.is_set():
+                    break
+                delay = self.reconnect_backoff.delay(retry)
+                retry += 1
+                print(f"{datetime.now().strftime('%H:%M:%S')}: {self.name} reconnecting in {delay:.1f}s")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _stream(self, session: aiohttp.ClientSession) -> bool:
+        # one connection, until it drops; returns whether any data was received on it
+        received = False
+        async with session.ws_connect(self.protocol.url) as ws:
+            self._ws = ws
+            pinger = asyncio.create_task(self._ping(ws))
+            try:
+                await self._on_connect(ws)
+                async for message in ws:
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    received = True
+                    try:
+                        await self._handle(message.data)
+                    except Exception:
+                        # a message of an unexpected shape is skipped, it must not stop the stream
+                        print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ {self.name} skipped a message it could not handle: {message.data[:200]}")
+                        traceback.print_exc()
+            finally:
+                pinger.cancel()
+                self._ws = None
+                self._on_disconnect()
+        return received
+
+    @abstractmethod
+    async def _on_connect(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Sends the subscriptions on a new connection."""
+
+    def _on_disconnect(self) -> None:
+        pass
+
+    @abstractmethod
+    async def _handle(self, message: str) -> None:
+        """Handles one received text message."""
+
+    async def _ping(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        while True:
+            await asyncio.sleep(self.protocol.ping_interval)
+            message = self.protocol.ping_message()
+            await (ws.send_str(message) if isinstance(message, str) else ws.send_json(message))
+
+    async def _dispatch(self, callbacks: List[Callable[[Any], Any]], event: Any) -> None:
+        for callback in callbacks:
+            try:
+                result = callback(event)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                # a failing callback must not stop the stream
+                print(f"{datetime.now().strftime('%H:%M:%S')}: /!\\ {self.name} callback failed")
+                traceback.print_exc()
+
+
+class MarketDataFeed(WebSocketStream):
+    name = 'market stream'
+
+    def __init__(
+        self,
+        protocol: StreamProtocol,
+        book: Optional[CandleBook] = None,
+        close_grace: float = 2.0,
+        reconnect_backoff: RetryPolicy = RECONNECT_BACKOFF,
+    ) -> None:
+        """
+        One WebSocket connection streaming the candles and tickers of many symbols into a CandleBook, and
+        calling the candle close callbacks as soon as a candle closes: when the first update of the next
+        candle arrives, or `close_grace` seconds after its end when no trade opened the next one yet.
+        The connection is re-established with backoff when it drops, and the subscriptions resent.
+
+            feed = MarketDataFeed(BitgetStreamProtocol())
+            feed.subscribe_candles('BTC/USDT:USDT', '1h')
+            feed.on_candle_close(lambda event: print(event.symbol, event.candle))
+            await feed.run()
+
+        Args:
+            protocol (StreamProtocol): Exchange message format, and the URL (e.g. of market_stream_stub).
+            book (Optional[CandleBook]): Where the candles are kept, e.g. one seeded from the REST API.
+            close_grace (float): Seconds after a candle's end before it is closed without a next candle.
+            reconnect_backoff (RetryPolicy): Delays between reconnection attempts.
+        """
+        super().__init__(protocol, reconnect_backoff)
+        self.book = book or CandleBook()
+        self.close_grace = close_grace
+        self.tickers: Dict[str, Ticker] = {}
+        self._candle_subscriptions: List[Tuple[str, str]] = []
+        self._ticker_subscriptions: List[str] = []
+        self._candle_callbacks: List[Callable[[CandleClose], Any]] = []
+        self._ticker_callbacks: List[Callable[[Ticker], Any]] = []
+
+    def subscribe_candles(self, symbol: str, timeframe: str) -> None:
+        if (symbol, timeframe) not in self._candle_subscriptions:
+            self.book.track(symbol, timeframe, self.protocol.timeframe_ms(timeframe))
+            self._candle_subscriptions.append((symbol, timeframe))
+
+    def subscribe_ticker(self, symbol: str) -> None:
+        if symbol not in self._ticker_subscriptions:
+            self._ticker_subscriptions.append(symbol)
+
+    def on_candle_close(self, callback: Callable[[CandleClose], Any]) -> None:
+        """`callback(event)` runs on the event loop, a coroutine is awaited: hand slow work to an executor."""
+        self._candle_callbacks.append(callback)
+
+    def on_ticker(self, callback: Callable[[Ticker], Any]) -> None:
+        self._ticker_callbacks.append(callback)
+
+    async def run(self) -> None:
+        """Streams until stop() is called."""
+        closer = asyncio.create_task(self._close_due_candles())
+        try:
+            await super().run()
+        finally:
+            closer.cancel()
+
+    async def _on_connect(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        for message in self.protocol.subscribe_messages(self._candle_subscriptions, self._ticker_subscriptions):
+            await ws.send_json(message)
+
+    async def _handle(self, message: str) -> None:
+        for item in self.protocol.parse(message):
+            if item[0] in ('candle', 'history'):
+                kind, symbol, timeframe, candles = item
+                if (symbol, timeframe) not in self._candle_subscriptions:
+                    continue
+                if kind == 'candle':
+                    event = self.book.update(symbol, timeframe, candles)
+                else:
+                    event = self.book.backfill(symbol, timeframe, candles)
+                if event is not None:
+                    await self._dispatch(self._candle_callbacks, event)
+            elif item[0] == 'ticker':
+                self.tickers[item[1].symbol] = item[1]
+                await self._dispatch(self._ticker_callbacks, item[1])
+
+    async def _close_due_candles(self) -> None:
+        while True:
+            next_close = self.book.next_close()
+            # wakes up at least every second, a candle opened in between may end sooner
+            delay = 1.0 if next_close is None else next_close / 1000 + self.close_grace - time.time()
+            await asyncio.sleep(min(1.0, max(0.0, delay)))
+            for event in self.book.close_due((time.time() - self.close_grace) * 1000):
+                await self._dispatch(self._candle_callbacks, event)
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence
+
+from aiohttp import WSMsgType, web
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utilities.market_stream import BitgetStreamProtocol
+
+
+class StubMarketServer():
+    def __init__(self, host: str = '127.0.0.1', port: int = 0) -> None:
+        """
+        Local WebSocket server speaking the Bitget stream protocol, to run MarketDataFeed, AccountStream
+        and the daemon without the exchange: it answers pings, logins (any credentials) and subscriptions,
+        and pushes the candles, tickers, orders and positions it is given to every subscribed client.
+
+            server = StubMarketServer()
+            url = await server.start()
+            feed = MarketDataFeed(BitgetStreamProtocol(url))
+            ...
+            await server.send_candle('BTCUSDT', '1m', [timestamp, open, high, low, close, volume])
+
+        Args:
+            host (str): Interface to listen on.
+            port (int): Port to listen on, 0 picks a free one.
+        """
+        self.host = host
+        self.port = port
+        self.subscriptions: List[Dict[str, Any]] = []  # every subscribe arg received, in order
+        self._clients: Dict[web.WebSocketResponse, List[Dict[str, Any]]] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get('/', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+        return self.url
+
+    async def stop(self) -> None:
+        await self.drop_clients()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def drop_clients(self) -> None:
+        """Closes every connection, e.g. to exercise the reconnection of a feed."""
+        for ws in list(self._clients):
+            await ws.close()
+
+    async def wait_for_subscriptions(self, count: int, timeout: float = 5.0) -> None:
+        deadline = time.time() + timeout
+        while len(self.subscriptions) < count:
+            if time.time() > deadline:
+                raise TimeoutError(f"{len(self.subscriptions)} of {count} subscriptions received")
+            await asyncio.sleep(0.01)
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._clients[ws] = []
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    break
+                if message.data == 'ping':
+                    await ws.send_str('pong')
+                    continue
+                payload = json.loads(message.data)
+                if payload.get('op') == 'login':
+                    await ws.send_json({'event': 'login', 'code': 0})
+                elif payload.get('op') == 'subscribe':
+                    for arg in payload.get('args', []):
+                        self._clients[ws].append(arg)
+                        self.subscriptions.append(arg)
+                        await ws.send_json({'event': 'subscribe', 'arg': arg})
+        finally:
+            self._clients.pop(ws, None)
+        return ws
+
+    async def _push(self, channel: str, inst_id: str, action: str, data: List[Any]) -> int:
+        sent = 0
+        for ws, args in list(self._clients.items()):
+            for arg in args:
+                if arg['channel'] == channel and arg['instId'] == inst_id:
+                    await ws.send_json({'action': action, 'arg': arg, 'data': data, 'ts': int(time.time() * 1000)})
+                    sent += 1
+        return sent
+
+    async def send_candle(self, inst_id: str, timeframe: str, candle: Sequence[float], snapshot: bool = False) -> int:
+        """Pushes one candle update (or, with `snapshot`, a history of candles) and returns how many clients got it."""
+        channel = BitgetStreamProtocol.timeframes[timeframe][0]
+        rows = candle if snapshot else [candle]
+        data = [[str(int(row[0]))] + [str(value) for value in row[1:6]] + ['0', '0'] for row in rows]
+        return await self._push(channel, inst_id, 'snapshot' if snapshot else 'update', data)
+
+    async def send_ticker(self, inst_id: str, last: float) -> int:
+        return await self._push('ticker', inst_id, 'update', [{'instId': inst_id, 'lastPr': str(last), 'ts': str(int(time.time() * 1000))}])
+
+    async def send_orders(self, orders: List[Dict[str, Any]], trigger: bool = False) -> int:
+        """Pushes order updates in the Bitget layout, e.g. {'orderId', 'instId', 'status': 'executed', 'posSide'}."""
+        return await self._push('orders-algo' if trigger else 'orders', 'default', 'snapshot', orders)
+
+    async def send_positions(self, positions: List[Dict[str, Any]]) -> int:
+        """Pushes all the open positions, e.g. [{'instId', 'holdSide', 'total', 'openPriceAvg', 'cTime'}]."""
+        return await self._push('positions', 'default', 'snapshot', positions)
+
+
+async def replay(server: StubMarketServer, inst_ids: List[str], timeframe: str, interval: float, start_price: float) -> None:
+    # a random walk on the wall clock: every `interval` seconds an update of the current candle of each symbol
+    timeframe_ms = BitgetStreamProtocol.timeframes[timeframe][1]
+    candles: Dict[str, List[float]] = {}
+    while True:
+        now_ms = int(time.time() * 1000)
+        open_time = now_ms // timeframe_ms * timeframe_ms
+        for inst_id in inst_ids:
+            candle = candles.get(inst_id)
+            price = (candle[4] if candle else start_price) * (1 + random.gauss(0, 0.001))
+            if candle is None or candle[0] != open_time:
+                candle = [open_time, price, price, price, price, 0.0]
+            candle[2], candle[3], candle[4] = max(candle[2], price), min(candle[3], price), price
+            candle[5] += random.random()
+            candles[inst_id] = candle
+            await server.send_candle(inst_id, timeframe, candle)
+            await server.send_ticker(inst_id, price)
+        await asyncio.sleep(interval)
+
+
+async def main(host: str, port: int, inst_ids: List[str], timeframe: str, interval: float, start_price: float) -> None:
+    server = StubMarketServer(host, port)
+    url = await server.start()
+    print(f"stub market stream on {url}, {timeframe} candles of {', '.join(inst_ids)}")
+    try:
+        await replay(server, inst_ids, timeframe, interval, start_price)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    # --- CONFIG ---
+    # point the envelope daemon at it with stream_url = 'ws://127.0.0.1:8765'
+    host = '127.0.0.1'
+    port = 8765
+    inst_ids = ['BTCUSDT', 'ETHUSDT']
+    timeframe = '1m'
+    interval = 0.5  # seconds between two updates of a candle
+    start_price = 100.0
+
+    asyncio.run(main(host, port, inst_ids, timeframe, interval, start_price))
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import ccxt
+
+
+MARKETS_CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '.cache')
+DEFAULT_MARKETS_TTL = 24 * 60 * 60  # seconds
+REFRESH_MODES = ('auto', 'force', 'background')
+
+
+class MarketsCache():
+    def __init__(self, name: str, cache_dir: Optional[str] = None, ttl: float = DEFAULT_MARKETS_TTL) -> None:
+        """
+        On-disk cache of a ccxt `load_markets()` result.
+
+        Args:
+            name (str): Cache name, e.g. 'bitget' or 'kucoinfutures_sandbox'.
+            cache_dir (Optional[str]): Directory holding the cache files. Defaults to `code/.cache`.
+            ttl (float): Age in seconds after which the cached markets are considered stale.
+        """
+        self.name = name
+        self.ttl = ttl
+        self.path = os.path.join(cache_dir or DEFAULT_CACHE_DIR, f"markets_{name}.json")
+        self.from_disk = False
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if content.get('version') != MARKETS_CACHE_VERSION or content.get('ccxt_version') != ccxt.__version__:
+            return None
+        return content
+
+    def is_fresh(self, content: Dict[str, Any]) -> bool:
+        return time.time() - content['saved_at'] < self.ttl
+
+    def load(self, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """Returns the cached markets, or None if missing, from another cache/ccxt version, or stale."""
+        content = self._read()
+        if content is None or (not allow_stale and not self.is_fresh(content)):
+            return None
+        return content['markets']
+
+    def save(self, markets: Dict[str, Any]) -> None:
+        """Writes the markets atomically so a concurrent reader never sees a partial file."""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        content = {
+            'version': MARKETS_CACHE_VERSION,
+            'ccxt_version': ccxt.__version__,
+            'saved_at': time.time(),
+            'markets': markets,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".markets_{self.name}.")
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(content, file)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load_cached_into(
+        self,
+        session: ccxt.Exchange,
+        refresh: str = 'auto',
+        background_session_factory: Optional[Callable[[], ccxt.Exchange]] = None,
+    ) -> bool:
+        """
+        Populates `session` with the cached markets if the refresh mode allows it.
+
+        Args:
+            session (ccxt.Exchange): The exchange session to populate, sync or async.
+            refresh (str): 'auto' uses a fresh cache only,
+                           'force' never uses the cache,
+                           'background' uses any cached markets (even stale) right away and,
+                           if they are stale, refreshes the cache in a background thread for the next run.
+            background_session_factory (Optional[Callable]): Builds the synchronous public session used by the
+                                                              background refresh. Defaults to a fresh
+                                                              unauthenticated instance of the session's class.
+
+        Returns:
+            bool: True if the session was populated from disk, False if the markets must be downloaded.
+        """
+        if refresh not in REFRESH_MODES:
+            raise ValueError(f"Unknown markets refresh mode {refresh}, expected one of {REFRESH_MODES}")
+        if refresh == 'force':
+            return False
+
+        content = self._read()
+        if content is None or (refresh != 'background' and not self.is_fresh(content)):
+            return False
+        session.set_markets(content['markets'])
+        self.from_disk = True
+        if not self.is_fresh(content):
+            self.refresh_in_background(background_session_factory or session.__class__)
+        return True
+
+    def load_into(
+        self,
+        session: ccxt.Exchange,
+        refresh: str = 'auto',
+        background_session_factory: Optional[Callable[[], ccxt.Exchange]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Populates a synchronous `session` with markets, from disk when possible, see load_cached_into.
+
+        Returns:
+            Dict[str, Any]: The markets, as returned by `load_markets()`.
+        """
+        if self.load_cached_into(session, refresh, background_session_factory):
+            return session.markets
+
+        markets = session.load_markets(reload=True)
+        self.from_disk = False
+        self.save(markets)
+        return markets
+
+    def refresh_in_background(self, session_factory: Callable[[], ccxt.Exchange]) -> threading.Thread:
+        """
+        Downloads the markets with a separate session and rewrites the cache.
+        The thread is not a daemon, so a short-lived run still finishes the refresh before exiting.
+        """
+        def refresh() -> None:
+            try:
+                self.save(session_factory().load_markets())
+            except Exception as e:
+                print(f"Background markets refresh for {self.name} failed: {e}")
+
+        thread = threading.Thread(target=refresh, name=f"markets-refresh-{self.name}")
+        thread.start()
+        return thread
@@ -0,0 +1,142 @@
+import os
+import numpy as np
+from typing import TYPE_CHECKING, Any, Callable, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(__file__), '..', '.cache', 'ohlcv')
+ROW_BYTES = len(OHLCV_COLUMNS) * np.dtype(np.float64).itemsize
+
+
+def ohlcv_to_dataframe(rows: Any) -> 'pd.DataFrame':
+    import pandas as pd  # imported on first use, so scripts that never build a DataFrame start faster
+
+    df = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    df.sort_index(inplace=True)
+    return df
+
+
+class OHLCVStore():
+    def __init__(self, exchange: str, store_dir: Optional[str] = None) -> None:
+        """
+        Append-only local candle store, one file per (exchange, symbol, timeframe).
+
+        Each file is a flat array of float64 rows [timestamp, open, high, low, close, volume] sorted by
+        timestamp, read back through a memory map. Only closed candles are stored, and a candle is never
+        rewritten once stored. If a bot stops running for longer than its fetch window, the store keeps
+        a gap for the missing period.
+
+        Args:
+            exchange (str): Exchange name used in the file names, e.g. 'bitget'.
+            store_dir (Optional[str]): Directory holding the files. Defaults to `code/.cache/ohlcv`.
+        """
+        self.exchange = exchange
+        self.store_dir = store_dir or DEFAULT_STORE_DIR
+
+    def _base_name(self, symbol: str, timeframe: str) -> str:
+        safe_symbol = symbol.replace('/', '-').replace(':', '-')
+        return f"{self.exchange}_{safe_symbol}_{timeframe}"
+
+    def path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.store_dir, f"{self._base_name(symbol, timeframe)}.f64")
+
+    def state_path(self, symbol: str, timeframe: str, name: str) -> str:
+        """JSON file for state derived from the candles of (symbol, timeframe), e.g. an incremental indicator."""
+        return os.path.join(self.store_dir, f"{self._base_name(symbol, timeframe)}.{name}.json")
+
+    def read(self, symbol: str, timeframe: str, since: Optional[int] = None) -> np.ndarray:
+        """Returns the stored candles (optionally from `since`, in ms) as a read-only (n, 6) array."""
+        path = self.path(symbol, timeframe)
+        rows = os.path.getsize(path) // ROW_BYTES if os.path.exists(path) else 0
+        if rows == 0:
+            return np.empty((0, len(OHLCV_COLUMNS)), dtype=np.float64)
+        # a partially written trailing row (crash mid-append) is ignored here and dropped by the next append
+        data = np.memmap(path, dtype=np.float64, mode='r', shape=(rows, len(OHLCV_COLUMNS)))
+        if since is not None:
+            data = data[np.searchsorted(data[:, 0], since, side='left'):]
+        return data
+
+    def read_dataframe(self, symbol: str, timeframe: str, since: Optional[int] = None) -> 'pd.DataFrame':
+        """Stored candles as the same DataFrame layout fetch_recent_ohlcv returns, e.g. to feed backtests."""
+        return ohlcv_to_dataframe(np.asarray(self.read(symbol, timeframe, since)))
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        data = self.read(symbol, timeframe)
+        return int(data[-1, 0]) if len(data) else None
+
+    def append(self, symbol: str, timeframe: str, candles: List[List[float]]) -> int:
+        """Appends the candles newer than the last stored one and returns how many were written."""
+        path = self.path(symbol, timeframe)
+        last_timestamp = self.last_timestamp(symbol, timeframe)
+        new_rows = np.asarray(candles, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        if len(new_rows):
+            new_rows = new_rows[np.argsort(new_rows[:, 0], kind='stable')]
+            new_rows = new_rows[np.r_[True, np.diff(new_rows[:, 0]) > 0]]
+        if last_timestamp is not None:
+            new_rows = new_rows[new_rows[:, 0] > last_timestamp]
+        if not len(new_rows):
+            return 0
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        with open(path, 'ab') as file:
+            file.truncate(file.tell() - file.tell() % ROW_BYTES)
+            file.write(new_rows.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        return len(new_rows)
+
+    def fetch_start(self, symbol: str, timeframe: str, timeframe_ms: int, start_timestamp: int) -> int:
+        """First timestamp the store is missing within a window starting at `start_timestamp`."""
+        last_timestamp = self.last_timestamp(symbol, timeframe)
+        return start_timestamp if last_timestamp is None else max(start_timestamp, last_timestamp + timeframe_ms)
+
+    def merge(
+        self,
+        symbol: str,
+        timeframe: str,
+        timeframe_ms: int,
+        start_timestamp: int,
+        end_timestamp: int,
+        fetched: List[List[float]],
+    ) -> np.ndarray:
+        """
+        Appends the closed candles of `fetched` and returns the window from `start_timestamp`.
+
+        Returns:
+            np.ndarray: Stored candles from `start_timestamp`, followed by the still-open candle if any.
+        """
+        fetched = np.asarray(fetched, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        is_closed = fetched[:, 0] + timeframe_ms <= end_timestamp
+        self.append(symbol, timeframe, fetched[is_closed])
+        stored = np.asarray(self.read(symbol, timeframe, since=start_timestamp))
+        open_candles = fetched[~is_closed]
+        if len(stored):
+            open_candles = open_candles[open_candles[:, 0] > stored[-1, 0]]
+        return np.concatenate([stored, open_candles[-1:]])
+
+    def top_up(
+        self,
+        symbol: str,
+        timeframe: str,
+        timeframe_ms: int,
+        start_timestamp: int,
+        end_timestamp: int,
+        fetch_range: Callable[[int, int], List[List[float]]],
+    ) -> np.ndarray:
+        """
+        Returns the candles of [start_timestamp, end_timestamp], downloading only what the store is missing.
+
+        Args:
+            fetch_range (Callable[[int, int], List]): Downloads the candles between two ms timestamps.
+
+        Returns:
+            np.ndarray: Stored candles from `start_timestamp`, followed by the still-open candle if any.
+        """
+        fetch_from = self.fetch_start(symbol, timeframe, timeframe_ms, start_timestamp)
+        fetched = fetch_range(fetch_from, end_timestamp)
+        return self.merge(symbol, timeframe, timeframe_ms, start_timestamp, end_timestamp, fetched)
@@ -0,0 +1,102 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from utilities.precision import ROUND, TRUNCATE, SymbolPrecision
+
+
+def order_key(order: Dict[str, Any], precision: SymbolPrecision) -> Tuple[Any, ...]:
+    """
+    What makes two order specs the same order once sent: type, side, reduce flag, and the amount and
+    prices on the lot and tick grid (amount truncated, prices rounded, as orders_to_precision sends them).
+    The price of a market order is not part of it.
+    """
+    order_type = order.get('type', 'limit')
+    price = order.get('price') if order_type.endswith('limit') else None
+    trigger_price = order.get('trigger_price') if order_type.startswith('trigger_') else None
+    return (
+        order_type,
+        order['side'],
+        bool(order.get('reduce', False)),
+        precision.amount.to_units(order['amount'], TRUNCATE),
+        None if trigger_price is None else precision.price.to_units(trigger_price, ROUND),
+        None if price is None else precision.price.to_units(price, ROUND),
+    )
+
+
+@dataclass
+class ReconcilePlan:
+    # indexes into the desired specs, live entries are the live specs (with their 'id')
+    keep: List[Tuple[int, Dict[str, Any]]] = field(default_factory=list)  # (desired, live order already matching it)
+    amend: List[Tuple[int, Dict[str, Any]]] = field(default_factory=list)  # (desired, live order to modify into it)
+    place: List[int] = field(default_factory=list)
+    cancel: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def requests(self) -> int:
+        """Order requests the plan costs, at most one per order."""
+        return len(self.amend) + len(self.place) + len(self.cancel)
+
+
+def reconcile_orders(
+    desired: List[Dict[str, Any]],
+    live: List[Dict[str, Any]],
+    precision_for: Callable[[str], SymbolPrecision],
+    amend: bool = True,
+) -> ReconcilePlan:
+    """
+    Matches the orders a run wants against the orders resting on the exchange, so that only the
+    difference is sent instead of cancelling everything and placing it all again.
+
+    A live order equal to a desired one on the tick and lot grid is kept as is. With `amend`, the
+    remaining ones of the same type, side and reduce flag are paired in price order and modified to the
+    new prices and amount, e.g. an entry following its band. What is left is cancelled or placed.
+
+        plan = reconcile_orders(ladder.orders(symbol), live_specs, exchange.precisions)
+
+    Args:
+        desired (List[Dict[str, Any]]): place_orders_bulk specs the run wants open.
+        live (List[Dict[str, Any]]): The open orders as the same specs, with their 'id'.
+        precision_for (Callable[[str], SymbolPrecision]): Precision of a symbol, e.g. a MarketPrecisions.
+        amend (bool): Whether the exchange can modify the prices and amount of an order in place.
+
+    Returns:
+        ReconcilePlan: Orders to keep, amend, place and cancel.
+    """
+    plan = ReconcilePlan()
+    live_by_key: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+    for order in live:
+        live_by_key.setdefault((order['symbol'],) + order_key(order, precision_for(order['symbol'])), []).append(order)
+
+    unmatched = []
+    for i, order in enumerate(desired):
+        matches = live_by_key.get((order['symbol'],) + order_key(order, precision_for(order['symbol'])))
+        if matches:
+            plan.keep.append((i, matches.pop(0)))
+        else:
+            unmatched.append(i)
+    stale = [order for orders in live_by_key.values() for order in orders]
+
+    if amend:
+        # the same order at other prices: pair the lowest with the lowest, so no two cross on the way
+        def group(order: Dict[str, Any]) -> Tuple[Any, ...]:
+            return (order['symbol'], order.get('type', 'limit'), order['side'], bool(order.get('reduce', False)))
+
+        def prices(order: Dict[str, Any]) -> Tuple[float, float]:
+            return (order.get('trigger_price') or 0.0, order.get('price') or 0.0)
+
+        stale_by_group: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+        for order in sorted(stale, key=prices):
+            stale_by_group.setdefault(group(order), []).append(order)
+        still_unmatched = []
+        for i in sorted(unmatched, key=lambda i: prices(desired[i])):
+            candidates = stale_by_group.get(group(desired[i]))
+            if candidates:
+                plan.amend.append((i, candidates.pop(0)))
+            else:
+                still_unmatched.append(i)
+        unmatched = sorted(still_unmatched)
+        stale = [order for orders in stale_by_group.values() for order in orders]
+
+    plan.place = unmatched
+    plan.cancel = stale
+    return plan
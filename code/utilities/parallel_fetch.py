@@ -0,0 +1,82 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List
+
+
+def stitch_ohlcv(pages: Iterable[List[List[float]]]) -> List[List[float]]:
+    """Merges OHLCV pages into one chronological list, keeping a single candle per timestamp."""
+    candles = {}
+    for page in pages:
+        for candle in page:
+            candles[candle[0]] = candle
+    return [candles[timestamp] for timestamp in sorted(candles)]
+
+
+def run_concurrently(
+    call: Callable[[Any], Any],
+    items: List[Any],
+    max_workers: int,
+    rate_limit_ms: float,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """
+    Runs `call` on every item through a bounded thread pool and returns the results in item order.
+
+    Call starts are spaced by at least `rate_limit_ms` (the ccxt `rateLimit` of the session) across
+    all workers, so the pool overlaps request latency without going over the exchange rate limit.
+
+    Args:
+        call (Callable): Performs one request for one item.
+        items (List): One entry per request.
+        max_workers (int): Maximum number of requests in flight.
+        rate_limit_ms (float): Minimum delay between two request starts, in milliseconds.
+        return_exceptions (bool): Return the exception raised by a call in place of its result
+                                  instead of raising it.
+
+    Returns:
+        List: The result (or exception) of each call.
+    """
+    if not items:
+        return []
+
+    lock = threading.Lock()
+    next_start = [time.monotonic()]
+
+    def paced_call(item: Any) -> Any:
+        with lock:
+            start = max(next_start[0], time.monotonic())
+            next_start[0] = start + rate_limit_ms / 1000
+        delay = start - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            return call(item)
+        except Exception as e:
+            if return_exceptions:
+                return e
+            raise
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as pool:
+        return list(pool.map(paced_call, items))
+
+
+def fetch_pages_concurrently(
+    fetch_page: Callable[[Any], List[List[float]]],
+    windows: List[Any],
+    max_workers: int,
+    rate_limit_ms: float,
+) -> List[List[float]]:
+    """
+    Fetches OHLCV pages through run_concurrently and stitches the results.
+
+    Args:
+        fetch_page (Callable): Downloads one page, given one of `windows`.
+        windows (List): Page descriptions computed up front, e.g. (start, end) timestamps.
+        max_workers (int): Maximum number of requests in flight.
+        rate_limit_ms (float): Minimum delay between two request starts, in milliseconds.
+
+    Returns:
+        List[List[float]]: De-duplicated candles in chronological order.
+    """
+    return stitch_ohlcv(run_concurrently(fetch_page, windows, max_workers, rate_limit_ms))
@@ -0,0 +1,198 @@
+import math
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+
+TRUNCATE = 'TRUNCATE'
+ROUND = 'ROUND'
+ROUNDING_MODES = (TRUNCATE, ROUND)
+SNAP_ULPS = 4  # a scaled value this close below a grid point is that point, e.g. 0.29 * 200 = 57.99999999999999
+MAX_EXACT = 2 ** 53  # larger scaled values are no longer exact integers in a float64
+
+
+class Step():
+    def __init__(self, step: Union[str, float, int, Decimal]) -> None:
+        """
+        Tick or lot size held as integers: `units` of 10**-`decimals`, e.g. 0.5 is 5 units of 0.1.
+
+        Values are snapped to the decimal grid (a float within a few ulps below a grid point counts as that
+        point) and then truncated or rounded in integer arithmetic, so 0.29 truncated to 0.01 gives '0.29'
+        where float math gives 0.28. ROUND goes half away from zero and TRUNCATE towards zero, like ccxt's
+        decimal_to_precision, and the result is written without trailing zeros or scientific notation.
+
+        Args:
+            step (Union[str, float, int, Decimal]): Positive tick or lot size, e.g. '0.01', 0.5 or 1.
+        """
+        value = Decimal(str(step))
+        if not value.is_finite() or value <= 0:
+            raise ValueError(f"The step must be a positive number, got {step!r}")
+        self.decimals = max(0, -value.normalize().as_tuple().exponent)
+        self.scale = 10 ** self.decimals
+        self.units = int(value * self.scale)
+        self._double_scale = 2.0 * self.scale
+
+    @classmethod
+    def from_decimals(cls, decimals: int) -> 'Step':
+        """Step of a precision given in decimal places, e.g. 3 -> 0.001."""
+        return cls(Decimal(1).scaleb(-int(decimals)))
+
+    def __repr__(self) -> str:
+        return f"Step('{self.text(self.units)}')"
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Step) and (self.units, self.decimals) == (other.units, other.decimals)
+
+    def _offset(self, rounding_mode: str) -> int:
+        # added to twice the value in units before the floor division by twice the step
+        if rounding_mode == TRUNCATE:
+            return 0
+        if rounding_mode == ROUND:
+            return self.units
+        raise ValueError(f"The rounding mode must be one of {ROUNDING_MODES}, got {rounding_mode}")
+
+    def to_units(self, value: float, rounding_mode: str = TRUNCATE) -> int:
+        """The multiple of the step closest to `value` (per rounding_mode), in units of 10**-decimals."""
+        # twice the scaled value, so the ties of ROUND are integers too
+        doubled = abs(float(value)) * self._double_scale
+        if not doubled < MAX_EXACT:
+            raise ValueError(f"Cannot convert {value} to a step of {self}")
+        half_units = int(doubled + SNAP_ULPS * math.ulp(doubled))
+        units = (half_units + self._offset(rounding_mode)) // (2 * self.units) * self.units
+        return -units if value < 0 else units
+
+    def array_to_units(self, values: Sequence[float], rounding_mode: str = TRUNCATE) -> np.ndarray:
+        """to_units over a whole array at once, e.g. the prices of an order ladder. Returns int64 units."""
+        values = np.asarray(values, dtype=np.float64)
+        doubled = np.abs(values) * self._double_scale
+        doubled += SNAP_ULPS * np.spacing(doubled)
+        if not doubled.max(initial=0.0) < MAX_EXACT:
+            raise ValueError(f"Cannot convert {values} to a step of {self}")
+        units = (doubled.astype(np.int64) + self._offset(rounding_mode)) // (2 * self.units) * self.units
+        if (values < 0).any():
+            units[values < 0] *= -1
+        return units
+
+    def text(self, units: int) -> str:
+        """Writes an amount of units as a plain decimal string, e.g. 12345 units of 0.001 -> '12.345'."""
+        units = int(units)
+        if not self.decimals:
+            return str(units)
+        whole, fraction = divmod(abs(units), self.scale)
+        sign = '-' if units < 0 else ''
+        if not fraction:
+            return f"{sign}{whole}"
+        return f"{sign}{whole}.{str(fraction).rjust(self.decimals, '0').rstrip('0')}"
+
+    def format(self, value: float, rounding_mode: str = TRUNCATE) -> str:
+        return self.text(self.to_units(value, rounding_mode))
+
+    def format_array(self, values: Sequence[float], rounding_mode: str = TRUNCATE) -> List[str]:
+        return [self.text(units) for units in self.array_to_units(values, rounding_mode).tolist()]
+
+
+@dataclass(frozen=True)
+class SymbolPrecision:
+    # amounts are truncated to the lot size, prices rounded to the tick size, as ccxt does
+    amount: Step
+    price: Step
+
+    @classmethod
+    def from_market(cls, market: Dict[str, Any], decimal_places: bool = False) -> 'SymbolPrecision':
+        """
+        Reads the steps of a ccxt market.
+
+        Args:
+            market (Dict[str, Any]): Market of ccxt `load_markets()`.
+            decimal_places (bool): The exchange precisionMode is DECIMAL_PLACES rather than TICK_SIZE.
+        """
+        precision = market['precision']
+        if precision.get('amount') is None or precision.get('price') is None:
+            raise ValueError(f"No amount/price precision for {market.get('symbol')}: {precision}")
+        if decimal_places:
+            return cls(Step.from_decimals(precision['amount']), Step.from_decimals(precision['price']))
+        return cls(Step(precision['amount']), Step(precision['price']))
+
+    def amount_to_precision(self, amount: float) -> str:
+        result = self.amount.format(amount, TRUNCATE)
+        if result == '0':
+            raise ValueError(f"Amount {amount} is below the amount precision of {self.amount}")
+        return result
+
+    def price_to_precision(self, price: float) -> str:
+        result = self.price.format(price, ROUND)
+        if result == '0':
+            raise ValueError(f"Price {price} is below the price precision of {self.price}")
+        return result
+
+
+class MarketPrecisions():
+    def __init__(self, session: Any, decimal_places: bool = False) -> None:
+        """
+        SymbolPrecision of each market of a ccxt session, built on first use. An entry is rebuilt when the
+        session's market dict for its symbol changes, so reloading the markets needs no invalidation.
+
+        Args:
+            session (Any): ccxt exchange with its markets loaded.
+            decimal_places (bool): The session precisionMode is ccxt.DECIMAL_PLACES rather than TICK_SIZE.
+        """
+        self.session = session
+        self.decimal_places = decimal_places
+        self._precisions: Dict[str, Tuple[Dict[str, Any], SymbolPrecision]] = {}
+
+    def __call__(self, symbol: str) -> SymbolPrecision:
+        market = self.session.market(symbol)
+        cached = self._precisions.get(symbol)
+        if cached is None or cached[0] is not market:
+            cached = (market, SymbolPrecision.from_market(market, self.decimal_places))
+            self._precisions[symbol] = cached
+        return cached[1]
+
+
+# order spec field: (SymbolPrecision attribute, rounding mode), for the specs of place_orders_bulk
+ORDER_FIELDS = {
+    'amount': ('amount', TRUNCATE),
+    'price': ('price', ROUND),
+    'trigger_price': ('price', ROUND),
+}
+
+
+def orders_to_precision(
+    orders: List[Dict[str, Any]],
+    precision_for: Callable[[str], SymbolPrecision],
+    fields: Dict[str, Tuple[str, str]] = ORDER_FIELDS,
+) -> List[Union[Dict[str, str], Exception]]:
+    """
+    Converts the amounts and prices of many order specs with one array pass per symbol and field, instead
+    of one conversion per value.
+
+    Returns:
+        List[Union[Dict[str, str], Exception]]: Per order, its present `fields` as precise strings, or the
+                                                error that makes the order invalid (e.g. a zero amount).
+    """
+    results: List[Union[Dict[str, str], Exception]] = [{} for _ in orders]
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, order in enumerate(orders):
+        for field in fields:
+            if order.get(field) is not None:
+                groups.setdefault((order.get('symbol'), field), []).append(i)
+
+    for (symbol, field), indexes in groups.items():
+        step_name, rounding_mode = fields[field]
+        try:
+            step = getattr(precision_for(symbol), step_name)
+            texts = step.format_array([orders[i][field] for i in indexes], rounding_mode)
+        except Exception as e:
+            texts = [e] * len(indexes)
+        for i, text in zip(indexes, texts):
+            if isinstance(results[i], Exception):
+                continue
+            if isinstance(text, Exception):
+                results[i] = text
+            elif text == '0':
+                results[i] = ValueError(f"{field} {orders[i][field]} is below the {step_name} precision of {step}")
+            else:
+                results[i][field] = text
+    return results
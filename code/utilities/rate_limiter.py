@@ -0,0 +1,180 @@
+import os
+import time
+import struct
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the buckets are still shared by the threads of one process
+    fcntl = None
+
+
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(__file__), '..', '.cache', 'rate_limits')
+CCXT_ENDPOINT_CLASSES = ('public', 'private', 'trade')
+
+
+@dataclass(frozen=True)
+class BucketConfig:
+    rate: float  # tokens added per second
+    capacity: float = 1.0  # burst size, 1 spaces the calls evenly at `rate`
+
+
+class TokenBucket():
+    STATE = struct.Struct('dd')  # tokens, time.time() of the last update
+
+    def __init__(self, path: str, config: BucketConfig) -> None:
+        """
+        Token bucket whose state lives in a 16 byte file, updated under an exclusive flock, so every process
+        using the same file draws from the same bucket.
+
+        Args:
+            path (str): State file, created on first use.
+            config (BucketConfig): Refill rate and capacity.
+        """
+        if config.rate <= 0 or config.capacity <= 0:
+            raise ValueError(f"The bucket rate and capacity must be positive, got {config}")
+        self.path = path
+        self.config = config
+        self._lock = threading.Lock()  # flock is per open file, so it does not exclude the threads sharing it
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+    def _update(self, cost: float, hold: float = 0.0) -> float:
+        """Takes `cost` tokens, or empties the bucket for `hold` seconds, and returns the tokens there were."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                state = os.pread(self._fd, self.STATE.size, 0)
+                if len(state) == self.STATE.size:
+                    tokens, updated_at = self.STATE.unpack(state)
+                    # a clock set back gives no refill instead of a negative one
+                    tokens = min(self.config.capacity, tokens + max(0.0, now - updated_at) * self.config.rate)
+                else:
+                    tokens = self.config.capacity
+                left = min(tokens, -hold * self.config.rate) if hold else tokens - cost
+                os.pwrite(self._fd, self.STATE.pack(left, now), 0)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return tokens
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """
+        Takes `cost` tokens right away and returns the seconds to wait before making the call: until the
+        bucket holds one call's worth (at most its capacity). The bucket may go negative, a heavy call then
+        delays the calls after it, and concurrent callers queue in the order they reserved.
+        """
+        needed = min(cost, self.config.capacity)
+        return max(0.0, (needed - self._update(cost)) / self.config.rate)
+
+    def hold(self, seconds: float) -> None:
+        """Gives no token for `seconds` to any process, e.g. after the exchange answered 429."""
+        self._update(0.0, hold=seconds)
+
+
+class RateLimiter():
+    def __init__(self, name: str, buckets: Dict[str, BucketConfig], state_dir: Optional[str] = None) -> None:
+        """
+        Token buckets of one exchange, one per endpoint class (e.g. 'public', 'private', 'trade'), shared
+        through state files with every bot process of the machine that uses the same name. A call waits
+        just long enough to stay within the exchange limits, instead of a fixed sleep.
+
+        Args:
+            name (str): Exchange/account name of the state files, e.g. 'bitget' or 'kucoinfutures_sandbox'.
+            buckets (Dict[str, BucketConfig]): Bucket of each endpoint class.
+            state_dir (Optional[str]): Directory of the state files. Defaults to `code/.cache/rate_limits`.
+        """
+        self.name = name
+        self.configs = dict(buckets)
+        self.state_dir = state_dir or DEFAULT_STATE_DIR
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint_class: str) -> TokenBucket:
+        with self._lock:
+            if endpoint_class not in self._buckets:
+                if endpoint_class not in self.configs:
+                    raise ValueError(f"No {self.name} rate limit for the endpoint class {endpoint_class}")
+                path = os.path.join(self.state_dir, f"{self.name}.{endpoint_class}.bucket")
+                self._buckets[endpoint_class] = TokenBucket(path, self.configs[endpoint_class])
+            return self._buckets[endpoint_class]
+
+    def acquire(self, endpoint_class: str, cost: float = 1.0) -> float:
+        """Waits until a call of `cost` tokens is allowed. Returns the seconds waited."""
+        delay = self.bucket(endpoint_class).reserve(cost)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, endpoint_class: str, cost: float = 1.0) -> float:
+        """acquire() for event loops: the reservation (flock and file IO) runs in the default executor."""
+        loop = asyncio.get_running_loop()
+        delay = await loop.run_in_executor(None, lambda: self.bucket(endpoint_class).reserve(cost))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def hold(self, endpoint_class: str, seconds: float) -> None:
+        self.bucket(endpoint_class).hold(seconds)
+
+    def close(self) -> None:
+        with self._lock:
+            for bucket in self._buckets.values():
+                bucket.close()
+            self._buckets = {}
+
+
+def ccxt_endpoint_class(api: Any, method: str) -> str:
+    """'public' for the public ccxt APIs ('public', 'futuresPublic', ...), 'trade' for the other non-GET calls."""
+    api_name = api[0] if isinstance(api, (list, tuple)) else api
+    if 'public' in str(api_name).lower():
+        return 'public'
+    return 'private' if method.upper() == 'GET' else 'trade'
+
+
+def rate_limit_ccxt(session: Any, name: Optional[str] = None, state_dir: Optional[str] = None) -> RateLimiter:
+    """
+    Sends every REST call of a ccxt session (sync or async_support) through a RateLimiter, in place of
+    ccxt's own throttle which only spaces the calls of one session. Each endpoint class gets a bucket at
+    the session's `rateLimit` pace, and a call takes its ccxt cost in tokens, as ccxt itself would.
+
+    Args:
+        session (Any): ccxt exchange instance.
+        name (Optional[str]): Name of the shared state, defaults to the exchange id.
+
+    Returns:
+        RateLimiter: The limiter of the session, the same one if it was already attached.
+    """
+    limiter = getattr(session, 'shared_rate_limiter', None)
+    if limiter is not None:
+        return limiter
+    config = BucketConfig(rate=1000 / session.rateLimit)
+    limiter = RateLimiter(name or session.id, {endpoint_class: config for endpoint_class in CCXT_ENDPOINT_CLASSES}, state_dir)
+    fetch2 = session.fetch2
+
+    def cost_and_class(path: str, api: Any, method: str, params: Dict[str, Any], config: Dict[str, Any]) -> Any:
+        return session.calculate_rate_limiter_cost(api, method, path, params, config), ccxt_endpoint_class(api, method)
+
+    if asyncio.iscoroutinefunction(fetch2):
+        async def limited_fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            cost, endpoint_class = cost_and_class(path, api, method, params, config)
+            await limiter.acquire_async(endpoint_class, cost)
+            return await fetch2(path, api, method, params, headers, body, config)
+    else:
+        def limited_fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            cost, endpoint_class = cost_and_class(path, api, method, params, config)
+            limiter.acquire(endpoint_class, cost)
+            return fetch2(path, api, method, params, headers, body, config)
+
+    session.fetch2 = limited_fetch2
+    session.enableRateLimit = False
+    session.shared_rate_limiter = limiter
+    return limiter
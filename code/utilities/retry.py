@@ -0,0 +1,158 @@
+import sys
+import time
+import random
+import asyncio
+import secrets
+import itertools
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3  # including the first one
+    base_delay: float = 0.5  # seconds before the first retry, doubled for each next one
+    max_delay: float = 8.0
+
+    def delay(self, retry: int) -> float:
+        # full backoff with jitter, so the bots that failed together do not retry together
+        return min(self.max_delay, self.base_delay * 2 ** retry) * random.uniform(0.5, 1.0)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether the same request may succeed if sent again: ccxt network errors (timeouts, exchange
+    unavailable, rate limits), or an error with a true `retryable` attribute such as a Bitunix network
+    error. Rejections of the request itself (invalid order, insufficient funds, authentication) are not.
+    """
+    ccxt = sys.modules.get('ccxt')  # only loaded by the ccxt based wrappers
+    if ccxt is not None and isinstance(error, ccxt.BaseError):
+        return isinstance(error, ccxt.NetworkError)
+    return bool(getattr(error, 'retryable', False))
+
+
+class ClientOrderIds():
+    def __init__(self, prefix: str = 'lt') -> None:
+        """
+        Client order IDs of one process: prefix, random run ID and sequence number, e.g.
+        'lt3f9c0a1b2d4e5f60000012'. An order gets its ID before the first attempt and keeps it on every
+        retry, so the exchange, and the lookup before a retry, can tell a resent order from a new one.
+        """
+        self.prefix = prefix
+        self.run_id = secrets.token_hex(8)
+        self._sequence = itertools.count(1)
+
+    def next(self) -> str:
+        return f"{self.prefix}{self.run_id}{next(self._sequence):06d}"
+
+
+def _log_retry(description: str, error: BaseException, retry: int, policy: RetryPolicy, delay: float) -> None:
+    print(f"{description} failed ({type(error).__name__}: {error}), retry {retry + 1}/{policy.attempts - 1} in {delay:.1f}s")
+
+
+def call_with_retries(
+    call: Callable[[], T],
+    description: str,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    find_existing: Optional[Callable[[], Optional[T]]] = None,
+    resend: bool = False,
+) -> T:
+    """
+    Runs `call`, retrying the retryable errors (see is_retryable) with exponential backoff, and raises
+    the last error otherwise.
+
+    Args:
+        call (Callable): The request.
+        description (str): What the request does, for the retry log lines.
+        policy (RetryPolicy): Number of attempts and backoff.
+        find_existing (Optional[Callable]): For an order sent with a client order ID, looks it up by that
+                                            ID. Called before each retry: the order found, which reached the
+                                            exchange before the failure, is returned instead of placed again.
+                                            A lookup error that is not retryable is raised.
+        resend (bool): The request was already sent once outside of this call, e.g. in a failed batch, so
+                       `find_existing` is called before the first attempt too.
+    """
+    for attempt in range(policy.attempts):
+        if (attempt or resend) and find_existing is not None:
+            try:
+                existing = find_existing()
+            except Exception as e:
+                if not is_retryable(e):
+                    # the order may exist: stop here rather than risk placing it twice
+                    raise
+                # the exchange still rejects a duplicate client order ID
+                print(f"Could not look up {description} before retrying: {e}")
+                existing = None
+            if existing is not None:
+                return existing
+        try:
+            return call()
+        except Exception as e:
+            if attempt + 1 >= policy.attempts or not is_retryable(e):
+                raise
+            delay = policy.delay(attempt)
+            _log_retry(description, e, attempt, policy, delay)
+            time.sleep(delay)
+
+
+async def call_with_retries_async(
+    call: Callable[[], Awaitable[T]],
+    description: str,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    find_existing: Optional[Callable[[], Awaitable[Optional[T]]]] = None,
+    resend: bool = False,
+) -> T:
+    """call_with_retries for coroutines: `call` and `find_existing` return awaitables."""
+    for attempt in range(policy.attempts):
+        if (attempt or resend) and find_existing is not None:
+            try:
+                existing = await find_existing()
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                print(f"Could not look up {description} before retrying: {e}")
+                existing = None
+            if existing is not None:
+                return existing
+        try:
+            return await call()
+        except Exception as e:
+            if attempt + 1 >= policy.attempts or not is_retryable(e):
+                raise
+            delay = policy.delay(attempt)
+            _log_retry(description, e, attempt, policy, delay)
+            await asyncio.sleep(delay)
+
+
+def retry_ccxt_reads(session: Any, policy: RetryPolicy = DEFAULT_RETRY_POLICY) -> None:
+    """
+    Retries the GET requests of a ccxt session (sync or async_support) on retryable errors. Reads are
+    safe to send again; orders are retried by the wrappers, with their client order ID.
+    Attach it after rate_limit_ccxt, so each attempt waits for the rate limiter.
+    """
+    fetch2 = session.fetch2
+
+    def description(path: str, method: str) -> str:
+        return f"{session.id} {method} {path}"
+
+    if asyncio.iscoroutinefunction(fetch2):
+        async def retried_fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            if method != 'GET':
+                return await fetch2(path, api, method, params, headers, body, config)
+            return await call_with_retries_async(
+                lambda: fetch2(path, api, method, params, headers, body, config), description(path, method), policy
+            )
+    else:
+        def retried_fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            if method != 'GET':
+                return fetch2(path, api, method, params, headers, body, config)
+            return call_with_retries(
+                lambda: fetch2(path, api, method, params, headers, body, config), description(path, method), policy
+            )
+
+    session.fetch2 = retried_fetch2
@@ -0,0 +1,86 @@
+import os
+import re
+import sys
+import subprocess
+from typing import Dict, List, Tuple
+
+CODE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_profile(code: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Runs `code` in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        Tuple[Dict[str, int], Dict[str, int]]: Cumulative microseconds of the top level imports, and of every
+                                               module imported on the way, keyed by module name.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=CODE_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Running {code!r} failed:\n{result.stderr[-2000:]}")
+    top_level = {}
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        microseconds, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        cumulative[name] = microseconds
+        if len(indent) == 1:
+            top_level[name] = microseconds
+    return top_level, cumulative
+
+
+def check_entry(module: str, budget: float, forbidden: List[str], runs: int = 3) -> List[str]:
+    """
+    Profiles the import of `module` `runs` times, keeping the fastest, and returns the problems found:
+    an empty list when it is within budget and none of the `forbidden` modules is imported.
+    """
+    interpreter_modules = set(import_profile('pass')[1])  # loaded by every interpreter, e.g. by site
+    profiles = []
+    for _ in range(runs):
+        top_level, cumulative = import_profile(f'import {module}')
+        total = sum(microseconds for name, microseconds in top_level.items() if name not in interpreter_modules) / 1e6
+        profiles.append((total, cumulative))
+    total, cumulative = min(profiles, key=lambda profile: profile[0])
+
+    print(f"{module}: {total:.3f}s (budget {budget:.3f}s)")
+    heaviest = sorted(
+        ((microseconds, name) for name, microseconds in cumulative.items()
+         if '.' not in name and name not in interpreter_modules),
+        reverse=True,
+    )[:8]
+    for microseconds, name in heaviest:
+        print(f"    {microseconds / 1e6:7.3f}s  {name}")
+
+    problems = []
+    if total > budget:
+        problems.append(f"{module} takes {total:.3f}s to import, over its {budget:.3f}s budget")
+    for name in forbidden:
+        if name in cumulative:
+            problems.append(f"{module} imports {name} at startup")
+    return problems
+
+
+if __name__ == "__main__":
+    # --- CONFIG ---
+    # entry module (run from the code directory): import time budget in seconds
+    entries = {
+        'strategies.envelope.run': 1.0,
+        'strategies.envelope_kucoin.run': 1.0,
+        'strategies.bitunix_bot_template.run': 0.5,
+    }
+    # libraries the trading path must only load once a run needs them, or never
+    forbidden = ['pandas', 'ta', 'matplotlib', 'seaborn', 'ccxt.async_support']
+    runs = 3  # the fastest run is kept, to leave out disk cache misses
+
+    problems = []
+    for module, budget in entries.items():
+        problems += check_entry(module, budget, forbidden, runs)
+    for problem in problems:
+        print(f"/!\\ {problem}")
+    sys.exit(1 if problems else 0)
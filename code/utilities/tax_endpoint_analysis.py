@@ -3,11 +3,10 @@ import time
 from typing import Dict, Any, List, Optional, Union
 import ccxt
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from pydantic import BaseModel
 
+from utilities.rate_limiter import rate_limit_ccxt
+
 
 EXCHANGES: Dict[str, Dict[str, Any]] = {
     "bitget": {
@@ -67,23 +66,26 @@ class RecordsProcessor:
         self.extra_records: Optional[pd.DataFrame] = None
         self.pairs: Optional[List[str]] = None
         self.trades: Optional[pd.DataFrame] = None
-        self._process_records(portefolio_start_date, sleep)
+        if sleep:
+            # paces the record pages at the endpoint's ccxt cost, shared with the bots on the same account
+            rate_limit_ccxt(client)
+        self._process_records(portefolio_start_date)
 
-    def _process_records(self, portefolio_start_date: str, sleep: bool = True) -> None:
-        self._fetch_records(portefolio_start_date, sleep)
+    def _process_records(self, portefolio_start_date: str) -> None:
+        self._fetch_records(portefolio_start_date)
         self._convert_records()
         self._set_pairs()
         self._complement_records()
         self._create_trades_table()
 
-    def _fetch_records(self, portefolio_start_date: str, sleep: bool = True) -> None:
+    def _fetch_records(self, portefolio_start_date: str) -> None:
         start_timestamp = convert_date_to_timestamp(portefolio_start_date)
         current_timestamp = int(time.time() * 1000)
         while start_timestamp < current_timestamp:
             end_timestamp = start_timestamp + self.interval_ms
             self.records_raw.extend(
                 self._fetch_records_within_interval(
-                    start_timestamp, end_timestamp, current_timestamp, sleep
+                    start_timestamp, end_timestamp, current_timestamp
                 )
             )
             start_timestamp = end_timestamp
@@ -92,14 +94,10 @@ class RecordsProcessor:
         self, 
         start_timestamp: int, 
         end_timestamp: int, 
-        current_timestamp: int, 
-        sleep: bool = True
+        current_timestamp: int
     ) -> List[Dict[str, Any]]:
         total = []
         while start_timestamp < current_timestamp:
-            if sleep:
-                time.sleep(1)
-            
             response = self.client.privateTaxGetV2TaxFutureRecord({
                 "productType": self.product_type,
                 "startTime": start_timestamp,
@@ -129,14 +127,10 @@ class RecordsProcessor:
         start_timestamp: int, 
         end_timestamp: int, 
         current_timestamp: int, 
-        last_id: str, 
-        sleep: bool = False
+        last_id: str
     ) -> List[Dict[str, Any]]:
         additional_records = []
         while True:
-            if sleep:
-                time.sleep(1)
-                
             response = self.client.privateTaxGetV2TaxFutureRecord({
                 "productType": self.product_type,
                 "startTime": start_timestamp,
@@ -377,6 +371,9 @@ class RecordsManager:
         records.to_csv(self._filename + ".csv", index=True)
 
     def plot_over_time(self, metric: str, show_transfers: bool = False) -> None:
+        import matplotlib.pyplot as plt
+        import matplotlib.dates as mdates
+
         plt.figure(figsize=(8, 4))
         if metric == "PnL":
             plt.plot(self.records_to_analyse.index, self.records_to_analyse["windowPnl"], color="blue", label="P&L ($)")
@@ -407,6 +404,9 @@ class RecordsManager:
         plt.show()
 
     def plot_per_pair(self, metric: str, include_funding_fees: bool = True) -> None:
+            import seaborn as sns
+            import matplotlib.pyplot as plt
+
             if metric not in ["PnL", "PnL Pct", "Funding Fees", "Win Rate", "Trades"]:
                 raise ValueError("Unsupported metric for plot_per_pair")
 
@@ -447,6 +447,9 @@ class RecordsManager:
             plt.show()
 
     def plot_per_trade_type(self, metric: str, results: str = "global") -> None:
+        import seaborn as sns
+        import matplotlib.pyplot as plt
+
         data = self.results[results]
         
         if metric == "PnL":
@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _fsync_directory(directory: str) -> None:
+    # makes a rename in `directory` survive a power loss; directories cannot be opened on Windows
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JsonTracker():
+    def __init__(self, path: str, indent: Optional[int] = None) -> None:
+        """
+        State of one strategy in its own JSON file, written to a temporary file, fsynced and renamed over
+        the previous one: a crash in the middle of a write leaves the previous state, never a partial file.
+
+        Args:
+            path (str): The tracker file, e.g. tracker_BTC-USDT-USDT.json.
+            indent (Optional[int]): JSON indentation, None for a single line.
+        """
+        self.path = path
+        self.indent = indent
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def read(self) -> Dict[str, Any]:
+        with open(self.path, 'r') as file:
+            return json.load(file)
+
+    def write(self, data: Dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(self.path)}.")
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(data, file, indent=self.indent)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        _fsync_directory(directory)
+
+
+class SqliteTrackerStore():
+    def __init__(self, path: str, timeout: float = 30.0) -> None:
+        """
+        States of many strategies in one SQLite database in WAL mode, one row per key (e.g. account and
+        symbol) behind a primary key index. A write is one small transaction instead of a file rewrite,
+        readers never block the writer, and the database stays consistent through a crash.
+
+            store = SqliteTrackerStore('trackers.sqlite')
+            strategy = EnvelopeStrategy(params, bitget, tracker=store.tracker('envelope/BTC/USDT:USDT'))
+
+        Args:
+            path (str): The database file, created on first use.
+            timeout (float): Seconds to wait for a lock held by another process.
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # one connection for the threads of the process, serialized by the lock; autocommit, one statement per transaction
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=FULL')  # a committed state survives a power loss too
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS trackers (key TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)'
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute('SELECT data FROM trackers WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def write(self, key: str, data: Dict[str, Any]) -> None:
+        self.write_many([(key, data)])
+
+    def write_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Writes the states of several keys in one transaction."""
+        now = time.time()
+        rows = [(key, json.dumps(data), now) for key, data in items]
+        with self._lock:
+            with self._connection:  # BEGIN ... COMMIT, ROLLBACK on error
+                self._connection.execute('BEGIN IMMEDIATE')
+                self._connection.executemany(
+                    'INSERT INTO trackers (key, data, updated_at) VALUES (?, ?, ?) '
+                    'ON CONFLICT(key) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at',
+                    rows,
+                )
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._connection.execute('SELECT key FROM trackers ORDER BY key')]
+
+    def tracker(self, key: str, legacy_file: Optional[str] = None) -> 'SqliteTracker':
+        """
+        The state of `key`, with the JSON/tracker interface of JsonTracker.
+
+        Args:
+            legacy_file (Optional[str]): JSON tracker file of the same strategy, imported the first time the
+                                         key is missing from the database, to carry its state over.
+        """
+        return SqliteTracker(self, key, legacy_file)
+
+
+class SqliteTracker():
+    def __init__(self, store: SqliteTrackerStore, key: str, legacy_file: Optional[str] = None) -> None:
+        self.store = store
+        self.key = key
+        self.legacy_file = legacy_file
+
+    def _import_legacy(self) -> Optional[Dict[str, Any]]:
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return None
+        data = JsonTracker(self.legacy_file).read()
+        self.store.write(self.key, data)
+        print(f"tracker {self.key} imported from {self.legacy_file}")
+        return data
+
+    def exists(self) -> bool:
+        return self.store.read(self.key) is not None or self._import_legacy() is not None
+
+    def read(self) -> Dict[str, Any]:
+        data = self.store.read(self.key)
+        if data is None:
+            data = self._import_legacy()
+        if data is None:
+            raise KeyError(f"No tracker {self.key} in {self.store.path}")
+        return data
+
+    def write(self, data: Dict[str, Any]) -> None:
+        self.store.write(self.key, data)
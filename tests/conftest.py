@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tests import the modules of code/ the way the strategies do, e.g. `from utilities.indicators import sma`
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'code'))
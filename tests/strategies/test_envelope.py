@@ -0,0 +1,145 @@
+import itertools
+
+import pytest
+
+from strategies.envelope.strategy import EnvelopeStrategy
+from utilities.precision import Step, SymbolPrecision
+
+SYMBOL = 'BTC/USDT:USDT'
+PARAMS = {
+    'symbol': SYMBOL, 'timeframe': '1h', 'margin_mode': 'isolated', 'balance_fraction': 1, 'leverage': 1,
+    'average_type': 'DCM', 'average_period': 5, 'envelopes': [0.07, 0.11], 'stop_loss_pct': 0.4,
+    'use_longs': True, 'use_shorts': True,
+}
+
+
+class FakeExchange():
+    """Order endpoints of BitgetFutures, recording the requests in the order they are sent."""
+
+    def __init__(self, can_amend=True, failing_edits=()):
+        self.requests = []
+        self.failing_edits = set(failing_edits)
+        self._ids = itertools.count(1)
+        if can_amend:
+            self.edit_orders_bulk = self._edit_orders_bulk
+
+    def precisions(self, symbol):
+        return SymbolPrecision(Step('0.001'), Step('0.1'))
+
+    def cancel_orders_bulk(self, ids, symbol, trigger=False):
+        if ids:
+            self.requests.append(('cancel', sorted(ids)))
+        return []
+
+    def place_orders_bulk(self, orders):
+        if orders:
+            self.requests.append(('place', [order['trigger_price'] for order in orders]))
+        return [{'order': {'id': f"new{next(self._ids)}"}, 'error': None} for _ in orders]
+
+    def _edit_orders_bulk(self, orders):
+        self.requests.append(('edit', sorted(order['id'] for order in orders)))
+        return [
+            {'order': None, 'error': 'order triggered'} if order['id'] in self.failing_edits
+            else {'order': {'id': order['id']}, 'error': None}
+            for order in orders
+        ]
+
+
+def _live(id, spec):
+    # a Bitget plan order as ccxt parses it: hedge mode close orders carry the side of their position
+    reduce = spec.get('reduce', False)
+    side = spec['side']
+    return {
+        'id': id,
+        'symbol': spec['symbol'],
+        'type': spec['type'].replace('trigger_', ''),
+        'side': ('buy' if side == 'sell' else 'sell') if reduce else side,
+        'amount': spec['amount'],
+        'triggerPrice': spec['trigger_price'],
+        'price': spec.get('price'),
+        'reduceOnly': None,
+        'info': {'tradeSide': 'close' if reduce else 'open'},
+    }
+
+
+def _entry(trigger_price):
+    return ('entry long', {
+        'symbol': SYMBOL, 'type': 'trigger_limit', 'side': 'buy', 'amount': 0.5,
+        'trigger_price': trigger_price, 'price': trigger_price * 1.005, 'reduce': False,
+    })
+
+
+def _close(kind, trigger_price):
+    return (f"{kind} long", {
+        'symbol': SYMBOL, 'type': 'trigger_market', 'side': 'sell', 'amount': 0.5,
+        'trigger_price': trigger_price, 'reduce': True,
+    })
+
+
+def _strategy(tmp_path, exchange):
+    return EnvelopeStrategy(PARAMS, exchange, tracker_file=str(tmp_path / 'tracker.json'))
+
+
+def test_keeps_matching_orders_and_their_stop_loss_ids(tmp_path):
+    exchange = FakeExchange()
+    orders = [_entry(90.0), _close('exit', 100.0), _close('sl', 54.0)]
+    live = [_live('e', orders[0][1]), _live('x', orders[1][1]), _live('s', {**orders[2][1], 'trigger_price': 54.04})]
+
+    stop_loss_ids = _strategy(tmp_path, exchange)._reconcile_orders(orders, live)
+
+    assert exchange.requests == []
+    assert stop_loss_ids == ['s']
+
+
+def test_amends_the_orders_whose_band_moved(tmp_path):
+    exchange = FakeExchange()
+    orders = [_entry(91.0), _close('exit', 101.0), _close('sl', 55.0)]
+    live = [_live('e', _entry(90.0)[1]), _live('x', _close('exit', 100.0)[1]), _live('s', _close('sl', 54.0)[1])]
+
+    stop_loss_ids = _strategy(tmp_path, exchange)._reconcile_orders(orders, live)
+
+    assert exchange.requests == [('edit', ['e', 's', 'x'])]
+    assert stop_loss_ids == ['s']
+
+
+def test_a_failed_amend_is_replaced(tmp_path):
+    exchange = FakeExchange(failing_edits={'s'})
+    orders = [_entry(91.0), _close('sl', 55.0)]
+    live = [_live('e', _entry(90.0)[1]), _live('s', _close('sl', 54.0)[1])]
+
+    stop_loss_ids = _strategy(tmp_path, exchange)._reconcile_orders(orders, live)
+
+    assert exchange.requests == [('edit', ['e', 's']), ('place', [55.0]), ('cancel', ['s'])]
+    assert stop_loss_ids == ['new1']
+
+
+def test_stale_entries_go_before_the_placement_and_stale_closes_after_it(tmp_path):
+    exchange = FakeExchange(can_amend=False)
+    orders = [_entry(91.0), _close('sl', 55.0)]
+    live = [_live('e', _entry(90.0)[1]), _live('s', _close('sl', 54.0)[1])]
+
+    stop_loss_ids = _strategy(tmp_path, exchange)._reconcile_orders(orders, live)
+
+    assert exchange.requests == [('cancel', ['e']), ('place', [91.0, 55.0]), ('cancel', ['s'])]
+    assert stop_loss_ids == ['new2']
+
+
+def test_a_failed_entry_cancel_stops_before_placing(tmp_path):
+    exchange = FakeExchange(can_amend=False)
+
+    def cancel_orders_bulk(ids, symbol, trigger=False):
+        if ids:
+            raise RuntimeError('exchange down')
+
+    exchange.cancel_orders_bulk = cancel_orders_bulk
+    with pytest.raises(RuntimeError):
+        _strategy(tmp_path, exchange)._reconcile_orders([_entry(91.0)], [_live('e', _entry(90.0)[1])])
+    assert exchange.requests == []
+
+
+def test_no_orders_wanted_cancels_everything(tmp_path):
+    exchange = FakeExchange()
+    live = [_live('e', _entry(90.0)[1]), _live('s', _close('sl', 54.0)[1])]
+
+    assert _strategy(tmp_path, exchange)._reconcile_orders([], live) == []
+    assert exchange.requests == [('cancel', ['e']), ('cancel', ['s'])]
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utilities import indicators
+
+ta = pytest.importorskip('ta')
+
+
+def _candles(length: int, seed: int = 0):
+    close = 100 + np.random.default_rng(seed).standard_normal(length).cumsum()
+    return close, close + 1.0, close - 1.0
+
+
+def _ta_values(name: str, close: np.ndarray, high: np.ndarray, low: np.ndarray, window: int) -> np.ndarray:
+    close, high, low = (pd.Series(values, dtype=float) for values in (close, high, low))
+    if name == 'donchian_middle':
+        return ta.volatility.DonchianChannel(high, low, close, window=window, fillna=False).donchian_channel_mband().to_numpy()
+    if name == 'sma':
+        return ta.trend.sma_indicator(close, window).to_numpy()
+    if name == 'ema':
+        return ta.trend.ema_indicator(close, window).to_numpy()
+    if name == 'wma':
+        return ta.trend.wma_indicator(close, window).to_numpy()
+    return ta.momentum.rsi(close, window).to_numpy()
+
+
+def _values(name: str, close: np.ndarray, high: np.ndarray, low: np.ndarray, window: int) -> np.ndarray:
+    if name == 'donchian_middle':
+        return indicators.donchian_middle(high, low, window)
+    return getattr(indicators, name)(close, window)
+
+
+INDICATORS = ['donchian_middle', 'sma', 'ema', 'wma', 'rsi']
+
+
+@pytest.mark.parametrize('name', INDICATORS)
+@pytest.mark.parametrize('length, window', [
+    (200, 20),  # NaN warm-up, then values
+    (200, 1),  # no warm-up
+    (0, 14),  # empty input
+    (5, 14),  # shorter than the window: all NaN
+    (14, 14),  # exactly one window
+])
+def test_matches_ta(name, length, window):
+    close, high, low = _candles(length)
+    expected = _ta_values(name, close, high, low, window)
+    values = _values(name, close, high, low, window)
+
+    assert values.shape == (length,)
+    np.testing.assert_array_equal(np.isnan(values), np.isnan(expected))
+    np.testing.assert_allclose(values, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('name', INDICATORS)
+def test_matches_ta_on_flat_prices(name):
+    close = np.full(50, 100.0)
+    expected = _ta_values(name, close, close, close, 14)
+    np.testing.assert_allclose(_values(name, close, close, close, 14), expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('name', INDICATORS)
+def test_rejects_window_below_one(name):
+    close, high, low = _candles(20)
+    with pytest.raises(ValueError):
+        _values(name, close, high, low, 0)
@@ -0,0 +1,215 @@
+import time
+import asyncio
+
+import pytest
+
+from utilities.account_stream import AccountStream, BitgetAccountProtocol
+from utilities.market_stream import BitgetStreamProtocol, CandleBook, MarketDataFeed
+from utilities.market_stream_stub import StubMarketServer
+from utilities.retry import RetryPolicy
+
+SYMBOL = 'BTC/USDT:USDT'
+INST_ID = 'BTCUSDT'
+MINUTE = 60000
+FAST_RECONNECT = RetryPolicy(base_delay=0.01, max_delay=0.05)
+
+
+def _candle(timestamp, close=1.0):
+    return (float(timestamp), close, close, close, close, 1.0)
+
+
+async def _eventually(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise TimeoutError("condition not met")
+        await asyncio.sleep(0.01)
+
+
+def _with_server(scenario):
+    async def main():
+        server = StubMarketServer()
+        await server.start()
+        try:
+            await asyncio.wait_for(scenario(server), 10.0)
+        finally:
+            await server.stop()
+    asyncio.run(main())
+
+
+async def _run_until_done(stream, scenario):
+    task = asyncio.create_task(stream.run())
+    try:
+        await scenario()
+        assert not task.done(), "the stream stopped"
+    finally:
+        await stream.stop()
+        await task
+
+
+# --- CandleBook ---
+@pytest.fixture
+def book():
+    book = CandleBook()
+    book.track(SYMBOL, '1m', MINUTE)
+    return book
+
+
+def test_update_closes_the_open_candle_on_the_next_one(book):
+    assert book.update(SYMBOL, '1m', _candle(0)) is None
+    assert book.update(SYMBOL, '1m', _candle(0, close=2.0)) is None  # replaces the open candle
+    event = book.update(SYMBOL, '1m', _candle(MINUTE))
+    assert event.candle == _candle(0, close=2.0)
+    assert not event.contiguous  # nothing before it in the book
+
+    event = book.update(SYMBOL, '1m', _candle(2 * MINUTE))
+    assert event.candle == _candle(MINUTE)
+    assert event.contiguous
+
+
+def test_update_ignores_older_candles_and_flags_gaps(book):
+    book.update(SYMBOL, '1m', _candle(0))
+    book.update(SYMBOL, '1m', _candle(MINUTE))
+    assert book.update(SYMBOL, '1m', _candle(0)) is None  # replayed after a reconnect
+    book.update(SYMBOL, '1m', _candle(3 * MINUTE))  # closes MINUTE
+    event = book.update(SYMBOL, '1m', _candle(4 * MINUTE))
+    assert event.candle[0] == 3 * MINUTE
+    assert not event.contiguous  # 2 * MINUTE is missing
+
+
+def test_close_due_closes_ended_candles_only(book):
+    book.seed(SYMBOL, '1m', [_candle(0)])
+    book.update(SYMBOL, '1m', _candle(MINUTE))
+    assert book.next_close() == 2 * MINUTE
+    assert book.close_due(2 * MINUTE - 1) == []
+    [event] = book.close_due(2 * MINUTE)
+    assert event.candle == _candle(MINUTE)
+    assert event.contiguous
+    assert book.next_close() is None
+    assert len(book.candles(SYMBOL, '1m')) == 2
+
+
+def test_backfill_adds_the_missing_candles(book):
+    book.seed(SYMBOL, '1m', [_candle(0), _candle(MINUTE)])
+    book.update(SYMBOL, '1m', _candle(2 * MINUTE))
+    event = book.backfill(SYMBOL, '1m', [_candle(MINUTE), _candle(2 * MINUTE, close=3.0), _candle(3 * MINUTE)])
+    assert event.candle == _candle(3 * MINUTE)
+    assert event.contiguous
+    assert book.next_close() is None  # the open candle was in the history
+    assert book.candles(SYMBOL, '1m')[:, 0].tolist() == [0, MINUTE, 2 * MINUTE, 3 * MINUTE]
+    assert book.backfill(SYMBOL, '1m', [_candle(3 * MINUTE)]) is None
+
+
+def test_backfill_flags_a_gap(book):
+    book.seed(SYMBOL, '1m', [_candle(0)])
+    event = book.backfill(SYMBOL, '1m', [_candle(2 * MINUTE), _candle(3 * MINUTE)])
+    assert not event.contiguous
+
+
+# --- MarketDataFeed ---
+def test_feed_backfills_the_history_snapshot_on_subscribe():
+    async def scenario(server):
+        feed = MarketDataFeed(BitgetStreamProtocol(server.url), reconnect_backoff=FAST_RECONNECT)
+        feed.subscribe_candles(SYMBOL, '1m')
+        events = []
+        feed.on_candle_close(events.append)
+
+        async def steps():
+            await server.wait_for_subscriptions(1)
+            history = [list(_candle(i * MINUTE, close=float(i))) for i in range(4)]
+            assert await server.send_candle(INST_ID, '1m', history, snapshot=True) == 1
+            await _eventually(lambda: events)
+            assert feed.book.candles(SYMBOL, '1m')[:, 0].tolist() == [0, MINUTE, 2 * MINUTE]
+            assert events[-1].candle[0] == 2 * MINUTE
+            assert events[-1].contiguous
+            assert feed.book.next_close() == 4 * MINUTE  # the last candle of the snapshot is still open
+
+        await _run_until_done(feed, steps)
+    _with_server(scenario)
+
+
+def test_feed_reconnects_and_resubscribes():
+    async def scenario(server):
+        feed = MarketDataFeed(BitgetStreamProtocol(server.url), reconnect_backoff=FAST_RECONNECT)
+        feed.subscribe_candles(SYMBOL, '1m')
+        feed.subscribe_ticker(SYMBOL)
+
+        async def steps():
+            await server.wait_for_subscriptions(2)
+            await server.drop_clients()
+            await server.wait_for_subscriptions(4)
+            assert server.subscriptions[2:] == server.subscriptions[:2]
+            await server.send_ticker(INST_ID, 101.5)
+            await _eventually(lambda: SYMBOL in feed.tickers)
+            assert feed.tickers[SYMBOL].last == 101.5
+
+        await _run_until_done(feed, steps)
+    _with_server(scenario)
+
+
+def test_feed_skips_a_malformed_push():
+    async def scenario(server):
+        feed = MarketDataFeed(BitgetStreamProtocol(server.url), reconnect_backoff=FAST_RECONNECT)
+        feed.subscribe_ticker(SYMBOL)
+
+        async def steps():
+            await server.wait_for_subscriptions(1)
+            await server._push('ticker', INST_ID, 'update', [{'instId': INST_ID}])  # no lastPr
+            await server.send_ticker(INST_ID, 99.0)
+            await _eventually(lambda: SYMBOL in feed.tickers)
+            assert len(server.subscriptions) == 1  # the same connection
+
+        await _run_until_done(feed, steps)
+    _with_server(scenario)
+
+
+# --- AccountStream ---
+def _account_stream(server):
+    protocol = BitgetAccountProtocol({'apiKey': 'key', 'secret': 'secret', 'password': 'password'}, server.url)
+    return AccountStream(protocol, reconnect_backoff=FAST_RECONNECT)
+
+
+def test_account_stream_updates_the_account_state():
+    async def scenario(server):
+        stream = _account_stream(server)
+        orders = []
+        stream.on_order(orders.append)
+
+        async def steps():
+            await server.wait_for_subscriptions(len(BitgetAccountProtocol.channels))
+            await _eventually(lambda: stream.state.synced_since is not None)
+            assert stream.state.open_positions(SYMBOL) is None  # not pushed yet
+
+            await server.send_orders([{'orderId': '1', 'instId': INST_ID, 'status': 'live', 'side': 'buy'}])
+            await server.send_orders([{'orderId': '2', 'instId': INST_ID, 'status': 'executed', 'posSide': 'long'}], trigger=True)
+            await server.send_positions([
+                {'instId': INST_ID, 'holdSide': 'long', 'total': '0.5', 'openPriceAvg': '100', 'cTime': '1'},
+                {'instId': 'ETHUSDT', 'holdSide': 'short', 'total': '0', 'openPriceAvg': '10', 'cTime': '1'},
+            ])
+            await _eventually(lambda: stream.state.open_positions(SYMBOL))
+
+            assert [order['id'] for order in orders] == ['1', '2']
+            assert stream.state.order('1')['status'] == 'open'
+            assert not stream.state.order('1')['trigger']
+            assert [order['id'] for order in stream.state.orders(SYMBOL, status='closed', trigger=True)] == ['2']
+            [position] = stream.state.open_positions(SYMBOL)
+            assert (position['side'], position['contracts'], position['entryPrice']) == ('long', 0.5, 100.0)
+            assert stream.state.open_positions('ETH/USDT:USDT') == []  # closed positions are dropped
+
+        await _run_until_done(stream, steps)
+    _with_server(scenario)
+
+
+def test_account_stream_skips_a_malformed_push():
+    async def scenario(server):
+        stream = _account_stream(server)
+
+        async def steps():
+            await server.wait_for_subscriptions(len(BitgetAccountProtocol.channels))
+            await server.send_orders([{'instId': INST_ID, 'status': 'live'}])  # no orderId
+            await server.send_orders([{'orderId': '1', 'instId': INST_ID, 'status': 'live'}])
+            await _eventually(lambda: stream.state.order('1') is not None)
+            assert len(server.subscriptions) == len(BitgetAccountProtocol.channels)  # the same connection
+
+        await _run_until_done(stream, steps)
+    _with_server(scenario)
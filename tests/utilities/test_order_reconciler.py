@@ -0,0 +1,89 @@
+from utilities.order_reconciler import order_key, reconcile_orders
+from utilities.precision import Step, SymbolPrecision
+
+SYMBOL = 'BTC/USDT:USDT'
+PRECISION = SymbolPrecision(Step('0.001'), Step('0.1'))
+
+
+def _precision_for(symbol):
+    return PRECISION
+
+
+def _entry(trigger_price, amount=0.5, side='buy', **extra):
+    return {
+        'symbol': SYMBOL, 'type': 'trigger_limit', 'side': side, 'amount': amount,
+        'trigger_price': trigger_price, 'price': trigger_price * 1.005, **extra,
+    }
+
+
+def _exit(trigger_price, amount=0.5, side='sell', **extra):
+    return {'symbol': SYMBOL, 'type': 'trigger_market', 'side': side, 'amount': amount, 'trigger_price': trigger_price, 'reduce': True, **extra}
+
+
+def test_order_key_uses_the_tick_and_lot_grid():
+    assert order_key(_entry(100.04, amount=0.5009), PRECISION) == order_key(_entry(100.0, amount=0.5), PRECISION)
+    assert order_key(_entry(100.06), PRECISION) != order_key(_entry(100.0), PRECISION)
+    # the price of a market order is not sent
+    assert order_key(_exit(100.0, price=123.0), PRECISION) == order_key(_exit(100.0), PRECISION)
+
+
+def test_keeps_the_orders_matching_within_a_tick_or_lot():
+    live = [
+        {**_entry(100.04, amount=0.5004), 'id': 'a'},
+        {**_exit(110.01, price=99.0), 'id': 'b'},
+    ]
+    plan = reconcile_orders([_exit(110.0), _entry(100.0)], live, _precision_for)
+    assert plan.keep == [(0, live[1]), (1, live[0])]
+    assert plan.amend == plan.place == plan.cancel == []
+    assert plan.requests == 0
+
+
+def test_keeps_duplicates_once_each():
+    live = [{**_entry(100.0), 'id': 'a'}]
+    plan = reconcile_orders([_entry(100.0), _entry(100.0)], live, _precision_for)
+    assert plan.keep == [(0, live[0])]
+    assert plan.place == [1]
+
+
+def test_amends_pair_by_price_within_a_group():
+    live = [
+        {**_entry(95.0), 'id': 'high'},
+        {**_entry(85.0), 'id': 'low'},
+        {**_exit(120.0), 'id': 'exit'},
+    ]
+    desired = [_entry(90.0), _entry(80.0, amount=0.7), _exit(110.0)]
+    plan = reconcile_orders(desired, live, _precision_for)
+    assert sorted((i, order['id']) for i, order in plan.amend) == [(0, 'high'), (1, 'low'), (2, 'exit')]
+    assert plan.place == plan.cancel == []
+    assert plan.requests == 3
+
+
+def test_amends_never_cross_type_side_or_reduce():
+    live = [
+        {**_entry(95.0, side='sell'), 'id': 'short entry'},
+        {**_entry(95.0, reduce=True), 'id': 'reduce entry'},
+        {**_exit(95.0, side='buy', reduce=False), 'id': 'market buy'},
+    ]
+    plan = reconcile_orders([_entry(90.0)], live, _precision_for)
+    assert plan.amend == []
+    assert plan.place == [0]
+    assert sorted(order['id'] for order in plan.cancel) == ['market buy', 'reduce entry', 'short entry']
+
+
+def test_places_and_cancels_the_leftovers():
+    live = [{**_entry(95.0), 'id': 'entry'}, {**_exit(120.0, side='buy'), 'id': 'stale exit'}]
+    desired = [_entry(90.0), _entry(80.0), _entry(70.0)]
+    plan = reconcile_orders(desired, live, _precision_for)
+    # the lowest desired price takes the lowest live one
+    assert [(i, order['id']) for i, order in plan.amend] == [(2, 'entry')]
+    assert plan.place == [0, 1]
+    assert [order['id'] for order in plan.cancel] == ['stale exit']
+    assert plan.requests == 4
+
+
+def test_without_amend_replaces_the_orders():
+    live = [{**_entry(95.0), 'id': 'entry'}]
+    plan = reconcile_orders([_entry(90.0)], live, _precision_for, amend=False)
+    assert plan.amend == []
+    assert plan.place == [0]
+    assert plan.cancel == live
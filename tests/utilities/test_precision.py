@@ -0,0 +1,115 @@
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pytest
+
+from utilities.precision import ROUND, TRUNCATE, Step, SymbolPrecision, orders_to_precision
+
+
+def _decimal(value, step, rounding_mode):
+    # the reference: the value's shortest repr as a Decimal, quantized to the step
+    step = Decimal(step)
+    rounding = ROUND_DOWN if rounding_mode == TRUNCATE else ROUND_HALF_UP
+    result = (Decimal(repr(value)) / step).to_integral_value(rounding) * step
+    return format(result.normalize(), 'f') if result else '0'
+
+
+def test_truncates_on_the_decimal_grid():
+    # 0.29 * 100 is 28.999999999999996 in float
+    assert Step('0.01').format(0.29) == '0.29'
+    assert Step('0.01').format(0.299) == '0.29'
+    assert Step('0.001').format(1.0000001) == '1'
+
+
+@pytest.mark.parametrize('value, step, expected', [
+    (0.125, '0.01', '0.13'),
+    (0.135, '0.01', '0.14'),
+    (2.5, '1', '3'),
+    (0.25, '0.5', '0.5'),
+    (-0.125, '0.01', '-0.13'),
+    (-2.5, '1', '-3'),
+])
+def test_round_goes_half_away_from_zero(value, step, expected):
+    assert Step(step).format(value, ROUND) == expected
+
+
+@pytest.mark.parametrize('value, step, rounding_mode, expected', [
+    (-0.299, '0.01', TRUNCATE, '-0.29'),
+    (-0.294, '0.01', ROUND, '-0.29'),
+    (-7.0, '5', TRUNCATE, '-5'),
+])
+def test_negative_values(value, step, rounding_mode, expected):
+    assert Step(step).format(value, rounding_mode) == expected
+
+
+@pytest.mark.parametrize('value, step, expected', [
+    (1234567.89, '0.01', '1234567.89'),
+    (1e-8, '0.00000001', '0.00000001'),
+    (1e-8, '0.01', '0'),
+    (12000000.0, '1000', '12000000'),
+    (0.5, '0.5', '0.5'),
+])
+def test_no_scientific_notation(value, step, expected):
+    text = Step(step).format(value, ROUND)
+    assert text == expected
+    assert 'e' not in text.lower()
+
+
+def test_matches_decimal_on_random_values():
+    rng = np.random.default_rng(0)
+    # values with up to 5 decimals, as prices and amounts are computed
+    raw_values = rng.uniform(-1000, 1000, 2000).tolist()
+    values = [round(value, decimals) for value, decimals in zip(raw_values, rng.integers(0, 6, 2000).tolist())]
+    for step in ('0.01', '0.001', '0.5', '5'):
+        for rounding_mode in (TRUNCATE, ROUND):
+            texts = Step(step).format_array(values, rounding_mode)
+            assert texts == [_decimal(value, step, rounding_mode) for value in values]
+
+
+@pytest.mark.parametrize('step', ['0.01', '0.5', '1', '0.00000001'])
+@pytest.mark.parametrize('rounding_mode', [TRUNCATE, ROUND])
+def test_array_to_units_matches_to_units(step, rounding_mode):
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.uniform(-100, 100, 500), [0.0, 0.29, 0.125, -0.125, 1234567.89, 1e-8]])
+    step = Step(step)
+    expected = [step.to_units(value, rounding_mode) for value in values.tolist()]
+    assert step.array_to_units(values, rounding_mode).tolist() == expected
+
+
+def test_step_rejects_non_positive_sizes():
+    for step in ('0', '-0.1', 'nan'):
+        with pytest.raises(ValueError):
+            Step(step)
+
+
+def test_orders_to_precision_reports_zero_results_per_order():
+    precision = SymbolPrecision(Step('0.001'), Step('0.1'))
+    orders = [
+        {'symbol': 'BTC/USDT:USDT', 'amount': 0.29, 'price': 100.04, 'trigger_price': 100.05},
+        {'symbol': 'BTC/USDT:USDT', 'amount': 0.0004, 'price': 100.0},  # below the lot size
+        {'symbol': 'BTC/USDT:USDT', 'amount': 1.0, 'price': 0.04},  # below the tick size
+        {'symbol': 'BTC/USDT:USDT', 'amount': 1.0},
+    ]
+    results = orders_to_precision(orders, lambda symbol: precision)
+
+    assert results[0] == {'amount': '0.29', 'price': '100', 'trigger_price': '100.1'}
+    assert isinstance(results[1], ValueError)
+    assert 'amount' in str(results[1])
+    assert isinstance(results[2], ValueError)
+    assert 'price' in str(results[2])
+    assert results[3] == {'amount': '1'}
+
+
+def test_orders_to_precision_reports_a_missing_precision_per_symbol():
+    precision = SymbolPrecision(Step('0.001'), Step('0.1'))
+
+    def precision_for(symbol):
+        if symbol != 'BTC/USDT:USDT':
+            raise KeyError(symbol)
+        return precision
+
+    results = orders_to_precision(
+        [{'symbol': 'BTC/USDT:USDT', 'amount': 1.0}, {'symbol': 'XYZ/USDT:USDT', 'amount': 1.0}], precision_for
+    )
+    assert results[0] == {'amount': '1'}
+    assert isinstance(results[1], KeyError)
@@ -0,0 +1,136 @@
+import asyncio
+
+import ccxt
+import pytest
+
+from utilities.retry import ClientOrderIds, RetryPolicy, call_with_retries, call_with_retries_async, is_retryable
+
+NO_WAIT = RetryPolicy(attempts=3, base_delay=0.0)
+
+
+class Retryable(Exception):
+    retryable = True
+
+
+class Rejected(Exception):
+    pass
+
+
+class FakeOrders():
+    """An order endpoint whose first answers fail after the order reached the exchange or before it did."""
+
+    def __init__(self, failures, placed_before_failure=True, lookup_error=None):
+        self.failures = list(failures)
+        self.placed_before_failure = placed_before_failure
+        self.lookup_error = lookup_error
+        self.sent = 0
+        self.lookups = 0
+        self.placed = []
+
+    def place(self):
+        self.sent += 1
+        if self.failures:
+            if self.placed_before_failure:
+                self.placed.append({'id': f"order{self.sent}"})
+            raise self.failures.pop(0)
+        self.placed.append({'id': f"order{self.sent}"})
+        return self.placed[-1]
+
+    def find(self):
+        self.lookups += 1
+        if self.lookup_error is not None:
+            raise self.lookup_error
+        return self.placed[0] if self.placed else None
+
+    async def place_async(self):
+        return self.place()
+
+    async def find_async(self):
+        return self.find()
+
+
+def test_is_retryable():
+    assert is_retryable(Retryable())
+    assert not is_retryable(Rejected())
+    assert is_retryable(ccxt.RequestTimeout('timeout'))
+    assert not is_retryable(ccxt.InsufficientFunds('no money'))
+
+
+def test_retries_a_retryable_failure():
+    orders = FakeOrders([Retryable()], placed_before_failure=False)
+    assert call_with_retries(orders.place, 'order', NO_WAIT, orders.find) == {'id': 'order2'}
+    assert orders.sent == 2
+    assert orders.lookups == 1
+
+
+def test_returns_the_order_found_instead_of_resending_it():
+    orders = FakeOrders([Retryable()])
+    assert call_with_retries(orders.place, 'order', NO_WAIT, orders.find) == {'id': 'order1'}
+    assert orders.sent == 1
+    assert orders.lookups == 1
+    assert len(orders.placed) == 1
+
+
+def test_raises_a_rejection_without_retrying():
+    orders = FakeOrders([Rejected()], placed_before_failure=False)
+    with pytest.raises(Rejected):
+        call_with_retries(orders.place, 'order', NO_WAIT, orders.find)
+    assert orders.sent == 1
+    assert orders.lookups == 0
+
+
+def test_raises_the_last_error_after_the_attempts():
+    orders = FakeOrders([Retryable()] * 3, placed_before_failure=False)
+    with pytest.raises(Retryable):
+        call_with_retries(orders.place, 'order', NO_WAIT, orders.find)
+    assert orders.sent == 3
+
+
+def test_resend_looks_the_order_up_before_the_first_attempt():
+    orders = FakeOrders([])
+    orders.placed.append({'id': 'sent in a failed batch'})
+    assert call_with_retries(orders.place, 'order', NO_WAIT, orders.find, resend=True) == {'id': 'sent in a failed batch'}
+    assert orders.sent == 0
+    assert orders.lookups == 1
+
+
+def test_a_lookup_error_that_cannot_be_retried_stops_the_retry():
+    orders = FakeOrders([Retryable()], lookup_error=Rejected('signature error'))
+    with pytest.raises(Rejected):
+        call_with_retries(orders.place, 'order', NO_WAIT, orders.find)
+    assert orders.sent == 1
+    assert len(orders.placed) == 1
+
+
+def test_a_retryable_lookup_error_still_resends():
+    # the exchange rejects the duplicate client order ID of an order it already has
+    orders = FakeOrders([Retryable()], placed_before_failure=False, lookup_error=Retryable('timeout'))
+    assert call_with_retries(orders.place, 'order', NO_WAIT, orders.find) == {'id': 'order2'}
+    assert orders.sent == 2
+
+
+def test_async_returns_the_order_found_instead_of_resending_it():
+    orders = FakeOrders([Retryable()])
+    result = asyncio.run(call_with_retries_async(orders.place_async, 'order', NO_WAIT, orders.find_async))
+    assert result == {'id': 'order1'}
+    assert orders.sent == 1
+
+
+def test_async_resend_and_lookup_errors():
+    orders = FakeOrders([])
+    orders.placed.append({'id': 'sent in a failed batch'})
+    result = asyncio.run(call_with_retries_async(orders.place_async, 'order', NO_WAIT, orders.find_async, resend=True))
+    assert result == {'id': 'sent in a failed batch'}
+    assert orders.sent == 0
+
+    orders = FakeOrders([Retryable()], lookup_error=Rejected('signature error'))
+    with pytest.raises(Rejected):
+        asyncio.run(call_with_retries_async(orders.place_async, 'order', NO_WAIT, orders.find_async))
+    assert orders.sent == 1
+
+
+def test_client_order_ids_are_unique():
+    ids = ClientOrderIds('lt')
+    generated = [ids.next() for _ in range(100)]
+    assert len(set(generated)) == 100
+    assert all(client_id.startswith('lt') for client_id in generated)